@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.main import Auditor  # noqa: E402
+
+
+def load_image_paths(path: Path, limit: int) -> list[str]:
+    if path.is_dir():
+        paths = sorted(
+            str(p.as_posix())
+            for p in path.iterdir()
+            if p.suffix.lower() in {".png", ".jpg", ".jpeg"}
+        )
+    else:
+        paths = []
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    paths.append(json.loads(line)["image_path"])
+    return paths[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", required=True, help="Image directory or JSONL manifest")
+    parser.add_argument("--model_name", default="Qwen/Qwen2-VL-2B-Instruct")
+    parser.add_argument("--batch_sizes", default="1,2,4,8")
+    parser.add_argument("--limit", type=int, default=32)
+    parser.add_argument("--no_vlm", action="store_true")
+    args = parser.parse_args()
+
+    image_paths = load_image_paths(Path(args.images), args.limit)
+    if not image_paths:
+        raise SystemExit("No images found.")
+
+    auditor = Auditor(model_name=args.model_name, use_vlm=not args.no_vlm, use_ocr=False)
+    baseline = None
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        auditor.extractor.model.max_batch_size = batch_size
+        if auditor.vlm is not None:
+            auditor.vlm.model.max_batch_size = batch_size
+        start = time.perf_counter()
+        reports = auditor.run_batch(image_paths)
+        elapsed = time.perf_counter() - start
+        invoices = [r.invoice for r in reports]
+        if baseline is None:
+            baseline = invoices
+        matches = sum(1 for a, b in zip(baseline, invoices) if a == b)
+        print(
+            f"batch_size={batch_size} invoices={len(reports)} "
+            f"seconds={elapsed:.2f} invoices_per_sec={len(reports) / elapsed:.3f} "
+            f"match_first_run={matches}/{len(reports)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.pipeline.extractor import EXTRACTION_PROMPT, StructuredExtractor  # noqa: E402
+from src.utils.parse import extract_json_block  # noqa: E402
+
+REQUIRED = ("invoice_number", "vendor_name", "invoice_date", "line_items", "subtotal", "tax", "total")
+
+
+def load_image_paths(path: Path, limit: int) -> list[str]:
+    if path.is_dir():
+        paths = sorted(
+            str(p.as_posix())
+            for p in path.iterdir()
+            if p.suffix.lower() in {".png", ".jpg", ".jpeg"}
+        )
+    else:
+        paths = []
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    paths.append(json.loads(line)["image_path"])
+    return paths[:limit]
+
+
+def parse_failed(output: str) -> bool:
+    try:
+        data = extract_json_block(output)
+    except ValueError:
+        return True
+    return any(key not in data for key in REQUIRED)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", required=True, help="Image directory or JSONL manifest")
+    parser.add_argument("--model_name", default="Qwen/Qwen2-VL-2B-Instruct")
+    parser.add_argument("--max_batch_size", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=32)
+    args = parser.parse_args()
+
+    image_paths = load_image_paths(Path(args.images), args.limit)
+    if not image_paths:
+        raise SystemExit("No images found.")
+
+    extractor = StructuredExtractor(
+        model_name=args.model_name, max_batch_size=args.max_batch_size, constrained=True
+    )
+    model = extractor.model
+    prompts = [EXTRACTION_PROMPT] * len(image_paths)
+    for label, grammar in (("free", None), ("constrained", extractor.grammar)):
+        tokens_before = model.stats["generated_tokens"]
+        start = time.perf_counter()
+        outputs = model.generate_batch(prompts, image_paths, grammar=grammar)
+        elapsed = time.perf_counter() - start
+        tokens = model.stats["generated_tokens"] - tokens_before
+        failures = sum(1 for output in outputs if parse_failed(output))
+        print(
+            f"mode={label} invoices={len(outputs)} seconds={elapsed:.2f} "
+            f"tokens={tokens} tokens_per_sec={tokens / elapsed:.1f} "
+            f"parse_failure_rate={failures / len(outputs):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from dateutil import parser as dateutil_parser
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils import dates  # noqa: E402
+
+
+def reference(value: str):
+    try:
+        return dateutil_parser.parse(value, fuzzy=True).date()
+    except Exception:
+        return None
+
+
+def load_dates(path: Path) -> list[tuple[str, str]]:
+    rows = []
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if row.get("source") != "archive_2":
+                continue
+            invoice = (row.get("json_data") or {}).get("invoice", {})
+            value = invoice.get("invoice_date")
+            if value:
+                rows.append((str(value), str(invoice.get("seller_name", ""))))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--manifest", required=True, help="Manifest/split JSONL with archive_2 rows")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes over the dates (exercises the memo)")
+    args = parser.parse_args()
+
+    rows = load_dates(Path(args.manifest))
+    if not rows:
+        raise SystemExit("No archive_2 invoice dates found.")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        expected = [reference(v) for v, _ in rows]
+    ref_s = time.perf_counter() - start
+
+    formats = dates.VendorDateFormats.learn((vendor, value) for value, vendor in rows)
+
+    fast_hits = sum(1 for v, _ in rows if dates._fast_parse(v.strip(), None) is not None)
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        got = [dates.parse_date(v, vendor=vendor, formats=formats) for v, vendor in rows]
+    new_s = time.perf_counter() - start
+
+    agree = sum(1 for a, b in zip(expected, got) if a == b)
+    unhinted = [dates.parse_date_hinted(v) for v, _ in rows]
+    agree_unhinted = sum(1 for a, b in zip(expected, unhinted) if a == b)
+    hinted = [(v, a, b) for (v, _), a, b in zip(rows, expected, got) if a != b]
+    print(
+        f"dates={len(rows)} unique={len(set(v for v, _ in rows))} repeat={args.repeat} "
+        f"dateutil={ref_s:.3f}s layered={new_s:.3f}s speedup={ref_s / new_s:.1f}x"
+    )
+    print(
+        f"fast_path_rate={fast_hits / len(rows):.3f} agreement={agree / len(rows):.4f} "
+        f"agreement_without_vendor_hints={agree_unhinted / len(rows):.4f} "
+        f"memo_hits_misses={dates.cache_info()}"
+    )
+    for value, old, new in hinted[:10]:
+        print(f"  differs: {value!r} dateutil={old} layered={new}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.vendors import VendorDB  # noqa: E402
+
+SYLLABLES = [
+    "ac", "me", "zen", "tro", "vix", "lum", "ora", "nex", "pro", "cal", "der", "ion",
+    "sto", "mar", "tek", "quo", "bel", "rin", "fal", "gor", "hal", "jin", "kor", "lyn",
+    "bra", "cy", "dom", "eph", "fin", "gue", "hyp", "iv", "jo", "kel", "lox", "mun",
+    "nor", "oph", "pax", "qui", "ros", "sy", "tav", "ul", "ven", "wex", "xan", "yor",
+]
+SECTORS = ["Logistics", "Foods", "Systems", "Traders", "Supplies", "Pharma", "Textiles", "Metals"]
+SUFFIXES = ["Corporation", "Corp.", "Ltd", "Limited", "Inc", "LLC", "Pvt Ltd", "Co."]
+
+
+def make_name(rng: random.Random) -> str:
+    word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+    return f"{word} {rng.choice(SECTORS)} {rng.choice(SUFFIXES)}"
+
+
+def add_noise(name: str, rng: random.Random) -> str:
+    noisy = name.upper() if rng.random() < 0.3 else name
+    noisy = noisy.replace("Corporation", "Corp.").replace("Limited", "Ltd.")
+    if rng.random() < 0.5:
+        pos = rng.randrange(len(noisy))
+        noisy = noisy[:pos] + rng.choice(string.ascii_lowercase) + noisy[pos + 1 :]
+    return noisy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vendors", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = [make_name(rng) for _ in range(args.vendors)]
+    db = VendorDB.from_frame(pd.DataFrame({"vendor_name": names}))
+
+    start = time.perf_counter()
+    db.build_fuzzy_index()
+    print(f"vendors={args.vendors} index_build={time.perf_counter() - start:.2f}s")
+
+    targets = [rng.choice(names) for _ in range(args.queries)]
+    queries = [add_noise(t, rng) for t in targets]
+
+    latencies = []
+    found = correct = 0
+    for query, target in zip(queries, targets):
+        start = time.perf_counter()
+        match = db.find_vendor_fuzzy(query, args.threshold)
+        latencies.append(time.perf_counter() - start)
+        if match is not None:
+            found += 1
+            correct += match.record.vendor_name.lower() == target.lower()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(
+        f"queries={args.queries} threshold={args.threshold} p50={p50:.3f}ms p99={p99:.3f}ms "
+        f"found={found / args.queries:.3f} same_name={correct / args.queries:.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import argparse
+import functools
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.pipeline.ocr import OcrEngine  # noqa: E402
+
+
+class StubOcr:
+    """CPU-bound PaddleOCR stand-in: burns `ms` of CPU per image and reports its byte size.
+
+    Lets the pool's scaling be measured without PaddleOCR installed.
+    """
+
+    def __init__(self, ms: float, lang: str, threads: int | None) -> None:
+        self.seconds = ms / 1000.0
+
+    def ocr(self, image, cls: bool = True):
+        deadline = time.process_time() + self.seconds
+        while time.process_time() < deadline:
+            pass
+        # Paths reach the engine undecoded, like they do with PaddleOCR.
+        size = os.path.getsize(image) if isinstance(image, str) else image.nbytes
+        return [[[None, (f"{size} bytes", 1.0)]]]
+
+
+def load_image_paths(path: Path, limit: int) -> list[str]:
+    if path.is_dir():
+        paths = sorted(
+            str(p.as_posix())
+            for p in path.iterdir()
+            if p.suffix.lower() in {".png", ".jpg", ".jpeg"}
+        )
+    else:
+        paths = []
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    paths.append(json.loads(line)["image_path"])
+    return paths[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", required=True, help="Image directory or JSONL manifest")
+    parser.add_argument("--workers", default=f"0,1,2,4,{os.cpu_count() or 1}")
+    parser.add_argument("--limit", type=int, default=64)
+    parser.add_argument(
+        "--stub_ms",
+        type=float,
+        default=None,
+        help="Replace PaddleOCR with a stub burning this much CPU per image",
+    )
+    args = parser.parse_args()
+    factory = functools.partial(StubOcr, args.stub_ms) if args.stub_ms is not None else None
+
+    image_paths = load_image_paths(Path(args.images), args.limit)
+    if not image_paths:
+        raise SystemExit("No images found.")
+
+    baseline_rate = None
+    single_rate = None
+    reference = None
+    for workers in sorted({int(w) for w in args.workers.split(",")}):
+        engine = OcrEngine(workers=workers, engine_factory=factory)
+        # Untimed warm-up: spawns the workers and builds their PaddleOCR models.
+        engine.extract_text_batch(image_paths[: max(1, workers) * 2], return_exceptions=True)
+        start = time.perf_counter()
+        results = engine.extract_text_batch(image_paths, return_exceptions=True)
+        elapsed = time.perf_counter() - start
+        engine.close()
+
+        failed = sum(1 for r in results if isinstance(r, Exception))
+        if reference is None:
+            reference = results
+        same = sum(1 for a, b in zip(reference, results) if a == b)
+        rate = len(image_paths) / elapsed
+        if baseline_rate is None:
+            baseline_rate = rate
+        if workers == 1:
+            single_rate = rate
+        speedup = rate / baseline_rate
+        label = workers or "in-process"
+        # Scaling efficiency against one worker process; 1.0 is perfectly linear.
+        efficiency = ""
+        if workers and single_rate:
+            efficiency = f" efficiency={rate / (single_rate * workers):.2f}"
+        print(
+            f"workers={label} images={len(image_paths)} seconds={elapsed:.2f} "
+            f"images_per_sec={rate:.2f} speedup={speedup:.2f}x{efficiency} "
+            f"failed={failed} same_text_as_first={same}/{len(image_paths)}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from evaluate_extraction import FIELDS, evaluate, load_jsonl  # noqa: E402
+from src.pipeline.extractor import StructuredExtractor  # noqa: E402
+from src.pipeline.preprocess import ImagePreprocessor, PreprocessConfig  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--manifest", required=True, help="Split JSONL with labeled archive_2 rows")
+    parser.add_argument("--model_name", default="Qwen/Qwen2-VL-2B-Instruct")
+    parser.add_argument(
+        "--visual_tokens",
+        default="0,2048,1024,512,256",
+        help="Budgets to compare; 0 means the raw image without preprocessing",
+    )
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--max_batch_size", type=int, default=4)
+    parser.add_argument("--keep_color", action="store_true")
+    parser.add_argument("--out_dir", default=None, help="Keep per-budget predictions JSONL here")
+    args = parser.parse_args()
+
+    rows = [
+        r
+        for r in load_jsonl(Path(args.manifest))
+        if r.get("source") == "archive_2" and r.get("labeled")
+    ][: args.limit]
+    if not rows:
+        raise SystemExit("No labeled archive_2 rows found.")
+    image_paths = [r["image_path"] for r in rows]
+    out_dir = Path(args.out_dir or tempfile.mkdtemp(prefix="bench-preprocess-"))
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    extractor = StructuredExtractor(model_name=args.model_name, max_batch_size=args.max_batch_size)
+    for tokens in [int(t) for t in args.visual_tokens.split(",")]:
+        start = time.perf_counter()
+        if tokens > 0:
+            preprocessor = ImagePreprocessor(
+                PreprocessConfig.for_visual_tokens(tokens, grayscale=not args.keep_color),
+                cache_dir=str(out_dir / f"images_{tokens}"),
+            )
+            work_paths = [preprocessor(p) for p in image_paths]
+        else:
+            work_paths = list(image_paths)
+        prep_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        preds = []
+        for i in range(0, len(work_paths), args.max_batch_size):
+            chunk = work_paths[i : i + args.max_batch_size]
+            try:
+                invoices = extractor.extract_batch(chunk, [""] * len(chunk))
+            except Exception:
+                invoices = [None] * len(chunk)
+            for original, invoice in zip(image_paths[i : i + len(chunk)], invoices):
+                preds.append(
+                    {
+                        "image_path": original,
+                        "extracted_json": asdict(invoice) if invoice is not None else {},
+                    }
+                )
+        model_s = time.perf_counter() - start
+
+        pred_path = out_dir / f"predictions_{tokens or 'raw'}.jsonl"
+        with pred_path.open("w", encoding="utf-8") as f:
+            for pred in preds:
+                f.write(json.dumps(pred, ensure_ascii=False) + "\n")
+        metrics = evaluate(rows, preds)
+        if not metrics["samples"]:
+            print(f"visual_tokens={tokens or 'raw'} no matching labeled rows to score")
+            continue
+        mean_acc = sum(metrics[f"{f}_accuracy"] for f in FIELDS) / len(FIELDS)
+        print(
+            f"visual_tokens={tokens or 'raw'} images={len(rows)} "
+            f"preprocess_s={prep_s:.2f} extract_s={model_s:.2f} "
+            f"sec_per_invoice={(prep_s + model_s) / len(rows):.3f} "
+            f"mean_field_accuracy={mean_acc:.4f} line_items_f1={metrics['line_items_f1']:.4f} "
+            f"predictions={pred_path}"
+        )
+
+
+if __name__ == "__main__":
+    main()
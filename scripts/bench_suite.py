@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from generate_corpus import generate_corpus  # noqa: E402
+from src.main import Auditor  # noqa: E402
+from src.models.types import AuditReport  # noqa: E402
+from src.pipeline.bulk import BulkAuditor  # noqa: E402
+from src.pipeline.compliance import ComplianceEngine  # noqa: E402
+from src.pipeline.extractor import to_invoice  # noqa: E402
+from src.pipeline.replay import ReplayOcrEngine, replay_model_factory  # noqa: E402
+from src.pipeline.report import render_report  # noqa: E402
+from src.pipeline.validator import LogicalValidator  # noqa: E402
+from src.risk.engine import RiskEngine  # noqa: E402
+from src.utils.parse import extract_json_block  # noqa: E402
+from src.utils.policy import PolicyRegistry  # noqa: E402
+from src.utils.profiling import get_profiler  # noqa: E402
+from src.utils.seen import SeenInvoiceIndex  # noqa: E402
+from src.utils.vendors import VendorDB  # noqa: E402
+
+# Injected pattern -> flag the rules are expected to raise for it.
+EXPECTED_FLAG = {
+    "wrong_total": "total_mismatch",
+    "duplicate": "duplicate_invoice",
+    "out_of_contract_date": "date_outside_contract",
+    "unknown_vendor": "vendor_not_found",
+    "tax_rate": "tax_rate_unusual",
+}
+
+
+def load_rows(manifest: Path, limit: int) -> list[dict]:
+    rows = []
+    with manifest.open("r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rows.append(json.loads(line))
+    return rows[:limit] if limit else rows
+
+
+def time_calls(name: str, fn: Callable[[Any], Any], args: list[Any]) -> dict:
+    durations = np.empty(len(args))
+    for i, arg in enumerate(args):
+        start = time.perf_counter()
+        fn(arg)
+        durations[i] = time.perf_counter() - start
+    total = float(durations.sum())
+    return {
+        "component": name,
+        "calls": len(args),
+        "ops_per_sec": round(len(args) / total, 1) if total > 0 else 0.0,
+        "mean_us": round(float(durations.mean()) * 1e6, 2),
+        "p99_us": round(float(np.percentile(durations, 99)) * 1e6, 2),
+    }
+
+
+def bench_components(rows: list[dict], vendor_db: VendorDB, registry: PolicyRegistry) -> list[dict]:
+    invoices = [to_invoice(row["invoice"]) for row in rows]
+    policies = [registry.resolve(inv.vendor_name, inv.invoice_date) for inv in invoices]
+    validator = LogicalValidator()
+    risk_engine = RiskEngine()
+    compliance = ComplianceEngine()
+    flags = [
+        validator.validate(inv, vendor_db=vendor_db, policy=policy)
+        for inv, policy in zip(invoices, policies)
+    ]
+    risks = [risk_engine.score(f) for f in flags]
+    outputs = [
+        f"Here is the extracted invoice:\n```json\n{json.dumps(row['invoice'])}\n```" for row in rows
+    ]
+    reports = [
+        AuditReport(
+            invoice=inv,
+            flags=f,
+            risk=risk,
+            compliance=compliance.evaluate(inv, policy=policy, vendor_db=vendor_db, flags=f),
+            raw_text=row["ocr_text"],
+        )
+        for inv, f, risk, policy, row in zip(invoices, flags, risks, policies, rows)
+    ]
+    triples = list(zip(invoices, policies, flags))
+    return [
+        time_calls("VendorDB.lookup", vendor_db.lookup, [inv.vendor_name for inv in invoices]),
+        time_calls(
+            "LogicalValidator.validate",
+            lambda a: validator.validate(a[0], vendor_db=vendor_db, policy=a[1]),
+            triples,
+        ),
+        time_calls("RiskEngine.score", risk_engine.score, flags),
+        time_calls(
+            "ComplianceEngine.evaluate",
+            lambda a: compliance.evaluate(a[0], policy=a[1], vendor_db=vendor_db, flags=a[2]),
+            triples,
+        ),
+        time_calls("extract_json_block", extract_json_block, outputs),
+        time_calls(
+            "report.json", lambda r: json.dumps(asdict(r), ensure_ascii=False), reports
+        ),
+        time_calls("report.render", render_report, reports),
+    ]
+
+
+def build_auditor(
+    rows: list[dict], registry: PolicyRegistry, seen_path: str, batch_size: int, latency: float
+) -> Auditor:
+    answers = {row["image_path"]: row["invoice"] for row in rows}
+    texts = {row["image_path"]: row["ocr_text"] for row in rows}
+    return Auditor(
+        model_name="replay",
+        max_batch_size=batch_size,
+        seen_index=SeenInvoiceIndex(seen_path),
+        policy_registry=registry,
+        model_factory=replay_model_factory(answers, latency=latency),
+        ocr_engine=ReplayOcrEngine(texts),
+    )
+
+
+def bench_end_to_end(
+    rows: list[dict],
+    vendor_db: VendorDB,
+    registry: PolicyRegistry,
+    batch_size: int,
+    latency: float,
+    workers: int,
+) -> list[dict]:
+    results = []
+    profiler = get_profiler()
+    with tempfile.TemporaryDirectory() as tmp:
+        # run_batch: the in-process API, one model batch at a time.
+        auditor = build_auditor(rows, registry, f"{tmp}/seen_batch.sqlite", batch_size, latency)
+        profiler.reset()
+        profiler.enabled = True
+        detected = {pattern: [0, 0] for pattern in EXPECTED_FLAG}
+        start = time.perf_counter()
+        for i in range(0, len(rows), batch_size):
+            chunk = rows[i : i + batch_size]
+            reports = auditor.run_batch([r["image_path"] for r in chunk], vendor_db=vendor_db)
+            for row, report in zip(chunk, reports):
+                if row.get("fraud") in detected:
+                    hit = getattr(report.flags, EXPECTED_FLAG[row["fraud"]])
+                    detected[row["fraud"]][0] += int(hit)
+                    detected[row["fraud"]][1] += 1
+        elapsed = time.perf_counter() - start
+        profiler.enabled = False
+        results.append(
+            {
+                "mode": "run_batch",
+                "invoices": len(rows),
+                "invoices_per_sec": round(len(rows) / elapsed, 2) if elapsed > 0 else 0.0,
+                "stages": {
+                    name: {"mean_ms": s["mean_ms"], "seconds": s["seconds"]}
+                    for name, s in profiler.snapshot()["stages"].items()
+                },
+                "fraud_detected": {
+                    p: f"{hit}/{n}" for p, (hit, n) in detected.items() if n
+                },
+            }
+        )
+
+        # BulkAuditor: the --manifest path with its stage pools and queues.
+        auditor = build_auditor(rows, registry, f"{tmp}/seen_bulk.sqlite", batch_size, latency)
+        bulk = BulkAuditor(auditor, vendor_db=vendor_db, workers=workers)
+        summary = bulk.run(rows, f"{tmp}/bulk.jsonl")
+        results.append(
+            {
+                "mode": "bulk",
+                "invoices": summary.processed,
+                "failed": summary.failed,
+                "invoices_per_sec": round(summary.invoices_per_sec, 2),
+            }
+        )
+    return results
+
+
+def check_baseline(results: dict, baseline_path: str, tolerance: float) -> list[str]:
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    old = {c["component"]: c["ops_per_sec"] for c in baseline.get("components", [])}
+    old.update({e["mode"]: e["invoices_per_sec"] for e in baseline.get("end_to_end", [])})
+    new = {c["component"]: c["ops_per_sec"] for c in results["components"]}
+    new.update({e["mode"]: e["invoices_per_sec"] for e in results["end_to_end"]})
+    return [
+        f"{name}: {new[name]} vs baseline {old[name]}"
+        for name in sorted(new)
+        if name in old and new[name] < old[name] * (1.0 - tolerance)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Offline pipeline benchmark on a synthetic corpus with replayed model/OCR output."
+    )
+    parser.add_argument("--corpus", default="data/synth", help="Corpus dir (generated if missing)")
+    parser.add_argument("--invoices", type=int, default=2000, help="Corpus size when generating")
+    parser.add_argument("--vendors", type=int, default=100_000, help="Vendor master size when generating")
+    parser.add_argument("--limit", type=int, default=0, help="Use only the first N invoices")
+    parser.add_argument("--batch_size", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--model_latency_ms", type=float, default=0.0, help="Simulated model cost per invoice"
+    )
+    parser.add_argument("--skip_end_to_end", action="store_true")
+    parser.add_argument("--out", required=False, help="Write results JSON here")
+    parser.add_argument("--baseline", required=False, help="Earlier --out file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed throughput drop (0-1)")
+    args = parser.parse_args()
+
+    corpus = Path(args.corpus)
+    manifest = corpus / "manifest.jsonl"
+    if not manifest.exists():
+        generate_corpus(corpus, invoices=args.invoices, vendors=args.vendors)
+    rows = load_rows(manifest, args.limit)
+    if not rows:
+        raise SystemExit("Corpus is empty.")
+
+    start = time.perf_counter()
+    vendor_db = VendorDB(str(corpus / "vendors.csv"))
+    registry = PolicyRegistry.from_csv(str(corpus / "contracts.csv"))
+    print(json.dumps({"setup": "load vendors+contracts", "seconds": round(time.perf_counter() - start, 3)}))
+
+    results: dict[str, Any] = {"invoices": len(rows), "components": [], "end_to_end": []}
+    for entry in bench_components(rows, vendor_db, registry):
+        results["components"].append(entry)
+        print(json.dumps(entry))
+
+    if not args.skip_end_to_end:
+        if not Path(rows[0]["image_path"]).exists():
+            raise SystemExit("Corpus has no images; regenerate it with images or pass --skip_end_to_end.")
+        for entry in bench_end_to_end(
+            rows,
+            vendor_db,
+            registry,
+            args.batch_size,
+            args.model_latency_ms / 1000.0,
+            args.workers,
+        ):
+            results["end_to_end"].append(entry)
+            print(json.dumps(entry))
+
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.baseline:
+        regressions = check_baseline(results, args.baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
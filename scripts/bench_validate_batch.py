@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.models.columns import InvoiceColumns, flags_from_arrays  # noqa: E402
+from src.models.types import Invoice, LineItem  # noqa: E402
+from src.pipeline.validator import LogicalValidator  # noqa: E402
+from src.utils.policy import Policy  # noqa: E402
+from src.utils.vendors import VendorDB  # noqa: E402
+
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%b %d, %Y", "%d.%m.%Y"]
+
+
+def make_invoices(n: int, vendors: list[str], seed: int) -> list[Invoice]:
+    rng = random.Random(seed)
+    invoices = []
+    for i in range(n):
+        items = [
+            LineItem(
+                name=f"item {j}",
+                qty=float(rng.randint(1, 20)),
+                unit_price=round(rng.uniform(0.5, 15000.0 if rng.random() < 0.05 else 500.0), 2),
+            )
+            for j in range(rng.randint(0, 8))
+        ]
+        subtotal = sum(item.qty * item.unit_price for item in items)
+        if rng.random() < 0.1:
+            subtotal += rng.choice([0.005, 0.02, 5.0])
+        tax = round(subtotal * rng.choice([0.1, 0.1, 0.18, 0.05]), 2)
+        total = subtotal + tax + (rng.choice([0.0, 0.01, 10.0]) if rng.random() < 0.1 else 0.0)
+        day = pd.Timestamp("2019-01-01") + pd.Timedelta(days=rng.randint(0, 3650))
+        invoices.append(
+            Invoice(
+                invoice_number=f"INV-{rng.randint(0, n):07d}",
+                vendor_name=rng.choice(vendors) if rng.random() < 0.9 else f"Unknown {i}",
+                invoice_date="" if rng.random() < 0.02 else day.strftime(rng.choice(DATE_FORMATS)),
+                line_items=items,
+                subtotal=subtotal,
+                tax=tax,
+                total=total,
+            )
+        )
+    return invoices
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--invoices", type=int, default=100_000)
+    parser.add_argument("--vendors", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    vendor_names = [f"Vendor {i} Ltd" for i in range(args.vendors)]
+    vendor_db = VendorDB.from_frame(
+        pd.DataFrame(
+            {
+                "vendor_name": vendor_names,
+                "gst_number": [f"GST{i:06d}" if i % 50 else "bad" for i in range(args.vendors)],
+                "invoice_number": [f"INV-{i * 7:07d}" for i in range(args.vendors)],
+            }
+        )
+    )
+    policy = Policy(start_date="2020-01-01", end_date="2026-12-31", allowed_tax_rate=10.0)
+    invoices = make_invoices(args.invoices, vendor_names, args.seed)
+    validator = LogicalValidator()
+
+    start = time.perf_counter()
+    scalar = [validator.validate(inv, vendor_db=vendor_db, policy=policy) for inv in invoices]
+    scalar_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns = InvoiceColumns.from_invoices(invoices)
+    convert_s = time.perf_counter() - start
+    start = time.perf_counter()
+    arrays = validator.validate_batch(columns, vendor_db=vendor_db, policy=policy)
+    batch_s = time.perf_counter() - start
+
+    vectorized = flags_from_arrays(arrays)
+    mismatches = sum(1 for a, b in zip(scalar, vectorized) if a != b)
+    print(
+        f"invoices={len(invoices)} scalar={scalar_s:.2f}s "
+        f"columnar_convert={convert_s:.2f}s validate_batch={batch_s:.2f}s "
+        f"speedup={scalar_s / batch_s:.1f}x parity_mismatches={mismatches}"
+    )
+    if mismatches:
+        raise SystemExit("validate_batch disagrees with validate")
+
+
+if __name__ == "__main__":
+    main()
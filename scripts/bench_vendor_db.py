@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.utils.vendors import VendorDB  # noqa: E402
+
+
+def make_frame(rows: int, seed: int) -> pd.DataFrame:
+    rng = random.Random(seed)
+    return pd.DataFrame(
+        {
+            "vendor_id": range(rows),
+            "vendor_name": [f"Vendor {i:07d} Ltd" for i in range(rows)],
+            "gst_number": [f"GST{rng.randint(100000, 999999)}" for _ in range(rows)],
+            "invoice_number": [f"INV-{i:08d}" for i in range(rows)],
+        }
+    )
+
+
+def legacy_find_vendor(df: pd.DataFrame, name: str):
+    matches = df[df["vendor_name"].str.lower() == str(name).strip().lower()]
+    if matches.empty:
+        return None
+    return matches.iloc[0]["vendor_name"]
+
+
+def legacy_has_invoice_number(df: pd.DataFrame, invoice_number: str) -> bool:
+    return bool((df["invoice_number"].astype(str).str.strip() == str(invoice_number).strip()).any())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--legacy_queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    for rows in [int(s) for s in args.sizes.split(",")]:
+        df = make_frame(rows, args.seed)
+        rng = random.Random(args.seed)
+        names = [f"vendor {rng.randrange(rows * 2):07d} ltd" for _ in range(args.queries)]
+        invoices = [f"INV-{rng.randrange(rows * 2):08d}" for _ in range(args.queries)]
+
+        start = time.perf_counter()
+        db = VendorDB.from_frame(df)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        indexed = [db.find_vendor(n) for n in names]
+        dupes = [db.has_invoice_number(i) for i in invoices]
+        indexed_per_call = (time.perf_counter() - start) / (2 * len(names))
+
+        n_legacy = min(args.legacy_queries, len(names))
+        start = time.perf_counter()
+        legacy = [legacy_find_vendor(df, n) for n in names[:n_legacy]]
+        legacy_dupes = [legacy_has_invoice_number(df, i) for i in invoices[:n_legacy]]
+        legacy_per_call = (time.perf_counter() - start) / (2 * n_legacy)
+
+        agree = all(
+            (a.vendor_name if a else None) == b for a, b in zip(indexed[:n_legacy], legacy)
+        ) and dupes[:n_legacy] == legacy_dupes
+        print(
+            f"rows={rows} build={build * 1000:.1f}ms "
+            f"legacy={legacy_per_call * 1e6:.1f}us/call indexed={indexed_per_call * 1e6:.2f}us/call "
+            f"speedup={legacy_per_call / indexed_per_call:.0f}x agree={agree}"
+        )
+
+
+if __name__ == "__main__":
+    main()
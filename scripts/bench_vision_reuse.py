@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.main import Auditor  # noqa: E402
+
+
+def load_image_paths(path: Path, limit: int) -> list[str]:
+    if path.is_dir():
+        paths = sorted(
+            str(p.as_posix())
+            for p in path.iterdir()
+            if p.suffix.lower() in {".png", ".jpg", ".jpeg"}
+        )
+    else:
+        paths = []
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    paths.append(json.loads(line)["image_path"])
+    return paths[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", required=True, help="Image directory or JSONL manifest")
+    parser.add_argument("--model_name", default="Qwen/Qwen2-VL-2B-Instruct")
+    parser.add_argument("--max_batch_size", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=16)
+    args = parser.parse_args()
+
+    image_paths = load_image_paths(Path(args.images), args.limit)
+    if not image_paths:
+        raise SystemExit("No images found.")
+
+    auditor = Auditor(
+        model_name=args.model_name, use_ocr=False, max_batch_size=args.max_batch_size
+    )
+    stages = {"extract": auditor.extractor.model, "risk": auditor.vlm.model}
+    for reuse in (False, True):
+        for model in stages.values():
+            model.reuse_vision = reuse
+            model._handle.vision_cache.clear()
+        before = {name: dict(model.stats) for name, model in stages.items()}
+        start = time.perf_counter()
+        auditor.run_batch(image_paths)
+        elapsed = time.perf_counter() - start
+        parts = [f"reuse_vision={reuse} invoices={len(image_paths)} total_s={elapsed:.2f}"]
+        for name, model in stages.items():
+            delta = {k: model.stats[k] - before[name][k] for k in model.stats}
+            parts.append(
+                f"{name}_s={delta['seconds']:.2f} {name}_vision_s={delta['vision_seconds']:.2f} "
+                f"{name}_encoded={delta['images_encoded']} {name}_reused={delta['images_reused']}"
+            )
+        print(" ".join(parts))
+
+
+if __name__ == "__main__":
+    main()
@@ -111,18 +111,13 @@ def field_accuracy(gt: dict, pred: dict, field: str) -> float:
     return 1.0 if normalize_text(gt_val) == normalize_text(pred_val) else 0.0
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--ground_truth", required=True)
-    parser.add_argument("--predictions", required=True)
-    args = parser.parse_args()
+FIELDS = ["invoice_number", "vendor_name", "invoice_date", "subtotal", "tax", "total"]
+
 
-    gt_rows = load_jsonl(Path(args.ground_truth))
-    pred_rows = load_jsonl(Path(args.predictions))
+def evaluate(gt_rows: list[dict], pred_rows: list[dict]) -> dict[str, float]:
     pred_map = {r["image_path"]: r for r in pred_rows if "image_path" in r}
 
-    fields = ["invoice_number", "vendor_name", "invoice_date", "subtotal", "tax", "total"]
-    totals = {f: 0.0 for f in fields}
+    totals = {f: 0.0 for f in FIELDS}
     count = 0
     f1_total = 0.0
 
@@ -135,18 +130,34 @@ def main() -> None:
         gt = gt_to_target_schema(row.get("json_data", {}))
         pred = pred_map[img].get("extracted_json", {})
 
-        for f in fields:
+        for f in FIELDS:
             totals[f] += field_accuracy(gt, pred, f)
         f1_total += item_f1(gt.get("line_items", []), pred.get("line_items", []))
         count += 1
 
     if count == 0:
+        return {"samples": 0}
+    metrics: dict[str, float] = {"samples": count}
+    for f in FIELDS:
+        metrics[f"{f}_accuracy"] = totals[f] / count
+    metrics["line_items_f1"] = f1_total / count
+    return metrics
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ground_truth", required=True)
+    parser.add_argument("--predictions", required=True)
+    args = parser.parse_args()
+
+    metrics = evaluate(load_jsonl(Path(args.ground_truth)), load_jsonl(Path(args.predictions)))
+    if not metrics["samples"]:
         raise SystemExit("No matching labeled rows found for evaluation.")
 
-    print(f"Samples: {count}")
-    for f in fields:
-        print(f"{f}_accuracy: {totals[f] / count:.4f}")
-    print(f"line_items_f1: {f1_total / count:.4f}")
+    print(f"Samples: {metrics['samples']}")
+    for f in FIELDS:
+        print(f"{f}_accuracy: {metrics[f + '_accuracy']:.4f}")
+    print(f"line_items_f1: {metrics['line_items_f1']:.4f}")
 
 
 if __name__ == "__main__":
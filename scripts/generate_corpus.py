@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+from datetime import date, timedelta
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+FRAUD_PATTERNS = ["wrong_total", "duplicate", "out_of_contract_date", "unknown_vendor", "tax_rate"]
+PRODUCTS = ["Widget", "Cable", "Adapter", "Service hour", "License", "Toner", "Paper ream", "Bolt"]
+SUFFIXES = ["Ltd", "LLC", "Inc", "GmbH", "Traders", "Supplies", "Corp"]
+CONTRACT_TAX_RATES = [5.0, 10.0, 18.0]
+
+
+def vendor_name(i: int) -> str:
+    return f"Vendor {i:06d} {SUFFIXES[i % len(SUFFIXES)]}"
+
+
+def contract_window(i: int) -> tuple[date, date]:
+    start = date(2020, 1, 1) + timedelta(days=(i * 37) % 730)
+    return start, start + timedelta(days=730 + (i * 11) % 365)
+
+
+def contract_tax_rate(i: int) -> float:
+    return CONTRACT_TAX_RATES[i % len(CONTRACT_TAX_RATES)]
+
+
+def write_vendors(path: Path, n: int) -> None:
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["vendor_id", "vendor_name", "gst_number"])
+        for i in range(n):
+            # Every 50th vendor carries a malformed GST number.
+            writer.writerow([i + 1, vendor_name(i), "GST-??" if i % 50 == 49 else f"GST{i:08d}"])
+
+
+def write_contracts(path: Path, vendor_ids: list[int]) -> None:
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["vendor_name", "contract_id", "contract_text"])
+        writer.writerow(["", "default", "Effective: 2020-01-01 to 2026-12-31\nTax rate: 10%"])
+        for i in vendor_ids:
+            start, end = contract_window(i)
+            writer.writerow(
+                [
+                    vendor_name(i),
+                    f"C-{i:06d}",
+                    f"Effective: {start.isoformat()} to {end.isoformat()}\n"
+                    f"Tax rate: {contract_tax_rate(i):g}%",
+                ]
+            )
+
+
+def make_invoice(rng: random.Random, number: int, vendor: int, max_items: int) -> dict:
+    start, end = contract_window(vendor)
+    day = start + timedelta(days=rng.randint(0, (end - start).days))
+    items = [
+        {
+            "name": rng.choice(PRODUCTS),
+            "qty": float(rng.randint(1, 20)),
+            "unit_price": round(rng.uniform(1.0, 500.0), 2),
+        }
+        for _ in range(rng.randint(1, max_items))
+    ]
+    subtotal = round(sum(it["qty"] * it["unit_price"] for it in items), 2)
+    tax = round(subtotal * contract_tax_rate(vendor) / 100.0, 2)
+    return {
+        "invoice_number": f"INV-{number:07d}",
+        "vendor_name": vendor_name(vendor),
+        "invoice_date": day.isoformat(),
+        "line_items": items,
+        "subtotal": subtotal,
+        "tax": tax,
+        "total": round(subtotal + tax, 2),
+    }
+
+
+def inject_fraud(
+    rng: random.Random, invoice: dict, pattern: str, vendor: int, earlier: list[dict]
+) -> dict:
+    if pattern == "wrong_total":
+        invoice["total"] = round(invoice["total"] + rng.choice([1.0, 15.0, 250.0]), 2)
+    elif pattern == "duplicate" and earlier:
+        invoice = json.loads(json.dumps(rng.choice(earlier)))
+    elif pattern == "out_of_contract_date":
+        _, end = contract_window(vendor)
+        invoice["invoice_date"] = (end + timedelta(days=rng.randint(1, 90))).isoformat()
+    elif pattern == "unknown_vendor":
+        invoice["vendor_name"] = f"Unlisted Trading {rng.randint(0, 10**6):06d}"
+    elif pattern == "tax_rate":
+        invoice["tax"] = round(invoice["subtotal"] * 0.25, 2)
+        invoice["total"] = round(invoice["subtotal"] + invoice["tax"], 2)
+    return invoice
+
+
+def ocr_text(invoice: dict) -> str:
+    lines = [
+        f"Vendor: {invoice['vendor_name']}",
+        f"Invoice No: {invoice['invoice_number']}",
+        f"Date: {invoice['invoice_date']}",
+    ]
+    lines += [f"{it['name']} {it['qty']:g} x {it['unit_price']:.2f}" for it in invoice["line_items"]]
+    lines += [
+        f"Subtotal: {invoice['subtotal']:.2f}",
+        f"Tax: {invoice['tax']:.2f}",
+        f"Total: {invoice['total']:.2f}",
+    ]
+    return "\n".join(lines)
+
+
+def render_image(text: str, path: Path) -> None:
+    image = Image.new("L", (850, 1100), 255)
+    draw = ImageDraw.Draw(image)
+    for row, line in enumerate(text.splitlines()):
+        draw.text((60, 60 + row * 22), line, fill=0)
+    image.save(path, format="PNG")
+
+
+def to_json_data(invoice: dict) -> dict:
+    # archive_2 layout, so scripts/evaluate_extraction.py can score predictions.
+    return {
+        "invoice": {
+            "invoice_number": invoice["invoice_number"],
+            "seller_name": invoice["vendor_name"],
+            "invoice_date": invoice["invoice_date"],
+        },
+        "items": [
+            {
+                "description": it["name"],
+                "quantity": it["qty"],
+                "total_price": round(it["qty"] * it["unit_price"], 2),
+            }
+            for it in invoice["line_items"]
+        ],
+        "subtotal": {"tax": invoice["tax"], "total": invoice["total"]},
+    }
+
+
+def generate_corpus(
+    out_dir: Path,
+    invoices: int = 1000,
+    vendors: int = 100_000,
+    active_vendors: int = 2000,
+    max_items: int = 12,
+    fraud_rate: float = 0.2,
+    images: bool = True,
+    seed: int = 0,
+) -> Path:
+    """Write manifest.jsonl, vendors.csv, contracts.csv and (optionally) images under out_dir.
+
+    Manifest rows carry the ground-truth `invoice`, its `ocr_text` and the
+    injected `fraud` pattern (or null). Returns the manifest path.
+    """
+    rng = random.Random(seed)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    image_dir = out_dir / "images"
+    if images:
+        image_dir.mkdir(exist_ok=True)
+    active = rng.sample(range(vendors), min(active_vendors, vendors))
+    write_vendors(out_dir / "vendors.csv", vendors)
+    write_contracts(out_dir / "contracts.csv", sorted(active))
+
+    manifest = out_dir / "manifest.jsonl"
+    earlier: list[dict] = []
+    with manifest.open("w", encoding="utf-8") as f:
+        for n in range(invoices):
+            vendor = rng.choice(active)
+            invoice = make_invoice(rng, n, vendor, max_items)
+            pattern = rng.choice(FRAUD_PATTERNS) if rng.random() < fraud_rate else None
+            if pattern == "duplicate" and not earlier:
+                pattern = None
+            if pattern is not None:
+                invoice = inject_fraud(rng, invoice, pattern, vendor, earlier)
+            else:
+                earlier.append(invoice)
+            text = ocr_text(invoice)
+            image_path = image_dir / f"inv_{n:07d}.png"
+            if images:
+                render_image(text, image_path)
+            row = {
+                "image_path": image_path.as_posix(),
+                "invoice": invoice,
+                "json_data": to_json_data(invoice),
+                "ocr_text": text,
+                "fraud": pattern,
+                "source": "synthetic",
+                "labeled": True,
+            }
+            f.write(json.dumps(row) + "\n")
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic invoice corpus with vendor master and contracts."
+    )
+    parser.add_argument("--out_dir", default="data/synth")
+    parser.add_argument("--invoices", type=int, default=1000)
+    parser.add_argument("--vendors", type=int, default=100_000)
+    parser.add_argument("--active_vendors", type=int, default=2000)
+    parser.add_argument("--max_items", type=int, default=12)
+    parser.add_argument("--fraud_rate", type=float, default=0.2)
+    parser.add_argument("--no_images", action="store_true", help="Skip rendering PNGs")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    manifest = generate_corpus(
+        Path(args.out_dir),
+        invoices=args.invoices,
+        vendors=args.vendors,
+        active_vendors=args.active_vendors,
+        max_items=args.max_items,
+        fraud_rate=args.fraud_rate,
+        images=not args.no_images,
+        seed=args.seed,
+    )
+    print(f"Wrote {args.invoices} invoices -> {manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.pipeline.reaudit import iter_reports  # noqa: E402
+from src.utils.dates import VendorDateFormats  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Learn per-vendor day/month date order from earlier extractions."
+    )
+    parser.add_argument(
+        "--reports",
+        required=True,
+        help="--json_out/--out_jsonl reports, a labeled manifest, or a directory of them",
+    )
+    parser.add_argument("--out", required=True, help="JSON table to pass as --date_formats")
+    args = parser.parse_args()
+
+    formats = VendorDateFormats.learn(
+        (str(invoice.get("vendor_name", "")), str(invoice.get("invoice_date", "")))
+        for row in iter_reports(args.reports)
+        for invoice in [row.get("invoice") or row["extracted_json"]]
+    )
+    Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+    formats.save(args.out)
+    print(f"Learned date order for {len(formats)} vendors -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
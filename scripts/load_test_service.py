@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+
+def load_image_paths(path: Path, limit: int) -> list[str]:
+    if path.is_dir():
+        paths = sorted(
+            str(p.resolve().as_posix())
+            for p in path.iterdir()
+            if p.suffix.lower() in {".png", ".jpg", ".jpeg", ".pdf"}
+        )
+    else:
+        paths = []
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    paths.append(json.loads(line)["image_path"])
+    return paths[:limit]
+
+
+def post_audit(url: str, image_path: str, deadline_ms: float | None) -> int:
+    payload = {"image_path": image_path}
+    if deadline_ms:
+        payload["deadline_ms"] = deadline_ms
+    request = urllib.request.Request(
+        f"{url}/audit",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as exc:
+        exc.read()
+        return exc.code
+
+
+def get_metrics(url: str) -> dict:
+    with urllib.request.urlopen(f"{url}/metrics") as response:
+        return json.loads(response.read())
+
+
+def run_level(
+    url: str, image_paths: list[str], concurrency: int, requests: int, deadline_ms: float | None
+) -> dict:
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        start = time.perf_counter()
+        status = post_audit(url, image_paths[i % len(image_paths)], deadline_ms)
+        elapsed = time.perf_counter() - start
+        with lock:
+            statuses[status] += 1
+            if status == 200:
+                latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    elapsed = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, [50, 99]) if latencies else (0.0, 0.0)
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "ok": statuses[200],
+        "statuses": dict(statuses),
+        "p50_ms": round(float(p50) * 1000, 1),
+        "p99_ms": round(float(p99) * 1000, 1),
+        "throughput": round(statuses[200] / elapsed, 2) if elapsed > 0 else 0.0,
+        "seconds": round(elapsed, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Load-test a running `python -m src.main --serve` instance."
+    )
+    parser.add_argument("--url", default="http://127.0.0.1:8080")
+    parser.add_argument("--images", required=True, help="Image directory or JSONL manifest")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated client counts")
+    parser.add_argument("--requests", type=int, default=64, help="Requests per concurrency level")
+    parser.add_argument("--deadline_ms", type=float, default=None)
+    parser.add_argument("--limit", type=int, default=64)
+    args = parser.parse_args()
+
+    image_paths = load_image_paths(Path(args.images), args.limit)
+    if not image_paths:
+        raise SystemExit("No images found.")
+
+    for concurrency in (int(c) for c in args.concurrency.split(",") if c.strip()):
+        before = get_metrics(args.url)
+        result = run_level(args.url, image_paths, concurrency, args.requests, args.deadline_ms)
+        after = get_metrics(args.url)
+        batches = after["batches"] - before["batches"]
+        served = sum(int(k) * v for k, v in after["batch_sizes"].items()) - sum(
+            int(k) * v for k, v in before["batch_sizes"].items()
+        )
+        result["mean_batch_size"] = round(served / batches, 2) if batches else 0.0
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,126 @@
 from __future__ import annotations
 
 import json
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable
 from dataclasses import asdict
 from pathlib import Path
 
+import numpy as np
+
 from .pipeline.ocr import OcrEngine
 from .pipeline.extractor import StructuredExtractor
 from .pipeline.validator import LogicalValidator
 from .pipeline.vlm import VlmRiskAnalyzer
 from .pipeline.compliance import ComplianceEngine
 from .risk.engine import RiskEngine
+from .risk.gate import VlmGate
 from .pipeline.report import render_report
-from .models.types import AuditReport
-from .utils.policy import parse_policy
+from .pipeline.reaudit import ReAuditor, iter_reports
+from .pipeline.bulk import BulkAuditor, iter_inputs
+from .pipeline.dag import StageGraph
+from .pipeline.pdf import is_pdf, iter_page_windows, merge_page_invoices
+from .pipeline.preprocess import ImagePreprocessor, PreprocessConfig
+from .pipeline.service import AuditService
+from .models.qwen_vl import QwenVL
+from .models.registry import get_registry
+from .models.types import AuditReport, Invoice, RiskResult, ValidationFlags
+from .utils.cache import ResultCache
+from .utils.dates import VendorDateFormats
+from .utils.images import load_image
+from .utils.policy import Policy, PolicyRegistry, parse_policy
+from .utils.profiling import get_profiler, profiled, render_profile
+from .utils.seen import SeenInvoiceIndex
 from .utils.vendors import VendorDB
 
 
 class Auditor:
-    def __init__(self, model_name: str, use_vlm: bool = True, use_ocr: bool = True) -> None:
-        self.ocr = OcrEngine(enabled=use_ocr)
-        self.extractor = StructuredExtractor(model_name=model_name)
-        self.validator = LogicalValidator()
-        self.risk_engine = RiskEngine()
-        self.vlm = VlmRiskAnalyzer(model_name=model_name) if use_vlm else None
-        self.compliance = ComplianceEngine()
+    def __init__(
+        self,
+        model_name: str,
+        use_vlm: bool = True,
+        use_ocr: bool = True,
+        device: str | None = None,
+        dtype: str | None = None,
+        max_batch_size: int = 4,
+        cache: ResultCache | None = None,
+        fuzzy_vendor_threshold: float | None = None,
+        seen_index: SeenInvoiceIndex | None = None,
+        risk_weights: str | None = None,
+        policy_registry: PolicyRegistry | None = None,
+        constrained: bool = False,
+        ocr_first: bool = False,
+        min_ocr_confidence: float = 0.9,
+        vlm_gate: VlmGate | None = None,
+        preprocessor: ImagePreprocessor | None = None,
+        reuse_vision: bool = True,
+        pdf_dpi: int = 150,
+        ocr_workers: int = 0,
+        stage_workers: int = 4,
+        model_factory: Callable[..., QwenVL] | None = None,
+        ocr_engine: OcrEngine | None = None,
+        date_formats: VendorDateFormats | None = None,
+    ) -> None:
+        self.stage_workers = max(1, stage_workers)
+        self._stage_pool: ThreadPoolExecutor | None = None
+        self._stage_pool_lock = threading.Lock()
+        self.pdf_dpi = pdf_dpi
+        self.vlm_gate = vlm_gate
+        self.preprocessor = preprocessor
+        self.policy_registry = policy_registry
+        self.cache = cache
+        # model_factory / ocr_engine swap in other backends, e.g. the replay stubs
+        # in src/pipeline/replay.py used by the offline benchmarks.
+        self.ocr = ocr_engine or OcrEngine(enabled=use_ocr, cache=cache, workers=ocr_workers)
+        self.extractor = StructuredExtractor(
+            model_name=model_name,
+            device=device,
+            dtype=dtype,
+            max_batch_size=max_batch_size,
+            cache=cache,
+            constrained=constrained,
+            ocr_first=ocr_first and use_ocr,
+            min_ocr_confidence=min_ocr_confidence,
+            reuse_vision=reuse_vision,
+            model_factory=model_factory,
+        )
+        self.date_formats = date_formats
+        self.validator = LogicalValidator(
+            fuzzy_vendor_threshold=fuzzy_vendor_threshold,
+            seen_index=seen_index,
+            date_formats=date_formats,
+        )
+        self.risk_engine = RiskEngine.from_file(risk_weights) if risk_weights else RiskEngine()
+        self.vlm = (
+            VlmRiskAnalyzer(
+                model_name=model_name,
+                device=device,
+                dtype=dtype,
+                max_batch_size=max_batch_size,
+                cache=cache,
+                reuse_vision=reuse_vision,
+                model_factory=model_factory,
+            )
+            if use_vlm
+            else None
+        )
+        self.compliance = ComplianceEngine(
+            fuzzy_vendor_threshold=fuzzy_vendor_threshold, date_formats=date_formats
+        )
+
+    def model_stats(self) -> list[dict]:
+        return get_registry().stats()
+
+    def generation_stats(self) -> dict:
+        stats = {"extract": dict(self.extractor.model.stats)}
+        if self.extractor.ocr_parser is not None:
+            stats["cascade"] = self.extractor.cascade_stats()
+        if self.vlm_gate is not None:
+            stats["vlm_gate"] = self.vlm_gate.stats()
+        if self.vlm is not None:
+            stats["risk"] = dict(self.vlm.model.stats)
+        return stats
 
     def run(
         self,
@@ -31,15 +128,25 @@ class Auditor:
         vendor_db: VendorDB | None = None,
         policy_text: str | None = None,
     ) -> AuditReport:
-        raw_text = self.ocr.extract_text(image_path)
-        invoice = self.extractor.extract(image_path=image_path, raw_text=raw_text)
-        policy = parse_policy(policy_text or "")
-        flags = self.validator.validate(invoice, vendor_db=vendor_db, policy=policy)
+        if is_pdf(image_path):
+            work_path, pixels, raw_text, invoice = self.extract_pdf(image_path)
+        else:
+            work_path, pixels = self.load_document(image_path)
+            raw_text = self.ocr.extract_text(pixels, source=work_path)
+            invoice = self.extractor.extract(image_path=work_path, raw_text=raw_text, image=pixels)
+        policy = self.resolve_policy(invoice, parse_policy(policy_text or ""))
+        flags = self.validator.validate(
+            invoice, vendor_db=vendor_db, policy=policy, source=image_path
+        )
         risk = self.risk_engine.score(flags)
         vlm_risk = None
-        if self.vlm is not None:
+        skip_reason = self.vlm_skip_reasons([risk], [flags])[0]
+        if self.vlm is not None and skip_reason is None:
             vlm_risk = self.vlm.analyze(
-                image_path=image_path, extracted_json=asdict(invoice), flags=flags.__dict__
+                image_path=work_path,
+                extracted_json=asdict(invoice),
+                flags=flags.__dict__,
+                image=pixels,
             )
         compliance = self.compliance.evaluate(
             invoice, policy=policy, vendor_db=vendor_db, flags=flags
@@ -51,35 +158,586 @@ class Auditor:
             vlm_risk=vlm_risk,
             compliance=compliance,
             raw_text=raw_text,
+            vlm_skip_reason=skip_reason,
+        )
+
+    def run_batch(
+        self,
+        image_paths: list[str],
+        vendor_db: VendorDB | None = None,
+        policy_text: str | None = None,
+        return_exceptions: bool = False,
+    ) -> list[AuditReport | Exception]:
+        """Audit many documents with one model batch per stage, reports in input order.
+
+        With `return_exceptions` a document that fails to load, OCR or parse
+        leaves its exception in its slot and the rest of the batch carries on;
+        a failing model call still raises for the whole batch.
+        """
+        n = len(image_paths)
+        work_paths: list[str] = [""] * n
+        images: list[np.ndarray | None] = [None] * n
+        raw_texts: list[str] = [""] * n
+        invoices: list[Invoice | None] = [None] * n
+        errors: list[Exception | None] = [None] * n
+        singles = []
+        for i, path in enumerate(image_paths):
+            try:
+                if is_pdf(path):
+                    work_paths[i], images[i], raw_texts[i], invoices[i] = self.extract_pdf(path)
+                else:
+                    work_paths[i], images[i] = self.load_document(path)
+                    singles.append(i)
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                errors[i] = exc
+        if singles:
+            texts = self.ocr.extract_text_batch(
+                [images[i] for i in singles],
+                [work_paths[i] for i in singles],
+                return_exceptions=return_exceptions,
+            )
+            for i, text in zip(singles, texts):
+                if isinstance(text, Exception):
+                    errors[i] = text
+                else:
+                    raw_texts[i] = text
+            singles = [i for i in singles if errors[i] is None]
+        if singles:
+            extracted = self.extractor.extract_batch(
+                [work_paths[i] for i in singles],
+                [raw_texts[i] for i in singles],
+                images=[images[i] for i in singles],
+                return_exceptions=return_exceptions,
+            )
+            for i, invoice in zip(singles, extracted):
+                if isinstance(invoice, Exception):
+                    errors[i] = invoice
+                else:
+                    invoices[i] = invoice
+        done = [i for i in range(n) if errors[i] is None]
+        default_policy = parse_policy(policy_text or "")
+        policies = {i: self.resolve_policy(invoices[i], default_policy) for i in done}
+        all_flags = {
+            i: self.validator.validate(
+                invoices[i], vendor_db=vendor_db, policy=policies[i], source=image_paths[i]
+            )
+            for i in done
+        }
+        risks = {i: self.risk_engine.score(all_flags[i]) for i in done}
+        reasons = self.vlm_skip_reasons([risks[i] for i in done], [all_flags[i] for i in done])
+        skip_reasons = dict(zip(done, reasons))
+        vlm_risks: dict[int, RiskResult | None] = dict.fromkeys(done)
+        todo = [i for i in done if skip_reasons[i] is None]
+        if self.vlm is not None and todo:
+            analyzed = self.vlm.analyze_batch(
+                [work_paths[i] for i in todo],
+                [asdict(invoices[i]) for i in todo],
+                [all_flags[i].__dict__ for i in todo],
+                images=[images[i] for i in todo],
+            )
+            vlm_risks.update(zip(todo, analyzed))
+        results: list[AuditReport | Exception] = list(errors)  # type: ignore[arg-type]
+        for i in done:
+            results[i] = AuditReport(
+                invoice=invoices[i],
+                flags=all_flags[i],
+                risk=risks[i],
+                vlm_risk=vlm_risks[i],
+                compliance=self.compliance.evaluate(
+                    invoices[i], policy=policies[i], vendor_db=vendor_db, flags=all_flags[i]
+                ),
+                raw_text=raw_texts[i],
+                vlm_skip_reason=skip_reasons[i],
+            )
+        return results
+
+    def run_concurrent(
+        self,
+        image_path: str,
+        vendor_db: VendorDB | None = None,
+        policy_text: str | None = None,
+        executor: Executor | None = None,
+    ) -> AuditReport:
+        """Like `run`, with independent stages running concurrently on a thread pool.
+
+        The report carries per-stage timings and the critical path.
+        """
+        graph = self._stage_graph(image_path, vendor_db, policy_text)
+        results, timings = graph.run(executor or self._get_stage_pool())
+        return self._stage_report(results, timings.as_dict())
+
+    async def run_async(
+        self,
+        image_path: str,
+        vendor_db: VendorDB | None = None,
+        policy_text: str | None = None,
+        executor: Executor | None = None,
+    ) -> AuditReport:
+        """Awaitable `run_concurrent`; stages run on the executor, not the event loop."""
+        graph = self._stage_graph(image_path, vendor_db, policy_text)
+        results, timings = await graph.run_async(executor or self._get_stage_pool())
+        return self._stage_report(results, timings.as_dict())
+
+    def _stage_graph(
+        self, image_path: str, vendor_db: VendorDB | None, policy_text: str | None
+    ) -> StageGraph:
+        graph = StageGraph()
+        if is_pdf(image_path):
+            graph.add("pdf", lambda r: self.extract_pdf(image_path))
+            graph.add("document", lambda r: r["pdf"][:2], ["pdf"])
+            graph.add("ocr", lambda r: r["pdf"][2], ["pdf"])
+            graph.add("extract", lambda r: r["pdf"][3], ["pdf"])
+        else:
+            graph.add("document", lambda r: self.load_document(image_path))
+            graph.add(
+                "ocr",
+                lambda r: self.ocr.extract_text(r["document"][1], source=r["document"][0]),
+                ["document"],
+            )
+            # The model reads only the pixels; OCR text feeds just the rule-based parser,
+            # so without --ocr_first the two run side by side.
+            extract_deps = ["document"]
+            if self.extractor.ocr_parser is not None:
+                extract_deps.append("ocr")
+            graph.add(
+                "extract",
+                lambda r: self.extractor.extract(
+                    image_path=r["document"][0],
+                    raw_text=r.get("ocr") or "",
+                    image=r["document"][1],
+                ),
+                extract_deps,
+            )
+        default_policy = parse_policy(policy_text or "")
+        graph.add(
+            "policy", lambda r: self.resolve_policy(r["extract"], default_policy), ["extract"]
+        )
+        graph.add(
+            "validate",
+            lambda r: self.validator.validate(
+                r["extract"], vendor_db=vendor_db, policy=r["policy"], source=image_path
+            ),
+            ["extract", "policy"],
+        )
+        graph.add("risk", lambda r: self.risk_engine.score(r["validate"]), ["validate"])
+        graph.add("vlm", self._vlm_stage, ["document", "extract", "validate", "risk"])
+        # Compliance does not read the VLM opinion, so it overlaps the risk pass.
+        graph.add(
+            "compliance",
+            lambda r: self.compliance.evaluate(
+                r["extract"], policy=r["policy"], vendor_db=vendor_db, flags=r["validate"]
+            ),
+            ["extract", "policy", "validate"],
+        )
+        return graph
+
+    def _vlm_stage(self, results: dict) -> tuple[RiskResult | None, str | None]:
+        skip_reason = self.vlm_skip_reasons([results["risk"]], [results["validate"]])[0]
+        if self.vlm is None or skip_reason is not None:
+            return None, skip_reason
+        work_path, pixels = results["document"]
+        vlm_risk = self.vlm.analyze(
+            image_path=work_path,
+            extracted_json=asdict(results["extract"]),
+            flags=results["validate"].__dict__,
+            image=pixels,
+        )
+        return vlm_risk, None
+
+    def _stage_report(self, results: dict, timings: dict) -> AuditReport:
+        vlm_risk, skip_reason = results["vlm"]
+        return AuditReport(
+            invoice=results["extract"],
+            flags=results["validate"],
+            risk=results["risk"],
+            vlm_risk=vlm_risk,
+            compliance=results["compliance"],
+            raw_text=results["ocr"],
+            vlm_skip_reason=skip_reason,
+            stage_timings=timings,
         )
 
+    def _get_stage_pool(self) -> ThreadPoolExecutor:
+        with self._stage_pool_lock:
+            if self._stage_pool is None:
+                self._stage_pool = ThreadPoolExecutor(
+                    self.stage_workers, thread_name_prefix="audit-stage"
+                )
+            return self._stage_pool
+
+    def vlm_skip_reasons(
+        self, risks: list[RiskResult], flags: list[ValidationFlags]
+    ) -> list[str | None]:
+        if self.vlm is None or self.vlm_gate is None:
+            return [None] * len(risks)
+        return self.vlm_gate.decide(risks, flags)
+
+    @profiled("load")
+    def load_document(self, image_path: str) -> tuple[str, np.ndarray]:
+        # Decoded once; OCR, extraction and the risk pass all read this buffer.
+        # Reports and duplicate tracking keep the original path.
+        if self.preprocessor is not None:
+            return self.preprocessor.load(image_path)
+        return image_path, load_image(image_path)
+
+    @profiled("pdf")
+    def extract_pdf(self, pdf_path: str) -> tuple[str, np.ndarray, str, Invoice]:
+        """Extract a multi-page PDF page-parallel and merge it into one invoice.
+
+        Pages are rasterized lazily a batch at a time; each batch is OCR'd with
+        one extract_text_batch call and extracted as one model batch. A page
+        without an invoice JSON (terms, a blank back side) is skipped; the
+        document only fails when no page yields one. Only the first page is
+        kept, for the VLM risk pass.
+        """
+        transform = self.preprocessor.process_array if self.preprocessor is not None else None
+        window = max(1, self.extractor.model.max_batch_size)
+        first_page = None
+        page_texts: list[str] = []
+        page_invoices: list[Invoice] = []
+        errors: list[Exception] = []
+        for pages in iter_page_windows(pdf_path, self.pdf_dpi, window, transform):
+            if first_page is None:
+                first_page = pages[0]
+            # A page whose OCR fails is still extracted from its pixels.
+            texts = [
+                text if isinstance(text, str) else ""
+                for text in self.ocr.extract_text_batch(pages, return_exceptions=True)
+            ]
+            results = self.extractor.extract_batch(
+                pages, texts, images=pages, return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    errors.append(result)
+                else:
+                    page_invoices.append(result)
+            page_texts.extend(texts)
+        if first_page is None:
+            raise ValueError(f"PDF has no pages: {pdf_path}")
+        if not page_invoices:
+            raise errors[0]
+        return pdf_path, first_page, "\f".join(page_texts), merge_page_invoices(page_invoices)
+
+    def resolve_policy(self, invoice: Invoice, default: Policy | None) -> Policy | None:
+        if self.policy_registry is not None:
+            policy = self.policy_registry.resolve(
+                invoice.vendor_name, invoice.invoice_date, date_formats=self.date_formats
+            )
+            if policy is not None:
+                return policy
+        return default
+
 
 def main() -> None:
     import argparse
 
     parser = argparse.ArgumentParser()
-    parser.add_argument("--input", required=True)
+    parser.add_argument("--input", required=False)
+    parser.add_argument("--manifest", required=False, help="JSONL manifest or image directory")
+    parser.add_argument("--out_jsonl", required=False)
+    parser.add_argument(
+        "--reaudit",
+        required=False,
+        help="Re-run only the rule stages over earlier --json_out/--out_jsonl reports",
+    )
+    parser.add_argument(
+        "--diff", action="store_true", help="--reaudit: record flag and risk changes per invoice"
+    )
+    parser.add_argument(
+        "--serve", action="store_true", help="Run as a local HTTP audit service (POST /audit)"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument(
+        "--batch_window_ms",
+        type=float,
+        default=10.0,
+        help="--serve: wait at most this long to fill a micro-batch",
+    )
+    parser.add_argument(
+        "--max_queue", type=int, default=64, help="--serve: queued requests before 503"
+    )
+    parser.add_argument(
+        "--deadline_ms",
+        type=float,
+        default=30000.0,
+        help="--serve: default per-request deadline (clients may send deadline_ms)",
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--queue_size", type=int, default=16)
     parser.add_argument("--vendor_db", required=False)
     parser.add_argument("--contract_text", required=False)
+    parser.add_argument(
+        "--contracts",
+        required=False,
+        help="CSV of per-vendor contracts (vendor_name, contract_id, contract_path|contract_text)",
+    )
+    parser.add_argument(
+        "--fuzzy_vendor_threshold",
+        type=float,
+        default=None,
+        help="Accept approximate vendor-name matches at or above this trigram similarity (0-1)",
+    )
+    parser.add_argument(
+        "--seen_index",
+        required=False,
+        help="SQLite path of the persistent seen-invoice index used for duplicate detection",
+    )
+    parser.add_argument(
+        "--date_formats",
+        required=False,
+        help="JSON table of per-vendor day/month order (scripts/learn_date_formats.py)",
+    )
+    parser.add_argument(
+        "--risk_weights",
+        required=False,
+        help="JSON weight table, e.g. configs/risk_weights.json; unlisted flags keep default weights",
+    )
     parser.add_argument("--model_name", default="Qwen/Qwen2-VL-2B-Instruct")
+    parser.add_argument(
+        "--device",
+        default=None,
+        help="e.g. cpu, cuda or cuda:1; default lets accelerate place the weights",
+    )
+    parser.add_argument("--dtype", default=None, help="e.g. float16, bfloat16 or auto")
+    parser.add_argument("--max_batch_size", type=int, default=4)
+    parser.add_argument(
+        "--constrained",
+        action="store_true",
+        help="Constrain extraction decoding to schemas/invoice_extraction.schema.json",
+    )
+    parser.add_argument(
+        "--ocr_first",
+        action="store_true",
+        help="Parse the OCR text with rules first and call the VLM only when that fails",
+    )
+    parser.add_argument("--min_ocr_confidence", type=float, default=0.9)
+    parser.add_argument(
+        "--vlm_gate_band",
+        default=None,
+        help=(
+            "Run the VLM only for rule scores in MIN,MAX (inclusive), e.g. 1,99; "
+            "defaults to 1,99 with --vlm_budget alone, and to no band with --vlm_gate_flags"
+        ),
+    )
+    parser.add_argument(
+        "--vlm_gate_flags",
+        default="",
+        help="Comma-separated flags that always send an invoice to the VLM",
+    )
+    parser.add_argument(
+        "--vlm_budget",
+        type=float,
+        default=None,
+        help="At most this fraction (0-1) of invoices is sent to the VLM",
+    )
+    parser.add_argument(
+        "--preprocess",
+        action="store_true",
+        help="Fix orientation, crop, grayscale and downsize images before OCR/VLM",
+    )
+    parser.add_argument(
+        "--max_visual_tokens",
+        type=int,
+        default=1024,
+        help="Pixel budget for --preprocess, in Qwen2-VL visual tokens (28x28 px each)",
+    )
+    parser.add_argument(
+        "--preprocess_cache",
+        required=False,
+        help="Directory for preprocessed images (default: ~/.cache/invoice-audit/preprocess)",
+    )
+    parser.add_argument("--keep_color", action="store_true", help="Skip grayscale in --preprocess")
+    parser.add_argument(
+        "--no_vision_reuse",
+        action="store_true",
+        help="Re-encode the image for the risk pass instead of reusing the extraction encoding",
+    )
+    parser.add_argument(
+        "--concurrent_stages",
+        action="store_true",
+        help="--input: run independent stages concurrently and print per-stage timings",
+    )
+    parser.add_argument("--pdf_dpi", type=int, default=150, help="Rasterization DPI for PDF input")
+    parser.add_argument(
+        "--ocr_workers",
+        type=int,
+        default=0,
+        help="OCR in this many worker processes (0 = in the calling thread)",
+    )
+    parser.add_argument("--model_stats", action="store_true")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time every stage and count tokens; print a breakdown (and add it to --json_out)",
+    )
+    parser.add_argument(
+        "--metrics_out",
+        required=False,
+        help="--manifest: write the profile counters here in Prometheus text format",
+    )
+    parser.add_argument("--cache", required=False, help="SQLite path for OCR/model output cache")
+    parser.add_argument("--cache_bypass", action="store_true")
+    parser.add_argument("--cache_max_mb", type=float, default=None)
+    parser.add_argument("--cache_max_age_days", type=float, default=None)
     parser.add_argument("--no_vlm", action="store_true")
     parser.add_argument("--no_ocr", action="store_true")
     parser.add_argument("--json_out", required=False)
     args = parser.parse_args()
+    if sum(map(bool, (args.input, args.manifest, args.serve, args.reaudit))) != 1:
+        parser.error("exactly one of --input, --manifest, --serve or --reaudit is required")
+    if (args.manifest or args.reaudit) and not args.out_jsonl:
+        parser.error("--manifest and --reaudit require --out_jsonl")
 
+    get_profiler().enabled = args.profile
     vendor_db = VendorDB(args.vendor_db) if args.vendor_db else None
+    date_formats = VendorDateFormats.load(args.date_formats) if args.date_formats else None
     policy_text = None
     if args.contract_text:
         policy_text = Path(args.contract_text).read_text(encoding="utf-8")
 
+    if args.reaudit:
+        # Rules only: no OCR engine or model is constructed.
+        reauditor = ReAuditor(
+            validator=LogicalValidator(
+                fuzzy_vendor_threshold=args.fuzzy_vendor_threshold,
+                seen_index=SeenInvoiceIndex(args.seen_index) if args.seen_index else None,
+                date_formats=date_formats,
+            ),
+            risk_engine=RiskEngine.from_file(args.risk_weights) if args.risk_weights else None,
+            vendor_db=vendor_db,
+            policy_text=policy_text,
+            policy_registry=PolicyRegistry.from_csv(args.contracts) if args.contracts else None,
+        )
+        summary = reauditor.run(iter_reports(args.reaudit), args.out_jsonl, diff=args.diff)
+        changed = f", {summary.changed} changed" if args.diff else ""
+        print(
+            f"Re-audited {summary.processed} invoices{changed} in {summary.seconds:.1f}s "
+            f"({summary.invoices_per_sec:.0f}/s) -> {args.out_jsonl}"
+        )
+        return
+
+    cache = None
+    if args.cache:
+        cache = ResultCache(
+            args.cache,
+            max_bytes=int(args.cache_max_mb * 1024 * 1024) if args.cache_max_mb else None,
+            max_age_seconds=args.cache_max_age_days * 86400 if args.cache_max_age_days else None,
+            bypass=args.cache_bypass,
+        )
+
+    vlm_gate = None
+    if args.vlm_gate_band or args.vlm_gate_flags or args.vlm_budget is not None:
+        band = args.vlm_gate_band or (None if args.vlm_gate_flags else "1,99")
+        low, high = (int(x) for x in band.split(",")) if band else (None, None)
+        vlm_gate = VlmGate(
+            min_score=low,
+            max_score=high,
+            trigger_flags=[f.strip() for f in args.vlm_gate_flags.split(",") if f.strip()],
+            budget=args.vlm_budget,
+        )
+
+    preprocessor = None
+    if args.preprocess:
+        preprocessor = ImagePreprocessor(
+            PreprocessConfig.for_visual_tokens(args.max_visual_tokens, grayscale=not args.keep_color),
+            cache_dir=args.preprocess_cache,
+        )
+
     auditor = Auditor(
-        model_name=args.model_name, use_vlm=not args.no_vlm, use_ocr=not args.no_ocr
+        model_name=args.model_name,
+        use_vlm=not args.no_vlm,
+        use_ocr=not args.no_ocr,
+        device=args.device,
+        dtype=args.dtype,
+        max_batch_size=args.max_batch_size,
+        cache=cache,
+        fuzzy_vendor_threshold=args.fuzzy_vendor_threshold,
+        seen_index=SeenInvoiceIndex(args.seen_index) if args.seen_index else None,
+        risk_weights=args.risk_weights,
+        policy_registry=PolicyRegistry.from_csv(args.contracts) if args.contracts else None,
+        constrained=args.constrained,
+        ocr_first=args.ocr_first,
+        min_ocr_confidence=args.min_ocr_confidence,
+        vlm_gate=vlm_gate,
+        preprocessor=preprocessor,
+        reuse_vision=not args.no_vision_reuse,
+        pdf_dpi=args.pdf_dpi,
+        ocr_workers=args.ocr_workers,
+        date_formats=date_formats,
     )
-    report = auditor.run(args.input, vendor_db=vendor_db, policy_text=policy_text)
+    if args.serve:
+        service = AuditService(
+            auditor,
+            vendor_db=vendor_db,
+            policy_text=policy_text,
+            batch_window_ms=args.batch_window_ms,
+            max_queue=args.max_queue,
+            deadline_ms=args.deadline_ms,
+        )
+        try:
+            service.run(args.host, args.port)
+        finally:
+            auditor.ocr.close()
+        return
+    if args.manifest:
+        bulk = BulkAuditor(
+            auditor,
+            vendor_db=vendor_db,
+            policy_text=policy_text,
+            workers=args.workers,
+            queue_size=args.queue_size,
+        )
+        summary = bulk.run(iter_inputs(args.manifest), args.out_jsonl)
+        auditor.ocr.close()
+        print(
+            f"Audited {summary.processed} invoices ({summary.failed} failed) "
+            f"in {summary.seconds:.1f}s ({summary.invoices_per_sec:.2f}/s) -> {args.out_jsonl}"
+        )
+        if auditor.extractor.ocr_parser is not None:
+            print(f"Cascade: {json.dumps(auditor.extractor.cascade_stats())}")
+        if vlm_gate is not None:
+            print(f"VLM gate: {json.dumps(vlm_gate.stats())}")
+        if cache is not None:
+            print(f"Cache: {json.dumps(cache.stats())}")
+        if args.profile:
+            print(render_profile(get_profiler().snapshot()))
+        if args.metrics_out:
+            Path(args.metrics_out).parent.mkdir(parents=True, exist_ok=True)
+            Path(args.metrics_out).write_text(
+                get_profiler().to_prometheus(
+                    counters={
+                        "bulk_invoices_processed": summary.processed,
+                        "bulk_invoices_failed": summary.failed,
+                        "bulk_seconds": round(summary.seconds, 3),
+                    }
+                ),
+                encoding="utf-8",
+            )
+        return
+
+    run = auditor.run_concurrent if args.concurrent_stages else auditor.run
+    report = run(args.input, vendor_db=vendor_db, policy_text=policy_text)
+    auditor.ocr.close()
     print(render_report(report))
+    if args.model_stats:
+        for entry in auditor.model_stats():
+            print(json.dumps(entry))
+        print(f"Generation: {json.dumps(auditor.generation_stats())}")
+        if cache is not None:
+            print(f"Cache: {json.dumps(cache.stats())}")
+    profile = get_profiler().snapshot() if args.profile else None
+    if profile is not None:
+        print(render_profile(profile))
 
     if args.json_out:
-        payload = asdict(report)
+        # The image path lets --reaudit keep duplicate tracking keyed by the same source.
+        payload = {"image_path": args.input, **asdict(report)}
+        if profile is not None:
+            payload["profile"] = profile
         with Path(args.json_out).open("w", encoding="utf-8") as f:
             json.dump(payload, f, ensure_ascii=False, indent=2)
 
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from .types import Invoice, ValidationFlags
+
+FLAG_NAMES: List[str] = [f.name for f in fields(ValidationFlags)]
+
+
+@dataclass
+class InvoiceColumns:
+    invoice_number: np.ndarray
+    vendor_name: np.ndarray
+    invoice_date: np.ndarray
+    subtotal: np.ndarray
+    tax: np.ndarray
+    total: np.ndarray
+    # Line items flattened across invoices; items of invoice i live in
+    # item_qty[item_offsets[i]:item_offsets[i + 1]].
+    item_qty: np.ndarray
+    item_unit_price: np.ndarray
+    item_offsets: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.subtotal)
+
+    @property
+    def item_owner(self) -> np.ndarray:
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.item_offsets))
+
+    @classmethod
+    def from_invoices(cls, invoices: Sequence[Invoice]) -> "InvoiceColumns":
+        counts = [len(inv.line_items) for inv in invoices]
+        offsets = np.zeros(len(invoices) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(
+            invoice_number=np.array([inv.invoice_number for inv in invoices], dtype=object),
+            vendor_name=np.array([inv.vendor_name for inv in invoices], dtype=object),
+            invoice_date=np.array([inv.invoice_date for inv in invoices], dtype=object),
+            subtotal=np.array([inv.subtotal for inv in invoices], dtype=np.float64),
+            tax=np.array([inv.tax for inv in invoices], dtype=np.float64),
+            total=np.array([inv.total for inv in invoices], dtype=np.float64),
+            item_qty=np.array(
+                [item.qty for inv in invoices for item in inv.line_items], dtype=np.float64
+            ),
+            item_unit_price=np.array(
+                [item.unit_price for inv in invoices for item in inv.line_items],
+                dtype=np.float64,
+            ),
+            item_offsets=offsets,
+        )
+
+
+def flags_from_arrays(arrays: Dict[str, np.ndarray]) -> List[ValidationFlags]:
+    n = len(next(iter(arrays.values()))) if arrays else 0
+    columns = {name: arrays[name].tolist() for name in FLAG_NAMES if name in arrays}
+    return [
+        ValidationFlags(**{name: bool(values[i]) for name, values in columns.items()})
+        for i in range(n)
+    ]
+
+
+def flags_to_matrix(flags: Sequence[ValidationFlags]) -> np.ndarray:
+    return np.array(
+        [[getattr(f, name) for name in FLAG_NAMES] for f in flags], dtype=bool
+    ).reshape(len(flags), len(FLAG_NAMES))
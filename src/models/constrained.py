@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import json
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import torch
+from transformers import LogitsProcessor
+
+_NUMBER_PREFIX = re.compile(r"^-?(?:(?:0|[1-9]\d*)(?:\.\d*)?)?$")
+_NUMBER_FULL = re.compile(r"^-?(?:0|[1-9]\d*)(?:\.\d+)?$")
+_INTEGER_PREFIX = re.compile(r"^-?(?:0|[1-9]\d*)?$")
+_INTEGER_FULL = re.compile(r"^-?(?:0|[1-9]\d*)$")
+_NUMERIC_TOKEN = re.compile(r"^[-0-9.]+$")
+
+
+@dataclass(frozen=True)
+class _Node:
+    kind: str
+    keys: Tuple[str, ...] = ()
+    children: Tuple["_Node", ...] = ()
+    item: Optional["_Node"] = None
+
+
+# Machine tasks, executed from the end of the stack:
+#   ("lit", text)            fixed scaffolding, emitted without sampling
+#   ("str",)                 string body up to the closing quote
+#   ("num", buf, integer)    JSON number
+#   ("choice", options, buf) one of a few literals (booleans)
+#   ("arr_open", item)       "]" or the first item
+#   ("arr_more", item)       ", " + next item, or "]"
+Task = Tuple[Any, ...]
+
+
+class SchemaGrammar:
+    """A JSON schema compiled into a deterministic emission plan.
+
+    Keys are emitted in schema order with json.dumps-style separators, so the
+    only free choices left to the model are string bodies, numbers, booleans
+    and array lengths.
+    """
+
+    def __init__(self, schema: dict) -> None:
+        self.schema = schema
+        self.root = _compile(schema)
+
+    @classmethod
+    def from_file(cls, path: str) -> "SchemaGrammar":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def initial_tasks(self) -> List[Task]:
+        return list(reversed(_merge(_expand(self.root))))
+
+
+def _compile(schema: dict) -> _Node:
+    kind = schema.get("type")
+    if kind == "object":
+        props = schema.get("properties", {})
+        return _Node(
+            "object", keys=tuple(props), children=tuple(_compile(v) for v in props.values())
+        )
+    if kind == "array":
+        return _Node("array", item=_compile(schema.get("items", {"type": "string"})))
+    if kind in ("string", "number", "integer", "boolean"):
+        return _Node(kind)
+    raise ValueError(f"Unsupported schema type for constrained decoding: {kind!r}")
+
+
+def _expand(node: _Node) -> List[Task]:
+    if node.kind == "object":
+        tasks: List[Task] = [("lit", "{")]
+        for i, (key, child) in enumerate(zip(node.keys, node.children)):
+            tasks.append(("lit", (", " if i else "") + json.dumps(key) + ": "))
+            tasks.extend(_expand(child))
+        tasks.append(("lit", "}"))
+        return tasks
+    if node.kind == "array":
+        return [("lit", "["), ("arr_open", node.item)]
+    if node.kind == "string":
+        return [("lit", '"'), ("str",)]
+    if node.kind == "boolean":
+        return [("choice", ("true", "false"), "")]
+    return [("num", "", node.kind == "integer")]
+
+
+def _merge(tasks: List[Task]) -> List[Task]:
+    merged: List[Task] = []
+    for task in tasks:
+        if task[0] == "lit" and merged and merged[-1][0] == "lit":
+            merged[-1] = ("lit", merged[-1][1] + task[1])
+        else:
+            merged.append(task)
+    return merged
+
+
+def _push(stack: List[Task], node: _Node) -> None:
+    stack.extend(reversed(_merge(_expand(node))))
+
+
+class _Machine:
+    def __init__(self, grammar: SchemaGrammar) -> None:
+        self.stack = grammar.initial_tasks()
+        self.failed = False
+
+    @property
+    def done(self) -> bool:
+        return not self.stack
+
+    def feed(self, text: str) -> None:
+        for ch in text:
+            if self.failed or not self._feed_char(ch):
+                self.failed = True
+                return
+
+    def _feed_char(self, c: str) -> bool:
+        stack = self.stack
+        while stack:
+            task = stack[-1]
+            kind = task[0]
+            if kind == "lit":
+                if c != task[1][0]:
+                    return False
+                rest = task[1][1:]
+                if rest:
+                    stack[-1] = ("lit", rest)
+                else:
+                    stack.pop()
+                return True
+            if kind == "str":
+                if c == '"':
+                    stack.pop()
+                    return True
+                return c != "\\" and ord(c) >= 0x20
+            if kind == "num":
+                buf, integer = task[1], task[2]
+                prefix = _INTEGER_PREFIX if integer else _NUMBER_PREFIX
+                full = _INTEGER_FULL if integer else _NUMBER_FULL
+                if prefix.match(buf + c):
+                    stack[-1] = ("num", buf + c, integer)
+                    return True
+                if not full.match(buf):
+                    return False
+                stack.pop()
+                continue
+            if kind == "choice":
+                buf = task[2] + c
+                if not any(o.startswith(buf) for o in task[1]):
+                    return False
+                if buf in task[1]:
+                    stack.pop()
+                else:
+                    stack[-1] = ("choice", task[1], buf)
+                return True
+            if kind == "arr_open":
+                if c == "]":
+                    stack.pop()
+                    return True
+                stack[-1] = ("arr_more", task[1])
+                _push(stack, task[1])
+                continue
+            if kind == "arr_more":
+                if c == "]":
+                    stack.pop()
+                    return True
+                if c != ",":
+                    return False
+                _push(stack, task[1])
+                stack.append(("lit", " "))
+                return True
+            return False
+        return False
+
+    def first_chars(self, depth: int = 1) -> List[str]:
+        # Characters that may start whatever follows the top `depth` tasks.
+        stack = self.stack[: len(self.stack) - depth] if depth else list(self.stack)
+        if not stack:
+            return []
+        task = stack[-1]
+        kind = task[0]
+        if kind == "lit":
+            return [task[1][0]]
+        if kind == "arr_more":
+            return [",", "]"]
+        if kind == "arr_open":
+            probe: List[Task] = []
+            _push(probe, task[1])
+            first = probe[-1]
+            return ["]"] + ([first[1][0]] if first[0] == "lit" else list("-0123456789"))
+        if kind == "choice":
+            return sorted({o[0] for o in task[1]})
+        return []
+
+
+class TokenVocabulary:
+    # Decoded text of every token plus the boolean masks the grammar needs,
+    # computed once per tokenizer.
+    _cache: Dict[int, "TokenVocabulary"] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, tokenizer: Any) -> None:
+        self.tokenizer = tokenizer
+        size = len(tokenizer)
+        special = set(getattr(tokenizer, "all_special_ids", []))
+        special.update(getattr(tokenizer, "added_tokens_decoder", {}).keys())
+        self.texts: List[str] = [
+            "" if i in special else tokenizer.decode([i], skip_special_tokens=False)
+            for i in range(size)
+        ]
+        self.size = size
+        self.char_ids: Dict[str, int] = {}
+        string_safe = torch.zeros(size, dtype=torch.bool)
+        self.numeric: List[Tuple[int, str]] = []
+        for i, text in enumerate(self.texts):
+            if not text:
+                continue
+            if len(text) == 1:
+                self.char_ids.setdefault(text, i)
+            if '"' not in text and "\\" not in text and all(ord(ch) >= 0x20 for ch in text):
+                string_safe[i] = True
+            if _NUMERIC_TOKEN.match(text):
+                self.numeric.append((i, text))
+        if '"' in self.char_ids:
+            string_safe[self.char_ids['"']] = True
+        self.string_mask = string_safe
+        self.eos_id = tokenizer.eos_token_id
+        self._literal_ids: Dict[str, int] = {}
+
+    @classmethod
+    def for_tokenizer(cls, tokenizer: Any) -> "TokenVocabulary":
+        with cls._lock:
+            vocab = cls._cache.get(id(tokenizer))
+            if vocab is None or vocab.tokenizer is not tokenizer:
+                vocab = cls._cache[id(tokenizer)] = cls(tokenizer)
+            return vocab
+
+    def literal_token(self, text: str) -> int:
+        token = self._literal_ids.get(text)
+        if token is None:
+            token = self.tokenizer.encode(text, add_special_tokens=False)[0]
+            self._literal_ids[text] = token
+        return token
+
+
+class SchemaLogitsProcessor(LogitsProcessor):
+    def __init__(
+        self, grammar: SchemaGrammar, vocab: TokenVocabulary, prompt_len: int, batch_size: int
+    ) -> None:
+        self.vocab = vocab
+        self.prompt_len = prompt_len
+        self.machines = [_Machine(grammar) for _ in range(batch_size)]
+
+    def __call__(self, input_ids: torch.LongTensor, scores: torch.FloatTensor) -> torch.FloatTensor:
+        generated = input_ids.shape[1] > self.prompt_len
+        last = input_ids[:, -1].tolist() if generated else []
+        for i, machine in enumerate(self.machines):
+            if generated and not machine.failed and not machine.done:
+                token = last[i]
+                machine.feed(self.vocab.texts[token] if token < self.vocab.size else "")
+            if machine.failed:
+                # Fall back to free decoding rather than force garbage.
+                continue
+            allowed = self._allowed(machine, scores.device)
+            row = scores[i]
+            masked = torch.full_like(row, float("-inf"))
+            if isinstance(allowed, torch.Tensor):
+                width = min(allowed.shape[0], row.shape[0])
+                masked[:width] = torch.where(allowed[:width], row[:width], masked[:width])
+            else:
+                idx = torch.tensor(allowed, dtype=torch.long, device=row.device)
+                masked[idx] = row[idx]
+            scores[i] = masked
+        return scores
+
+    def _allowed(self, machine: _Machine, device: torch.device) -> Any:
+        vocab = self.vocab
+        if machine.done:
+            return [vocab.eos_id]
+        task = machine.stack[-1]
+        kind = task[0]
+        if kind == "lit":
+            return [vocab.literal_token(task[1])]
+        if kind == "str":
+            return vocab.string_mask.to(device)
+        if kind == "num":
+            buf, integer = task[1], task[2]
+            prefix = _INTEGER_PREFIX if integer else _NUMBER_PREFIX
+            full = _INTEGER_FULL if integer else _NUMBER_FULL
+            ids = [i for i, text in vocab.numeric if prefix.match(buf + text)]
+            if full.match(buf):
+                ids.extend(
+                    vocab.char_ids[c] for c in machine.first_chars(depth=1) if c in vocab.char_ids
+                )
+            return ids or [vocab.eos_id]
+        if kind == "choice":
+            return [vocab.literal_token(o[len(task[2]) :]) for o in task[1] if o.startswith(task[2])]
+        chars = machine.first_chars(depth=0)
+        return [vocab.char_ids[c] for c in chars if c in vocab.char_ids] or [vocab.eos_id]
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
-from typing import Any, Optional
+import time
+from typing import Any, List, Optional
 
 import torch
-from transformers import AutoProcessor
+from transformers import (
+    AutoProcessor,
+    LogitsProcessorList,
+    StoppingCriteria,
+    StoppingCriteriaList,
+)
 
 try:
     from transformers import AutoModelForImageTextToText as _AutoModel
@@ -15,6 +21,13 @@ try:
 except Exception:  # pragma: no cover - optional dependency
     process_vision_info = None
 
+from ..utils.images import ImageInput, to_pil
+from ..utils.parse import BalancedObjectTracker
+from ..utils.profiling import Profiler, get_profiler
+from .constrained import SchemaGrammar, SchemaLogitsProcessor, TokenVocabulary
+from .registry import ModelRegistry, get_registry
+from .vision_cache import encode_images, scatter_image_features
+
 
 class QwenVL:
     def __init__(
@@ -22,6 +35,11 @@ class QwenVL:
         model_name: str,
         device: Optional[str] = None,
         max_new_tokens: int = 512,
+        max_batch_size: int = 4,
+        dtype: Optional[str] = None,
+        registry: Optional[ModelRegistry] = None,
+        stop_on_json: bool = True,
+        reuse_vision: bool = True,
     ) -> None:
         if process_vision_info is None:
             raise RuntimeError(
@@ -29,36 +47,228 @@ class QwenVL:
             )
 
         self.model_name = model_name
-        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        # Passed to from_pretrained as device_map, so the registry key always
+        # names where the weights actually live; "auto" lets accelerate place them.
+        self.device = device or "auto"
+        self.dtype = dtype or "default"
         self.max_new_tokens = max_new_tokens
+        self.max_batch_size = max_batch_size
+        self.stop_on_json = stop_on_json
+        self.reuse_vision = reuse_vision
+        self.stats = {
+            "calls": 0,
+            "sequences": 0,
+            "generated_tokens": 0,
+            "tokens_saved": 0,
+            "images_encoded": 0,
+            "images_reused": 0,
+            "vision_seconds": 0.0,
+            "seconds": 0.0,
+        }
+        self.last_call: List[dict] = []
 
-        self.processor = AutoProcessor.from_pretrained(model_name, trust_remote_code=True)
-        self.model = _AutoModel.from_pretrained(
-            model_name, trust_remote_code=True, device_map="auto"
+        self._registry = registry or get_registry()
+        self._handle = self._registry.acquire(
+            model_name,
+            self.device,
+            self.dtype,
+            lambda: _load_weights(model_name, dtype, self.device),
         )
+        self.processor = self._handle.processor
+        self.model = self._handle.model
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._registry.release(self._handle)
+            self._handle = None
 
-    def generate(self, prompt: str, image_path: str) -> str:
-        messages = [
-            {
-                "role": "user",
-                "content": [
-                    {"type": "text", "text": prompt},
-                    {"type": "image", "image": image_path},
-                ],
-            }
+    def generate(self, prompt: str, image: ImageInput) -> str:
+        return self.generate_batch([prompt], [image])[0]
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        image_paths: List[ImageInput],
+        images: Optional[List[ImageInput]] = None,
+        grammar: Optional[SchemaGrammar] = None,
+    ) -> List[str]:
+        if len(prompts) != len(image_paths):
+            raise ValueError("prompts and image_paths must have the same length.")
+        if images is not None and len(images) != len(image_paths):
+            raise ValueError("images and image_paths must have the same length.")
+        outputs: List[str] = []
+        step = max(1, self.max_batch_size)
+        for i in range(0, len(prompts), step):
+            chunk_images = images[i : i + step] if images is not None else None
+            outputs.extend(
+                self._generate_chunk(
+                    prompts[i : i + step], image_paths[i : i + step], chunk_images, grammar
+                )
+            )
+        return outputs
+
+    def _generate_chunk(
+        self,
+        prompts: List[str],
+        image_paths: List[ImageInput],
+        images: Optional[List[ImageInput]],
+        grammar: Optional[SchemaGrammar] = None,
+    ) -> List[str]:
+        # Already-decoded pixels win over paths, so nothing is read from disk twice.
+        sources = images if images is not None else image_paths
+        batch_messages = [_messages(prompt, src) for prompt, src in zip(prompts, sources)]
+        texts = [
+            self.processor.apply_chat_template(
+                messages, tokenize=False, add_generation_prompt=True
+            )
+            for messages in batch_messages
         ]
-        text = self.processor.apply_chat_template(
-            messages, tokenize=False, add_generation_prompt=True
-        )
-        image_inputs, video_inputs = process_vision_info(messages)
-        inputs = self.processor(
-            text=[text],
-            images=image_inputs,
-            videos=video_inputs,
-            return_tensors="pt",
-        )
-        inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
+        profiler = get_profiler()
+        start = time.perf_counter()
+        with profiler.stage("qwen.inputs"):
+            image_inputs, video_inputs = process_vision_info(batch_messages)
+            # Left padding keeps every prompt flush against its generated continuation.
+            tokenizer = getattr(self.processor, "tokenizer", None)
+            if tokenizer is not None:
+                tokenizer.padding_side = "left"
+            inputs = self.processor(
+                text=texts,
+                images=image_inputs,
+                videos=video_inputs,
+                padding=True,
+                return_tensors="pt",
+            )
+            inputs = {k: v.to(self.model.device) for k, v in inputs.items()}
+        if self.reuse_vision and "pixel_values" in inputs:
+            inputs = self._with_cached_vision(inputs, sources)
+        prompt_len = inputs["input_ids"].shape[1]
+        kwargs: dict[str, Any] = {"max_new_tokens": self.max_new_tokens}
+        stopper = None
+        if self.stop_on_json and tokenizer is not None:
+            stopper = JsonStoppingCriteria(tokenizer, prompt_len, len(prompts))
+            kwargs["stopping_criteria"] = StoppingCriteriaList([stopper])
+        if grammar is not None and tokenizer is not None:
+            vocab = TokenVocabulary.for_tokenizer(tokenizer)
+            kwargs["logits_processor"] = LogitsProcessorList(
+                [SchemaLogitsProcessor(grammar, vocab, prompt_len, len(prompts))]
+            )
+        with torch.no_grad(), profiler.stage("qwen.generate"):
+            output_ids = self.model.generate(**inputs, **kwargs)
+        # Decode only the continuation; the risk prompt itself contains a dict
+        # literal that would otherwise be picked up as the first JSON object.
+        new_ids = output_ids[:, prompt_len:]
+        self._record(new_ids, stopper, tokenizer)
+        if profiler.enabled:
+            self._count_tokens(profiler, inputs)
+        self.stats["seconds"] += time.perf_counter() - start
+        return self.processor.batch_decode(new_ids, skip_special_tokens=True)
+
+    def _with_cached_vision(self, inputs: dict[str, Any], sources: List[ImageInput]) -> dict:
+        # Swap pixel_values for precomputed embeddings: images another call
+        # (e.g. the extraction pass) already encoded skip the vision tower.
+        cache = self._handle.vision_cache
+        grid = inputs["image_grid_thw"]
+        if grid.shape[0] != len(sources):
+            return inputs
+        merge = getattr(getattr(self.model.config, "vision_config", None), "spatial_merge_size", 2)
+        patches = grid.prod(-1).tolist()
+        keys = [cache.key_for(src) for src in sources]
+        features = [cache.get(key, n // merge**2) for key, n in zip(keys, patches)]
+        missing = [i for i, f in enumerate(features) if f is None]
+        if missing:
+            start = time.perf_counter()
+            chunks = torch.split(inputs["pixel_values"], patches)
+            with get_profiler().stage("qwen.vision"):
+                encoded = encode_images(
+                    self.model,
+                    torch.cat([chunks[i] for i in missing]),
+                    grid[missing],
+                )
+            for i, feats in zip(missing, encoded):
+                features[i] = feats
+                cache.put(keys[i], feats)
+            self.stats["vision_seconds"] += time.perf_counter() - start
+        self.stats["images_encoded"] += len(missing)
+        self.stats["images_reused"] += len(sources) - len(missing)
+        inputs = dict(inputs)
+        del inputs["pixel_values"]
         with torch.no_grad():
-            output_ids = self.model.generate(**inputs, max_new_tokens=self.max_new_tokens)
-        output = self.processor.batch_decode(output_ids, skip_special_tokens=True)[0]
-        return output
+            inputs["inputs_embeds"] = scatter_image_features(
+                self.model, inputs["input_ids"], features
+            )
+        return inputs
+
+    def _count_tokens(self, profiler: Profiler, inputs: dict[str, Any]) -> None:
+        # Only when profiling: the sums below synchronize with the device.
+        visual = 0
+        grid = inputs.get("image_grid_thw")
+        if grid is not None:
+            merge = getattr(
+                getattr(self.model.config, "vision_config", None), "spatial_merge_size", 2
+            )
+            visual = int(grid.prod(-1).sum()) // merge**2
+        mask = inputs.get("attention_mask")
+        total = int(mask.sum()) if mask is not None else int(inputs["input_ids"].numel())
+        profiler.count("qwen.sequences", len(self.last_call))
+        profiler.count("qwen.visual_tokens", visual)
+        profiler.count("qwen.prompt_tokens", total - visual)
+        profiler.count("qwen.generated_tokens", sum(c["generated_tokens"] for c in self.last_call))
+
+    def _record(
+        self, new_ids: Any, stopper: Optional["JsonStoppingCriteria"], tokenizer: Any
+    ) -> None:
+        pad_id = getattr(tokenizer, "pad_token_id", None)
+        calls = []
+        for i in range(new_ids.shape[0]):
+            row = new_ids[i]
+            generated = int((row != pad_id).sum()) if pad_id is not None else int(row.shape[0])
+            stopped = bool(stopper is not None and stopper.trackers[i].closed)
+            # Upper bound: without the JSON stop the model would often have hit
+            # EOS well before max_new_tokens, so only count rows the tracker ended.
+            saved = self.max_new_tokens - generated if stopped else 0
+            calls.append(
+                {"generated_tokens": generated, "stopped_on_json": stopped, "tokens_saved": saved}
+            )
+        self.last_call = calls
+        self.stats["calls"] += 1
+        self.stats["sequences"] += len(calls)
+        self.stats["generated_tokens"] += sum(c["generated_tokens"] for c in calls)
+        self.stats["tokens_saved"] += sum(c["tokens_saved"] for c in calls)
+
+
+class JsonStoppingCriteria(StoppingCriteria):
+    # Feeds each newly generated token into a per-sequence brace tracker and
+    # marks the sequence done once its top-level JSON object has closed.
+    def __init__(self, tokenizer: Any, prompt_len: int, batch_size: int) -> None:
+        self.tokenizer = tokenizer
+        self.prompt_len = prompt_len
+        self.trackers = [BalancedObjectTracker() for _ in range(batch_size)]
+
+    def __call__(self, input_ids: torch.LongTensor, scores: Any, **kwargs: Any) -> torch.BoolTensor:
+        done = torch.zeros(input_ids.shape[0], dtype=torch.bool, device=input_ids.device)
+        if input_ids.shape[1] <= self.prompt_len:
+            return done
+        last = input_ids[:, -1].tolist()
+        for i, token_id in enumerate(last):
+            tracker = self.trackers[i]
+            if not tracker.closed:
+                tracker.feed(self.tokenizer.decode([token_id], skip_special_tokens=True))
+            done[i] = tracker.closed
+        return done
+
+
+def _messages(prompt: Optional[str], image: ImageInput) -> list[dict]:
+    content: list[dict] = []
+    if prompt is not None:
+        content.append({"type": "text", "text": prompt})
+    content.append({"type": "image", "image": to_pil(image)})
+    return [{"role": "user", "content": content}]
+
+
+def _load_weights(model_name: str, dtype: Optional[str], device: str) -> tuple[Any, Any]:
+    kwargs: dict[str, Any] = {"trust_remote_code": True, "device_map": device}
+    if dtype:
+        kwargs["torch_dtype"] = dtype if dtype == "auto" else getattr(torch, dtype)
+    processor = AutoProcessor.from_pretrained(model_name, trust_remote_code=True)
+    model = _AutoModel.from_pretrained(model_name, **kwargs)
+    return processor, model
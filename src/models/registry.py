@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .vision_cache import VisionFeatureCache
+
+
+@dataclass
+class LoadedModel:
+    model_name: str
+    device: str
+    dtype: str
+    processor: Any
+    model: Any
+    load_seconds: float
+    param_bytes: int
+    device_bytes: Optional[int] = None
+    refs: int = 0
+    # Shared by every stage borrowing these weights, so stages reuse each other's image encodings.
+    vision_cache: VisionFeatureCache = field(default_factory=VisionFeatureCache)
+
+
+ModelKey = Tuple[str, str, str]
+Loader = Callable[[], Tuple[Any, Any]]
+
+
+class ModelRegistry:
+    def __init__(self) -> None:
+        self._entries: Dict[ModelKey, LoadedModel] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, model_name: str, device: str, dtype: str, loader: Loader) -> LoadedModel:
+        key = (model_name, device, dtype)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(key, loader)
+                self._entries[key] = entry
+            entry.refs += 1
+            return entry
+
+    def release(self, entry: LoadedModel) -> None:
+        key = (entry.model_name, entry.device, entry.dtype)
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not entry:
+                return
+            current.refs -= 1
+            if current.refs <= 0:
+                del self._entries[key]
+
+    def stats(self) -> List[dict]:
+        with self._lock:
+            return [
+                {
+                    "model_name": e.model_name,
+                    "device": e.device,
+                    "dtype": e.dtype,
+                    "refs": e.refs,
+                    "load_seconds": round(e.load_seconds, 3),
+                    "param_bytes": e.param_bytes,
+                    "device_bytes": e.device_bytes,
+                    "vision_cache": e.vision_cache.stats(),
+                }
+                for e in self._entries.values()
+            ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _load(self, key: ModelKey, loader: Loader) -> LoadedModel:
+        model_name, device, dtype = key
+        before = _device_memory(device)
+        start = time.perf_counter()
+        processor, model = loader()
+        elapsed = time.perf_counter() - start
+        after = _device_memory(device)
+        device_bytes = after - before if before is not None and after is not None else None
+        return LoadedModel(
+            model_name=model_name,
+            device=device,
+            dtype=dtype,
+            processor=processor,
+            model=model,
+            load_seconds=elapsed,
+            param_bytes=_param_bytes(model),
+            device_bytes=device_bytes,
+        )
+
+
+def _param_bytes(model: Any) -> int:
+    total = 0
+    params = getattr(model, "parameters", None)
+    if params is None:
+        return 0
+    for p in params():
+        total += p.numel() * p.element_size()
+    return total
+
+
+def _device_memory(device: str) -> Optional[int]:
+    if not (device.startswith("cuda") or device == "auto"):
+        return None
+    try:
+        import torch
+
+        if not torch.cuda.is_available():
+            return None
+        return int(torch.cuda.memory_allocated())
+    except Exception:
+        return None
+
+
+_default_registry = ModelRegistry()
+
+
+def get_registry() -> ModelRegistry:
+    return _default_registry
@@ -52,3 +52,7 @@ class AuditReport:
     vlm_risk: Optional[RiskResult] = None
     compliance: Optional[dict] = None
     raw_text: Optional[str] = None
+    # Set when the VLM risk analysis was gated off for this invoice.
+    vlm_skip_reason: Optional[str] = None
+    # Per-stage start/end offsets and critical path, from Auditor.run_concurrent/run_async.
+    stage_timings: Optional[dict] = None
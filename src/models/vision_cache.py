@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Sequence
+
+import numpy as np
+import torch
+from PIL import Image
+
+from ..utils.cache import image_digest
+
+
+class VisionFeatureCache:
+    """LRU of vision-tower outputs, one entry per source image.
+
+    Lives on the shared model handle, so the extraction and risk stages of the
+    same invoice hit the same entry. Files are keyed by content; in-memory
+    images by identity, and their entries go away with the buffer.
+    """
+
+    def __init__(self, max_entries: int = 16) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, torch.Tensor]" = OrderedDict()
+        # Reentrant: a finalizer can fire from garbage collection while it is held.
+        self._lock = threading.RLock()
+        # Keys of live in-memory images that already carry a finalizer.
+        self._watched: set = set()
+        self.hits = 0
+        self.misses = 0
+
+    def key_for(self, source: Any) -> Optional[Hashable]:
+        if isinstance(source, (np.ndarray, Image.Image)):
+            key = ("mem", id(source))
+            with self._lock:
+                if key in self._watched:
+                    return key
+                try:
+                    weakref.finalize(source, self._forget, key)
+                except TypeError:
+                    return None
+                self._watched.add(key)
+            return key
+        try:
+            return ("file", image_digest(source))
+        except (OSError, TypeError):
+            return None
+
+    def get(self, key: Optional[Hashable], tokens: int) -> Optional[torch.Tensor]:
+        with self._lock:
+            features = self._entries.get(key) if key is not None else None
+            # A different resize setting yields a different token count.
+            if features is None or features.shape[0] != tokens:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return features
+
+    def put(self, key: Optional[Hashable], features: torch.Tensor) -> None:
+        if key is None or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = features.detach()
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _forget(self, key: Hashable) -> None:
+        # Runs when the buffer is collected, before its id can be reused.
+        with self._lock:
+            self._entries.pop(key, None)
+            self._watched.discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def encode_images(
+    model: Any, pixel_values: torch.Tensor, grid_thw: torch.Tensor
+) -> List[torch.Tensor]:
+    """Run the vision tower and return one (tokens, hidden) tensor per image."""
+    base = getattr(model, "model", model)
+    sizes = (grid_thw.prod(-1) // _merge_size(model) ** 2).tolist()
+    with torch.no_grad():
+        if hasattr(base, "get_image_features"):
+            out = base.get_image_features(pixel_values, grid_thw)
+        else:  # older transformers expose the tower directly
+            visual = getattr(base, "visual", None) or model.visual
+            out = visual(pixel_values.type(visual.dtype), grid_thw=grid_thw)
+    out = getattr(out, "pooler_output", out)
+    if isinstance(out, torch.Tensor):
+        return list(torch.split(out, sizes))
+    return list(out)
+
+
+def scatter_image_features(
+    model: Any, input_ids: torch.Tensor, features: Sequence[torch.Tensor]
+) -> torch.Tensor:
+    """Text embeddings with the image placeholder tokens replaced by `features`."""
+    embeds = model.get_input_embeddings()(input_ids)
+    image_token_id = getattr(model.config, "image_token_id", None)
+    mask = (input_ids == image_token_id).unsqueeze(-1).expand_as(embeds)
+    values = torch.cat(list(features), dim=0).to(embeds.device, embeds.dtype)
+    return embeds.masked_scatter(mask, values)
+
+
+def _merge_size(model: Any) -> int:
+    vision_config = getattr(model.config, "vision_config", None)
+    return int(getattr(vision_config, "spatial_merge_size", 2))
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator, List, Optional, Tuple
+
+from ..models.types import Invoice, RiskResult, ValidationFlags
+from ..risk.gate import VLM_FAILED
+from ..utils.policy import Policy, parse_policy
+from ..utils.vendors import VendorDB
+from .pdf import is_pdf
+
+if TYPE_CHECKING:
+    from ..main import Auditor
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp", ".webp", ".pdf"}
+
+_DONE = object()
+
+
+def iter_inputs(path: str) -> Iterator[dict]:
+    p = Path(path)
+    if p.is_dir():
+        for img in sorted(p.rglob("*")):
+            if img.suffix.lower() in IMAGE_SUFFIXES:
+                yield {"image_path": img.as_posix()}
+        return
+    with p.open("r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if row.get("image_path"):
+                yield row
+
+
+@dataclass
+class BulkSummary:
+    processed: int = 0
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def invoices_per_sec(self) -> float:
+        return self.processed / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class _Item:
+    image_path: str
+    # Preprocessed copy the models read; image_path stays the report identity.
+    work_path: str = ""
+    raw_text: str = ""
+    image: Any = None
+    invoice: Optional[Invoice] = None
+    policy: Optional[Policy] = None
+    flags: Optional[ValidationFlags] = None
+    risk: Optional[RiskResult] = None
+    vlm_risk: Optional[RiskResult] = None
+    vlm_skip_reason: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkAuditor:
+    """Streams many invoices through an Auditor.
+
+    CPU stages (OCR, image decoding, rule validation, report assembly) run in
+    thread pools connected to the model stage by bounded queues, so the model
+    always has the next batch prepared while memory stays bounded. OCR itself
+    is serialized by the OcrEngine unless it has its own process pool.
+
+    The model thread never waits on rule validation: without the VLM pass it
+    runs on the writer side; with it, batch N is validated while batch N+1 is
+    extracted, and the VLM pass for batch N runs after that extraction.
+    """
+
+    def __init__(
+        self,
+        auditor: "Auditor",
+        vendor_db: Optional[VendorDB] = None,
+        policy_text: Optional[str] = None,
+        workers: int = 4,
+        queue_size: int = 16,
+    ) -> None:
+        self.auditor = auditor
+        self.vendor_db = vendor_db
+        self.policy = parse_policy(policy_text or "")
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+
+    def run(self, rows: Iterable[dict], out_path: str) -> BulkSummary:
+        summary = BulkSummary()
+        start = time.perf_counter()
+        pre_q: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        out_q: "queue.Queue[Any]" = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        writer_errors: List[BaseException] = []
+
+        with ThreadPoolExecutor(self.workers) as pre_pool, ThreadPoolExecutor(
+            self.workers
+        ) as post_pool:
+
+            def produce() -> None:
+                try:
+                    for row in rows:
+                        if stop.is_set():
+                            break
+                        pre_q.put(pre_pool.submit(self._prepare, row))
+                finally:
+                    pre_q.put(_DONE)
+
+            def write() -> None:
+                try:
+                    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+                    with Path(out_path).open("w", encoding="utf-8") as f:
+                        while True:
+                            fut = out_q.get()
+                            if fut is _DONE:
+                                return
+                            record = fut.result()
+                            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                            f.flush()
+                            summary.processed += 1
+                            if "error" in record:
+                                summary.failed += 1
+                except BaseException as exc:
+                    writer_errors.append(exc)
+                    stop.set()
+                # Keep draining so the model loop never blocks on a full queue.
+                while out_q.get() is not _DONE:
+                    pass
+
+            producer = threading.Thread(target=produce, daemon=True)
+            writer = threading.Thread(target=write, daemon=True)
+            producer.start()
+            writer.start()
+            try:
+                self._model_loop(pre_q, out_q, post_pool)
+            finally:
+                stop.set()
+                out_q.put(_DONE)
+                writer.join()
+                # Drain so a producer blocked on a full queue can exit.
+                while producer.is_alive():
+                    try:
+                        pre_q.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+
+        if writer_errors:
+            raise writer_errors[0]
+        summary.seconds = time.perf_counter() - start
+        return summary
+
+    def _model_loop(
+        self,
+        pre_q: "queue.Queue[Any]",
+        out_q: "queue.Queue[Any]",
+        post_pool: ThreadPoolExecutor,
+    ) -> None:
+        # Batch whose validation is still running, waiting for its VLM pass.
+        previous: Optional[Tuple[List[_Item], List[Future]]] = None
+        for items in self._batches(pre_q):
+            self._extract([item for item in items if item.error is None])
+            if self.auditor.vlm is None:
+                for item in items:
+                    out_q.put(post_pool.submit(self._finish, item))
+                continue
+            validations = [
+                post_pool.submit(self._validate, item) for item in items if item.error is None
+            ]
+            if previous is not None:
+                self._vlm_pass(*previous, out_q, post_pool)
+            previous = (items, validations)
+        if previous is not None:
+            self._vlm_pass(*previous, out_q, post_pool)
+
+    def _batches(self, pre_q: "queue.Queue[Any]") -> Iterator[List[_Item]]:
+        batch_size = max(1, self.auditor.extractor.model.max_batch_size)
+        finished = False
+        while not finished:
+            first = pre_q.get()
+            if first is _DONE:
+                return
+            pending: List[Future] = [first]
+            while len(pending) < batch_size:
+                try:
+                    nxt = pre_q.get_nowait()
+                except queue.Empty:
+                    break
+                if nxt is _DONE:
+                    finished = True
+                    break
+                pending.append(nxt)
+            yield [f.result() for f in pending]
+
+    def _vlm_pass(
+        self,
+        items: List[_Item],
+        validations: List[Future],
+        out_q: "queue.Queue[Any]",
+        post_pool: ThreadPoolExecutor,
+    ) -> None:
+        # Submitted one extraction batch ago, so normally already done.
+        for fut in validations:
+            fut.result()
+        self._analyze(self._gate([item for item in items if item.error is None]))
+        for item in items:
+            out_q.put(post_pool.submit(self._finish, item))
+
+    def _prepare(self, row: dict) -> _Item:
+        item = _Item(image_path=str(row["image_path"]))
+        item.work_path = item.image_path
+        if is_pdf(item.image_path):
+            # Rendered page by page on the model thread, so memory stays bounded.
+            return item
+        try:
+            # One decode per document, shared by OCR and both model calls.
+            item.work_path, item.image = self.auditor.load_document(item.image_path)
+            ocr_text = row.get("ocr_text")
+            if isinstance(ocr_text, str) and ocr_text.strip():
+                item.raw_text = ocr_text
+            else:
+                item.raw_text = self.auditor.ocr.extract_text(item.image, source=item.work_path)
+        except Exception as exc:
+            item.error = f"prepare: {exc}"
+        return item
+
+    def _extract(self, items: List[_Item]) -> None:
+        for item in [i for i in items if is_pdf(i.image_path)]:
+            try:
+                item.work_path, item.image, item.raw_text, item.invoice = (
+                    self.auditor.extract_pdf(item.image_path)
+                )
+            except Exception as exc:
+                item.error = f"extract: {exc}"
+        items = [i for i in items if not is_pdf(i.image_path)]
+        if not items:
+            return
+        extractor = self.auditor.extractor
+        try:
+            invoices = extractor.extract_batch(
+                [i.work_path for i in items],
+                [i.raw_text for i in items],
+                images=[i.image for i in items],
+            )
+            for item, invoice in zip(items, invoices):
+                item.invoice = invoice
+        except Exception:
+            # Isolate the failing invoice instead of dropping the whole batch.
+            for item in items:
+                try:
+                    item.invoice = extractor.extract_batch(
+                        [item.work_path], [item.raw_text], images=[item.image]
+                    )[0]
+                except Exception as exc:
+                    item.error = f"extract: {exc}"
+
+    def _validate(self, item: _Item) -> None:
+        try:
+            item.policy = self.auditor.resolve_policy(item.invoice, self.policy)
+            item.flags = self.auditor.validator.validate(
+                item.invoice, vendor_db=self.vendor_db, policy=item.policy, source=item.image_path
+            )
+        except Exception as exc:
+            item.error = f"validate: {exc}"
+
+    def _gate(self, items: List[_Item]) -> List[_Item]:
+        for item in items:
+            item.risk = self.auditor.risk_engine.score(item.flags)
+        reasons = self.auditor.vlm_skip_reasons(
+            [item.risk for item in items], [item.flags for item in items]
+        )
+        for item, reason in zip(items, reasons):
+            item.vlm_skip_reason = reason
+        return [item for item, reason in zip(items, reasons) if reason is None]
+
+    def _analyze(self, items: List[_Item]) -> None:
+        if not items:
+            return
+        vlm = self.auditor.vlm
+        try:
+            results = vlm.analyze_batch(
+                [i.work_path for i in items],
+                [asdict(i.invoice) for i in items],
+                [i.flags.__dict__ for i in items],
+                images=[i.image for i in items],
+            )
+            for item, result in zip(items, results):
+                item.vlm_risk = result
+        except Exception:
+            for item in items:
+                try:
+                    item.vlm_risk = vlm.analyze_batch(
+                        [item.work_path],
+                        [asdict(item.invoice)],
+                        [item.flags.__dict__],
+                        images=[item.image],
+                    )[0]
+                except Exception:
+                    # The rule-based verdict still stands without the VLM opinion.
+                    logger.exception("VLM analysis of %s failed", item.image_path)
+                    item.vlm_risk = None
+                    item.vlm_skip_reason = VLM_FAILED
+
+    def _finish(self, item: _Item) -> dict:
+        item.image = None
+        if item.error is None and item.flags is None:
+            self._validate(item)
+        if item.error is not None:
+            return {"image_path": item.image_path, "error": item.error}
+        try:
+            risk = item.risk or self.auditor.risk_engine.score(item.flags)
+            compliance = self.auditor.compliance.evaluate(
+                item.invoice, policy=item.policy, vendor_db=self.vendor_db, flags=item.flags
+            )
+        except Exception as exc:
+            return {"image_path": item.image_path, "error": f"finish: {exc}"}
+        return {
+            "image_path": item.image_path,
+            "extracted_json": asdict(item.invoice),
+            "flags": asdict(item.flags),
+            "risk": asdict(risk),
+            "vlm_risk": asdict(item.vlm_risk) if item.vlm_risk is not None else None,
+            "compliance": compliance,
+            "raw_text": item.raw_text,
+            "vlm_skip_reason": item.vlm_skip_reason,
+        }
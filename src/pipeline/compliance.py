@@ -2,15 +2,23 @@ from __future__ import annotations
 
 from typing import Optional
 
-from datetime import date
-
 from ..models.types import Invoice, ValidationFlags
-from ..utils.dates import parse_date
+from ..utils.dates import VendorDateFormats, parse_date
 from ..utils.policy import Policy
+from ..utils.profiling import profiled
 from ..utils.vendors import VendorDB
 
 
 class ComplianceEngine:
+    def __init__(
+        self,
+        fuzzy_vendor_threshold: Optional[float] = None,
+        date_formats: Optional[VendorDateFormats] = None,
+    ) -> None:
+        self.fuzzy_vendor_threshold = fuzzy_vendor_threshold
+        self.date_formats = date_formats
+
+    @profiled("compliance")
     def evaluate(
         self,
         invoice: Invoice,
@@ -21,12 +29,12 @@ class ComplianceEngine:
         answers = {}
 
         if policy and policy.start_date and policy.end_date:
-            inv_date = parse_date(invoice.invoice_date)
-            start = parse_date(policy.start_date)
-            end = parse_date(policy.end_date)
-            if inv_date and start and end:
+            inv_date = parse_date(
+                invoice.invoice_date, vendor=invoice.vendor_name, formats=self.date_formats
+            )
+            if inv_date and policy.start and policy.end:
                 answers["invoice_within_contract_period"] = (
-                    "yes" if start <= inv_date <= end else "no"
+                    "yes" if policy.start <= inv_date <= policy.end else "no"
                 )
             else:
                 answers["invoice_within_contract_period"] = "unknown"
@@ -36,9 +44,8 @@ class ComplianceEngine:
         if vendor_db is None:
             answers["vendor_is_approved"] = "unknown"
         else:
-            answers["vendor_is_approved"] = (
-                "yes" if vendor_db.find_vendor(invoice.vendor_name) is not None else "no"
-            )
+            vendor = vendor_db.lookup(invoice.vendor_name, self.fuzzy_vendor_threshold)
+            answers["vendor_is_approved"] = "yes" if vendor is not None else "no"
 
         if flags is not None:
             answers["invoice_internally_consistent"] = (
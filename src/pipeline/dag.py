@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+StageFn = Callable[[Dict[str, Any]], Any]
+
+
+@dataclass
+class _Stage:
+    name: str
+    fn: StageFn
+    deps: Tuple[str, ...]
+
+
+@dataclass
+class StageTimings:
+    """Start/end offsets (seconds from graph start) of each stage that ran."""
+
+    spans: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    deps: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+
+    @property
+    def wall_seconds(self) -> float:
+        return max((end for _, end in self.spans.values()), default=0.0)
+
+    def critical_path(self) -> List[str]:
+        """Chain of stages that bounded the wall-clock time.
+
+        Walks back from the last stage to finish, each time to the dependency
+        that finished last, i.e. the one the stage was actually waiting on.
+        """
+        if not self.spans:
+            return []
+        name = max(self.spans, key=lambda n: self.spans[n][1])
+        path = [name]
+        while True:
+            deps = [d for d in self.deps.get(name, ()) if d in self.spans]
+            if not deps:
+                break
+            name = max(deps, key=lambda n: self.spans[n][1])
+            path.append(name)
+        return path[::-1]
+
+    def as_dict(self) -> dict:
+        return {
+            "wall_seconds": round(self.wall_seconds, 4),
+            "critical_path": self.critical_path(),
+            "stages": {
+                name: {
+                    "start": round(start, 4),
+                    "end": round(end, 4),
+                    "seconds": round(end - start, 4),
+                }
+                for name, (start, end) in sorted(self.spans.items(), key=lambda kv: kv[1][0])
+            },
+        }
+
+
+class StageGraph:
+    """Dependency graph of pipeline stages.
+
+    Each stage is called with the dict of results produced so far and runs as
+    soon as all of its dependencies have finished, so independent stages run
+    concurrently on the executor. Stages must be added after their dependencies.
+    """
+
+    def __init__(self) -> None:
+        self._stages: Dict[str, _Stage] = {}
+
+    def add(self, name: str, fn: StageFn, deps: Sequence[str] = ()) -> "StageGraph":
+        missing = [d for d in deps if d not in self._stages]
+        if missing:
+            raise ValueError(f"stage {name!r} depends on unknown stages: {missing}")
+        if name in self._stages:
+            raise ValueError(f"duplicate stage {name!r}")
+        self._stages[name] = _Stage(name, fn, tuple(deps))
+        return self
+
+    def run(self, executor: Executor) -> Tuple[Dict[str, Any], StageTimings]:
+        results: Dict[str, Any] = {}
+        timings = StageTimings(deps={s.name: s.deps for s in self._stages.values()})
+        origin = time.perf_counter()
+        pending = dict(self._stages)
+        running: Dict[Future, str] = {}
+
+        def timed(stage: _Stage) -> Any:
+            start = time.perf_counter() - origin
+            try:
+                return stage.fn(results)
+            finally:
+                timings.spans[stage.name] = (start, time.perf_counter() - origin)
+
+        try:
+            while pending or running:
+                for stage in [s for s in pending.values() if all(d in results for d in s.deps)]:
+                    del pending[stage.name]
+                    running[executor.submit(timed, stage)] = stage.name
+                if not running:
+                    raise RuntimeError(f"stages can never run: {sorted(pending)}")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    results[running.pop(fut)] = fut.result()
+        finally:
+            for fut in running:
+                fut.cancel()
+        return results, timings
+
+    async def run_async(
+        self, executor: Optional[Executor] = None
+    ) -> Tuple[Dict[str, Any], StageTimings]:
+        loop = asyncio.get_running_loop()
+        results: Dict[str, Any] = {}
+        timings = StageTimings(deps={s.name: s.deps for s in self._stages.values()})
+        origin = time.perf_counter()
+        tasks: Dict[str, "asyncio.Task[Any]"] = {}
+
+        async def run_stage(stage: _Stage) -> None:
+            await asyncio.gather(*(tasks[d] for d in stage.deps))
+            start = time.perf_counter() - origin
+            try:
+                results[stage.name] = await loop.run_in_executor(executor, stage.fn, results)
+            finally:
+                timings.spans[stage.name] = (start, time.perf_counter() - origin)
+
+        for stage in self._stages.values():
+            tasks[stage.name] = asyncio.ensure_future(run_stage(stage))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            # Collect the outcome of every task so none is reported as unretrieved.
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+        return results, timings
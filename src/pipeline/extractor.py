@@ -1,39 +1,180 @@
 from __future__ import annotations
 
-from typing import Any
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
 
+from ..models.constrained import SchemaGrammar
 from ..models.qwen_vl import QwenVL
 from ..models.types import Invoice, LineItem
+from ..utils.cache import ResultCache, cached_generate
 from ..utils.parse import extract_json_block
+from ..utils.profiling import profiled
+from .ocr_parser import OcrInvoiceParser
+from .validator import LogicalValidator
+
+EXTRACTION_PROMPT = (
+    "Extract a JSON object with keys: "
+    "invoice_number, vendor_name, invoice_date, "
+    "line_items (name, qty, unit_price), subtotal, tax, total. "
+    "Return only JSON."
+)
+
+SCHEMA_PATH = Path(__file__).resolve().parents[2] / "schemas" / "invoice_extraction.schema.json"
 
 
 class StructuredExtractor:
-    def __init__(self, model_name: str) -> None:
-        self.model = QwenVL(model_name=model_name, max_new_tokens=512)
-
-    def extract(self, image_path: str, raw_text: str) -> Invoice:
-        prompt = (
-            "Extract a JSON object with keys: "
-            "invoice_number, vendor_name, invoice_date, "
-            "line_items (name, qty, unit_price), subtotal, tax, total. "
-            "Return only JSON."
+    def __init__(
+        self,
+        model_name: str,
+        device: Optional[str] = None,
+        dtype: Optional[str] = None,
+        max_batch_size: int = 4,
+        cache: Optional[ResultCache] = None,
+        constrained: bool = False,
+        schema_path: Optional[str] = None,
+        ocr_first: bool = False,
+        min_ocr_confidence: float = 0.9,
+        reuse_vision: bool = True,
+        model_factory: Optional[Callable[..., QwenVL]] = None,
+    ) -> None:
+        self.cache = cache
+        # Tier 1 of the cascade: a rule parser over the OCR lines. The model is
+        # only called when it is unsure or its numbers fail the validator.
+        self.ocr_parser = OcrInvoiceParser() if ocr_first else None
+        self.min_ocr_confidence = min_ocr_confidence
+        self._arithmetic = LogicalValidator()
+        self._stats_lock = threading.Lock()
+        self.cascade = {
+            "invoices": 0,
+            "ocr_accepted": 0,
+            "model": 0,
+            "incomplete": 0,
+            "low_confidence": 0,
+            "arithmetic_failed": 0,
+        }
+        # Compiled once; each generation call only walks the precompiled plan.
+        self.grammar = (
+            SchemaGrammar.from_file(str(schema_path or SCHEMA_PATH)) if constrained else None
+        )
+        # Weights are borrowed from the shared registry; only generation settings are per-stage.
+        self.model = (model_factory or QwenVL)(
+            model_name=model_name,
+            device=device,
+            dtype=dtype,
+            max_new_tokens=512,
+            max_batch_size=max_batch_size,
+            reuse_vision=reuse_vision,
         )
-        output = self.model.generate(prompt=prompt, image_path=image_path)
-        data = extract_json_block(output)
-        items = [
-            LineItem(
-                name=item.get("name", ""),
-                qty=float(item.get("qty", 0)),
-                unit_price=float(item.get("unit_price", 0)),
+
+    def extract(self, image_path: str, raw_text: str, image: Any = None) -> Invoice:
+        return self.extract_batch(
+            [image_path], [raw_text], images=[image] if image is not None else None
+        )[0]
+
+    @profiled("extract")
+    def extract_batch(
+        self,
+        image_paths: List[str],
+        raw_texts: List[str],
+        images: Optional[List[Any]] = None,
+        return_exceptions: bool = False,
+    ) -> List[Union[Invoice, Exception]]:
+        """Extract many invoices, results in input order.
+
+        With `return_exceptions` an output that does not parse leaves its
+        exception in that slot instead of failing the whole batch.
+        """
+        invoices: List[Any] = [None] * len(image_paths)
+        if self.ocr_parser is not None:
+            for i, raw_text in enumerate(raw_texts):
+                invoices[i] = self._try_ocr(raw_text)
+        todo = [i for i, invoice in enumerate(invoices) if invoice is None]
+        with self._stats_lock:
+            self.cascade["invoices"] += len(invoices)
+            self.cascade["ocr_accepted"] += len(invoices) - len(todo)
+            self.cascade["model"] += len(todo)
+        if todo:
+            generated = self._extract_with_model(
+                [image_paths[i] for i in todo],
+                [images[i] for i in todo] if images is not None else None,
+                return_exceptions=return_exceptions,
             )
-            for item in data.get("line_items", [])
-        ]
-        return Invoice(
-            invoice_number=str(data.get("invoice_number", "")),
-            vendor_name=str(data.get("vendor_name", "")),
-            invoice_date=str(data.get("invoice_date", "")),
-            line_items=items,
-            subtotal=float(data.get("subtotal", 0)),
-            tax=float(data.get("tax", 0)),
-            total=float(data.get("total", 0)),
+            for i, invoice in zip(todo, generated):
+                invoices[i] = invoice
+        return invoices  # type: ignore[return-value]
+
+    def cascade_stats(self) -> Dict[str, float]:
+        with self._stats_lock:
+            stats: Dict[str, float] = dict(self.cascade)
+        stats["skip_rate"] = stats["ocr_accepted"] / stats["invoices"] if stats["invoices"] else 0.0
+        return stats
+
+    def _try_ocr(self, raw_text: str) -> Optional[Invoice]:
+        parsed = self.ocr_parser.parse(raw_text)
+        reason = None
+        if not parsed.complete:
+            reason = "incomplete"
+        elif parsed.confidence < self.min_ocr_confidence:
+            reason = "low_confidence"
+        else:
+            flags = self._arithmetic.validate(parsed.invoice)
+            if flags.subtotal_mismatch or flags.total_mismatch:
+                reason = "arithmetic_failed"
+        if reason is not None:
+            with self._stats_lock:
+                self.cascade[reason] += 1
+            return None
+        return parsed.invoice
+
+    def _extract_with_model(
+        self,
+        image_paths: List[str],
+        images: Optional[List[Any]],
+        return_exceptions: bool = False,
+    ) -> List[Union[Invoice, Exception]]:
+        prompts = [EXTRACTION_PROMPT] * len(image_paths)
+        # Constrained and free-form outputs must not share cache entries.
+        cache_prompts = [p + "\n[schema-constrained]" for p in prompts] if self.grammar else prompts
+        outputs = cached_generate(
+            self.cache,
+            "extract",
+            self.model.model_name,
+            cache_prompts,
+            image_paths,
+            lambda idx: self.model.generate_batch(
+                [prompts[i] for i in idx],
+                [image_paths[i] for i in idx],
+                images=[images[i] for i in idx] if images is not None else None,
+                grammar=self.grammar,
+            ),
+        )
+        invoices: List[Union[Invoice, Exception]] = []
+        for output in outputs:
+            try:
+                invoices.append(to_invoice(extract_json_block(output)))
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                invoices.append(exc)
+        return invoices
+
+
+def to_invoice(data: dict[str, Any]) -> Invoice:
+    items = [
+        LineItem(
+            name=item.get("name", ""),
+            qty=float(item.get("qty", 0)),
+            unit_price=float(item.get("unit_price", 0)),
         )
+        for item in data.get("line_items", [])
+    ]
+    return Invoice(
+        invoice_number=str(data.get("invoice_number", "")),
+        vendor_name=str(data.get("vendor_name", "")),
+        invoice_date=str(data.get("invoice_date", "")),
+        line_items=items,
+        subtotal=float(data.get("subtotal", 0)),
+        tax=float(data.get("tax", 0)),
+        total=float(data.get("total", 0)),
+    )
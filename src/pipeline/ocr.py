@@ -1,6 +1,15 @@
 from __future__ import annotations
 
-from typing import List
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
+
+from ..utils.cache import ResultCache
+from ..utils.images import ImageInput, to_bgr
+from ..utils.profiling import profiled
 
 _paddle_import_error = None
 try:
@@ -9,26 +18,191 @@ except Exception as exc:  # pragma: no cover - optional dependency
     PaddleOCR = None
     _paddle_import_error = exc
 
+# (lang, cpu threads or None) -> object with PaddleOCR's `ocr(image, cls=...)`.
+# Must be picklable, since pool workers build their engine from it.
+EngineFactory = Callable[[str, Optional[int]], Any]
+
 
 class OcrEngine:
-    def __init__(self, lang: str = "en", enabled: bool = True) -> None:
+    """PaddleOCR wrapper.
+
+    With `workers > 0` OCR runs in a pool of spawned processes, each holding
+    its own PaddleOCR instance built once by the pool initializer; otherwise
+    it runs in the calling thread. The in-process predictor is not
+    thread-safe, so calls from several threads are serialized on it.
+    `engine_factory` swaps in another backend, e.g. a stub for benchmarks.
+    """
+
+    def __init__(
+        self,
+        lang: str = "en",
+        enabled: bool = True,
+        cache: Optional[ResultCache] = None,
+        workers: int = 0,
+        engine_factory: Optional[EngineFactory] = None,
+    ) -> None:
         self.enabled = enabled
+        self.lang = lang
+        self.cache = cache
+        self.workers = max(0, workers)
+        self.engine_factory = engine_factory or _paddle_engine
+        self.ocr = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._ocr_lock = threading.Lock()
         if not self.enabled:
-            self.ocr = None
             return
-        if PaddleOCR is None:
+        if engine_factory is None and PaddleOCR is None:
             raise RuntimeError(
                 "PaddleOCR failed to import. Install deps with: pip install -r requirements-ml.txt\n"
                 f"Import error: {_paddle_import_error}"
             )
-        self.ocr = PaddleOCR(use_angle_cls=True, lang=lang)
-
-    def extract_text(self, image_path: str) -> str:
-        if not self.enabled or self.ocr is None:
-            return ""
-        result = self.ocr.ocr(image_path, cls=True)
-        lines: List[str] = []
-        for page in result:
-            for line in page:
-                lines.append(line[1][0])
-        return "\n".join(lines)
+        if self.workers == 0:
+            self.ocr = self.engine_factory(lang, None)
+
+    def extract_text(self, image: ImageInput, source: Optional[str] = None) -> str:
+        """OCR a path, RGB array or PIL image.
+
+        `source` is the file the pixels were decoded from; when given it keys
+        the cache instead of hashing the pixels.
+        """
+        return self.extract_text_batch([image], [source])[0]  # type: ignore[return-value]
+
+    @profiled("ocr")
+    def extract_text_batch(
+        self,
+        images: Sequence[ImageInput],
+        sources: Optional[Sequence[Optional[str]]] = None,
+        return_exceptions: bool = False,
+    ) -> List[Union[str, Exception]]:
+        """OCR many images, results in input order.
+
+        A failing image does not stop the others. With `return_exceptions`
+        its slot holds the exception; otherwise the first failure is raised
+        once every image has been processed.
+        """
+        if not self.enabled:
+            return [""] * len(images)
+        sources = list(sources) if sources is not None else [None] * len(images)
+        results: List[Any] = [None] * len(images)
+        keys: List[Optional[str]] = [None] * len(images)
+        todo: List[int] = []
+        for i, image in enumerate(images):
+            if self.cache is not None:
+                keys[i] = self.cache.key(
+                    sources[i] or image, "ocr", f"lang={self.lang};cls=1", "paddleocr"
+                )
+                cached = self.cache.get(keys[i])
+                if cached is not None:
+                    results[i] = cached
+                    continue
+            todo.append(i)
+
+        if self.workers > 0:
+            self._run_in_pool(images, todo, results)
+        else:
+            for i in todo:
+                try:
+                    image = to_bgr(images[i])
+                    with self._ocr_lock:
+                        results[i] = _to_text(self.ocr.ocr(image, cls=True))
+                except Exception as exc:
+                    results[i] = exc
+
+        for i in todo:
+            if keys[i] is not None and isinstance(results[i], str):
+                self.cache.put(keys[i], "ocr", results[i])
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+    def close(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+    def _run_in_pool(
+        self, images: Sequence[ImageInput], todo: List[int], results: List[Any]
+    ) -> None:
+        # A crashed worker (e.g. a Paddle segfault) breaks the whole pool and
+        # fails every image still queued in it. Rebuild the pool and retry the
+        # unfinished images one at a time, so only an image that kills its
+        # worker again ends up failed.
+        for i in self._submit(images, todo, results):
+            self._submit(images, [i], results)
+
+    def _submit(
+        self, images: Sequence[ImageInput], indices: List[int], results: List[Any]
+    ) -> List[int]:
+        """OCR `indices` on the pool; returns those lost to a broken pool."""
+        pool = self._get_pool()
+        futures: List[Tuple[int, Future]] = []
+        broken: List[int] = []
+        for i in indices:
+            try:
+                futures.append((i, pool.submit(_worker_ocr, to_bgr(images[i]))))
+            except BrokenProcessPool as exc:
+                results[i] = exc
+                broken.append(i)
+            except Exception as exc:
+                results[i] = exc
+        for i, fut in futures:
+            try:
+                results[i] = fut.result()
+            except BrokenProcessPool as exc:
+                results[i] = exc
+                broken.append(i)
+            except Exception as exc:
+                results[i] = exc
+        if broken:
+            self._discard_pool(pool)
+        return sorted(broken)
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        with self._pool_lock:
+            # Another thread may already have replaced it.
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawn, not fork: Paddle's thread pools do not survive a fork.
+                # Each worker gets an equal share of the cores for its own threads.
+                threads = max(1, (os.cpu_count() or 1) // self.workers)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                    initargs=(self.engine_factory, self.lang, threads),
+                )
+            return self._pool
+
+
+def _to_text(result: Any) -> str:
+    # PaddleOCR returns [None] for a page without text.
+    return "\n".join(line[1][0] for page in result or [] if page for line in page)
+
+
+_worker_engine = None
+
+
+def _paddle_engine(lang: str, threads: Optional[int]) -> Any:
+    if PaddleOCR is None:
+        raise RuntimeError(f"PaddleOCR failed to import: {_paddle_import_error}")
+    if threads is None:
+        return PaddleOCR(use_angle_cls=True, lang=lang)
+    return PaddleOCR(use_angle_cls=True, lang=lang, cpu_threads=threads)
+
+
+def _init_worker(factory: EngineFactory, lang: str, threads: int) -> None:
+    global _worker_engine
+    _worker_engine = factory(lang, threads)
+
+
+def _worker_ocr(image: Any) -> str:
+    return _to_text(_worker_engine.ocr(image, cls=True))
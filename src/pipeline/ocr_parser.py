@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from ..models.types import Invoice, LineItem
+from ..utils.dates import parse_date
+from ..utils.math import compute_subtotal, nearly_equal
+
+_AMOUNT = r"[-(]?[$€£₹]?\s*(\d{1,3}(?:[,\s]\d{3})*(?:\.\d+)?|\d+(?:\.\d+)?)\)?"
+
+INVOICE_NO_RE = re.compile(
+    r"\b(?:invoice|inv|bill)\s*(?:no|number|num|#)?\.?\s*[:#]?\s*([A-Z0-9][A-Z0-9\-/]{2,})",
+    re.IGNORECASE,
+)
+DATE_RE = re.compile(r"\b(?:invoice\s+)?date(?:\s+of\s+issue)?\s*[:\-]?\s*(.+)$", re.IGNORECASE)
+VENDOR_RE = re.compile(
+    r"^\s*(?:vendor|seller|supplier|from|sold\s+by|billed\s+by)\s*[:\-]\s*(.+)$", re.IGNORECASE
+)
+SUBTOTAL_RE = re.compile(rf"\bsub[\s\-]?total\b\s*[:\-]?\s*{_AMOUNT}", re.IGNORECASE)
+TAX_RE = re.compile(
+    rf"\b(?:tax|vat|gst|sales\s+tax)\b(?:\s*\(?\d+(?:\.\d+)?\s*%\)?)?\s*[:\-]?\s*{_AMOUNT}",
+    re.IGNORECASE,
+)
+TOTAL_RE = re.compile(
+    rf"\b(?:grand\s+total|total\s+due|amount\s+due|balance\s+due|total)\b\s*[:\-]?\s*{_AMOUNT}",
+    re.IGNORECASE,
+)
+# "Widget 2 x 10.00" / "Widget 2 @ 10.00"
+ITEM_TIMES_RE = re.compile(rf"^(.+?)\s+(\d+(?:\.\d+)?)\s*(?:x|@|\*)\s*{_AMOUNT}\s*$", re.IGNORECASE)
+# "Widget  2  10.00  20.00" table rows (name, qty, unit price, amount)
+ITEM_ROW_RE = re.compile(rf"^(.+?)\s+(\d+(?:\.\d+)?)\s+{_AMOUNT}\s+{_AMOUNT}\s*$")
+
+_LABEL_RE = re.compile(
+    r"\b(?:invoice|date|total|tax|vat|gst|bill\s+to|ship\s+to|page|phone|tel|email|www\.)",
+    re.IGNORECASE,
+)
+
+# Relative weight of each field in the confidence score.
+FIELD_WEIGHTS = {
+    "invoice_number": 0.15,
+    "vendor_name": 0.15,
+    "invoice_date": 0.15,
+    "line_items": 0.15,
+    "subtotal": 0.1,
+    "tax": 0.05,
+    "total": 0.15,
+    "arithmetic": 0.1,
+}
+
+
+@dataclass
+class OcrParse:
+    invoice: Invoice
+    confidence: float
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+
+class OcrInvoiceParser:
+    """Deterministic extractor over OCR lines for clean, machine-printed invoices.
+
+    Labelled fields are matched line by line; the vendor falls back to the
+    first unlabelled header line. The confidence is the weighted share of
+    fields found, with the arithmetic checks counting as one more field.
+    """
+
+    def __init__(self, header_lines: int = 5) -> None:
+        self.header_lines = header_lines
+
+    def parse(self, raw_text: str) -> OcrParse:
+        lines = [line.strip() for line in (raw_text or "").splitlines() if line.strip()]
+        found = {}
+        partial = {}
+        invoice_number = vendor_name = invoice_date = ""
+        subtotal = tax = total = None
+        items: List[LineItem] = []
+
+        for line in lines:
+            if not invoice_number and not DATE_RE.search(line):
+                m = INVOICE_NO_RE.search(line)
+                if m and any(ch.isdigit() for ch in m.group(1)):
+                    invoice_number = m.group(1)
+            if not vendor_name:
+                m = VENDOR_RE.match(line)
+                if m:
+                    vendor_name = m.group(1).strip()
+            if not invoice_date:
+                m = DATE_RE.search(line)
+                if m and parse_date(m.group(1)) is not None:
+                    invoice_date = m.group(1).strip()
+            m = SUBTOTAL_RE.search(line)
+            if m:
+                subtotal = _amount(m.group(1))
+                continue
+            m = TAX_RE.search(line)
+            if m and tax is None:
+                tax = _amount(m.group(1))
+                continue
+            m = TOTAL_RE.search(line)
+            if m:
+                # The last "total" line wins; earlier ones tend to be column headers.
+                total = _amount(m.group(1))
+                continue
+            item = _line_item(line)
+            if item is not None:
+                items.append(item)
+
+        if not vendor_name:
+            for line in lines[: self.header_lines]:
+                if _LABEL_RE.search(line) or sum(ch.isalpha() for ch in line) < 3:
+                    continue
+                vendor_name = line
+                partial["vendor_name"] = 0.5
+                break
+
+        if subtotal is None and items:
+            subtotal = round(compute_subtotal(items), 2)
+            partial["subtotal"] = 0.5
+        if tax is None and subtotal is not None and total is not None and total >= subtotal:
+            tax = round(total - subtotal, 2)
+            partial["tax"] = 0.5
+
+        found["invoice_number"] = bool(invoice_number)
+        found["vendor_name"] = bool(vendor_name)
+        found["invoice_date"] = bool(invoice_date)
+        found["line_items"] = bool(items)
+        found["subtotal"] = subtotal is not None
+        found["tax"] = tax is not None
+        found["total"] = total is not None
+
+        invoice = Invoice(
+            invoice_number=invoice_number,
+            vendor_name=vendor_name,
+            invoice_date=invoice_date,
+            line_items=items,
+            subtotal=subtotal or 0.0,
+            tax=tax or 0.0,
+            total=total or 0.0,
+        )
+        found["arithmetic"] = (
+            found["subtotal"]
+            and found["total"]
+            and nearly_equal(compute_subtotal(items), invoice.subtotal)
+            and nearly_equal(invoice.subtotal + invoice.tax, invoice.total)
+        )
+        confidence = sum(
+            weight * partial.get(name, 1.0)
+            for name, weight in FIELD_WEIGHTS.items()
+            if found[name]
+        )
+        missing = [name for name, ok in found.items() if not ok and name != "arithmetic"]
+        return OcrParse(invoice=invoice, confidence=round(confidence, 4), missing=missing)
+
+
+def _amount(text: str) -> Optional[float]:
+    try:
+        return float(re.sub(r"[,\s]", "", text))
+    except ValueError:
+        return None
+
+
+def _line_item(line: str) -> Optional[LineItem]:
+    m = ITEM_ROW_RE.match(line)
+    if m:
+        qty, price, amount = float(m.group(2)), _amount(m.group(3)), _amount(m.group(4))
+        # Column order varies; only accept rows whose numbers agree.
+        if price is not None and amount is not None and nearly_equal(qty * price, amount):
+            return LineItem(name=m.group(1).strip(), qty=qty, unit_price=price)
+        return None
+    m = ITEM_TIMES_RE.match(line)
+    if m:
+        price = _amount(m.group(3))
+        if price is not None:
+            return LineItem(name=m.group(1).strip(), qty=float(m.group(2)), unit_price=price)
+    return None
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import queue
+import threading
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from ..models.types import Invoice
+
+_pdfium_import_error = None
+try:
+    import pypdfium2 as pdfium
+except Exception as exc:  # pragma: no cover - optional dependency
+    pdfium = None
+    _pdfium_import_error = exc
+
+PageTransform = Callable[[np.ndarray], np.ndarray]
+
+_DONE = object()
+
+
+def is_pdf(path: str) -> bool:
+    return Path(str(path)).suffix.lower() == ".pdf"
+
+
+def iter_pdf_pages(path: str, dpi: int = 150) -> Iterator[np.ndarray]:
+    """Rasterize pages one at a time as read-only RGB arrays.
+
+    Only the page being rendered is held by pdfium, so a long document never
+    sits in memory as a whole.
+    """
+    if pdfium is None:
+        raise RuntimeError(
+            "pypdfium2 failed to import. Install deps with: pip install -r requirements.txt\n"
+            f"Import error: {_pdfium_import_error}"
+        )
+    doc = pdfium.PdfDocument(path)
+    try:
+        for index in range(len(doc)):
+            page = doc[index]
+            try:
+                image = page.render(scale=dpi / 72.0).to_pil()
+            finally:
+                page.close()
+            pixels = np.asarray(image.convert("RGB"))
+            pixels.setflags(write=False)
+            yield pixels
+    finally:
+        doc.close()
+
+
+def iter_page_windows(
+    path: str,
+    dpi: int = 150,
+    window: int = 4,
+    transform: Optional[PageTransform] = None,
+) -> Iterator[List[np.ndarray]]:
+    """Yield pages in groups of `window` while the next group renders in the background.
+
+    The hand-off queue holds a single group, so at most three groups are alive
+    at once: the one being consumed, one queued and one rendering.
+    """
+    window = max(1, window)
+    handoff: "queue.Queue[object]" = queue.Queue(maxsize=1)
+    stop = threading.Event()
+
+    def render() -> None:
+        try:
+            group: List[np.ndarray] = []
+            for pixels in iter_pdf_pages(path, dpi):
+                if stop.is_set():
+                    return
+                group.append(transform(pixels) if transform is not None else pixels)
+                if len(group) == window:
+                    handoff.put(group)
+                    group = []
+            if group:
+                handoff.put(group)
+        except Exception as exc:
+            handoff.put(exc)
+        finally:
+            handoff.put(_DONE)
+
+    worker = threading.Thread(target=render, daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = handoff.get()
+            if item is _DONE:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item  # type: ignore[misc]
+    finally:
+        stop.set()
+        # Unblock a renderer waiting on the full queue so it can exit.
+        while worker.is_alive():
+            try:
+                handoff.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+
+def merge_page_invoices(pages: Sequence[Invoice]) -> Invoice:
+    """Fold per-page extractions into one invoice.
+
+    Header fields come from the first page that has them and line items are
+    concatenated in page order. Subtotal, tax and total are taken together
+    from the last page that states any amount (totals are printed at the
+    end), so a real zero tax there is not replaced by an earlier page's
+    running figure.
+    """
+    def first(field: str) -> str:
+        return next((getattr(p, field) for p in pages if getattr(p, field)), "")
+
+    totals = next((p for p in reversed(pages) if p.subtotal or p.tax or p.total), None)
+    return Invoice(
+        invoice_number=first("invoice_number"),
+        vendor_name=first("vendor_name"),
+        invoice_date=first("invoice_date"),
+        line_items=[item for page in pages for item in page.line_items],
+        subtotal=totals.subtotal if totals is not None else 0.0,
+        tax=totals.tax if totals is not None else 0.0,
+        total=totals.total if totals is not None else 0.0,
+    )
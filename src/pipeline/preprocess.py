@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from ..utils.cache import image_digest
+from ..utils.images import load_image
+from ..utils.profiling import profiled
+
+try:
+    import cv2
+except Exception:  # pragma: no cover - optional dependency
+    cv2 = None
+
+# Qwen2-VL turns every 28x28 pixel block into one visual token.
+PIXELS_PER_VISUAL_TOKEN = 28 * 28
+
+
+@dataclass(frozen=True)
+class PreprocessConfig:
+    max_pixels: int = 1024 * PIXELS_PER_VISUAL_TOKEN
+    grayscale: bool = True
+    crop: bool = True
+    fix_orientation: bool = True
+    # Margin kept around the detected document, as a fraction of its size.
+    margin: float = 0.02
+
+    @classmethod
+    def for_visual_tokens(cls, tokens: int, **kwargs: object) -> "PreprocessConfig":
+        return cls(max_pixels=tokens * PIXELS_PER_VISUAL_TOKEN, **kwargs)  # type: ignore[arg-type]
+
+    @property
+    def signature(self) -> str:
+        return (
+            f"px={self.max_pixels};gray={int(self.grayscale)};crop={int(self.crop)};"
+            f"orient={int(self.fix_orientation)};margin={self.margin}"
+        )
+
+
+def default_cache_dir() -> Path:
+    # Content-addressed, so every run and process can share one directory.
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "invoice-audit" / "preprocess"
+
+
+class ImagePreprocessor:
+    """Normalises invoice images before OCR and the VLM see them.
+
+    Fixes EXIF orientation, crops to the document, converts to grayscale and
+    downsizes to the pixel budget. Results are written once per (image
+    content, config) to `cache_dir` (default: `default_cache_dir()`) and
+    reused across runs; callers get back the path, or the path and pixels
+    from `load`.
+    """
+
+    def __init__(self, config: Optional[PreprocessConfig] = None, cache_dir: Optional[str] = None):
+        self.config = config or PreprocessConfig()
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {"images": 0, "cached": 0, "pixels_in": 0, "pixels_out": 0}
+
+    def __call__(self, image_path: str) -> str:
+        return self._run(image_path)[0]
+
+    def load(self, image_path: str) -> Tuple[str, np.ndarray]:
+        """Preprocessed path plus its decoded pixels, without re-reading a fresh result."""
+        out_path, processed = self._run(image_path)
+        if processed is None:
+            return out_path, load_image(out_path)
+        pixels = np.asarray(processed.convert("RGB"))
+        pixels.setflags(write=False)
+        return out_path, pixels
+
+    def _run(self, image_path: str) -> Tuple[str, Optional[Image.Image]]:
+        h = hashlib.sha256(f"{image_digest(image_path)}\0{self.config.signature}".encode("utf-8"))
+        out_path = self.cache_dir / f"{h.hexdigest()}.png"
+        if out_path.exists():
+            with self._lock:
+                self.stats["images"] += 1
+                self.stats["cached"] += 1
+            return out_path.as_posix(), None
+        with Image.open(image_path) as image:
+            pixels_in = image.width * image.height
+            processed = self.process(image)
+        # Write then rename so concurrent workers never read a partial file; the
+        # temp name is unique across threads and the processes sharing the cache.
+        with tempfile.NamedTemporaryFile(
+            dir=out_path.parent, prefix=out_path.stem, suffix=".tmp", delete=False
+        ) as tmp:
+            tmp_path = Path(tmp.name)
+            try:
+                processed.save(tmp, format="PNG")
+            except BaseException:
+                tmp.close()
+                tmp_path.unlink(missing_ok=True)
+                raise
+        tmp_path.replace(out_path)
+        with self._lock:
+            self.stats["images"] += 1
+            self.stats["pixels_in"] += pixels_in
+            self.stats["pixels_out"] += processed.width * processed.height
+        return out_path.as_posix(), processed
+
+    def process_array(self, pixels: np.ndarray) -> np.ndarray:
+        # In-memory variant for pages that never existed as files (PDF rasters).
+        out = np.asarray(self.process(Image.fromarray(pixels)).convert("RGB"))
+        out.setflags(write=False)
+        return out
+
+    @profiled("preprocess")
+    def process(self, image: Image.Image) -> Image.Image:
+        cfg = self.config
+        if cfg.fix_orientation:
+            image = ImageOps.exif_transpose(image)
+        image = image.convert("L") if cfg.grayscale else image.convert("RGB")
+        if cfg.crop:
+            box = document_box(np.asarray(image.convert("L")), cfg.margin)
+            if box is not None:
+                image = image.crop(box)
+        return resize_to_budget(image, cfg.max_pixels)
+
+
+def resize_to_budget(image: Image.Image, max_pixels: int) -> Image.Image:
+    pixels = image.width * image.height
+    if max_pixels <= 0 or pixels <= max_pixels:
+        return image
+    scale = math.sqrt(max_pixels / pixels)
+    size = (max(28, int(image.width * scale)), max(28, int(image.height * scale)))
+    return image.resize(size, Image.Resampling.LANCZOS)
+
+
+def document_box(gray: np.ndarray, margin: float = 0.02) -> Optional[Tuple[int, int, int, int]]:
+    """Bounding box (left, top, right, bottom) of the document, or None to keep all."""
+    h, w = gray.shape
+    if h < 32 or w < 32:
+        return None
+    threshold = _otsu(gray)
+    box = _paper_contour(gray, threshold) if cv2 is not None else None
+    if box is None:
+        # Page fills the frame (scans): trim the blank margins around the ink.
+        ys, xs = np.nonzero(gray < threshold)
+        if len(xs) == 0:
+            return None
+        box = (int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+    left, top, right, bottom = box
+    pad_x, pad_y = int((right - left) * margin), int((bottom - top) * margin)
+    box = (max(0, left - pad_x), max(0, top - pad_y), min(w, right + pad_x), min(h, bottom + pad_y))
+    # Ignore boxes that would throw away almost nothing or almost everything.
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    if area >= 0.97 * w * h or area < 0.05 * w * h:
+        return None
+    return box
+
+
+def _paper_contour(gray: np.ndarray, threshold: int) -> Optional[Tuple[int, int, int, int]]:
+    # Photos: the page is the largest bright region against a darker background.
+    mask = (gray >= threshold).astype(np.uint8) * 255
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, np.ones((15, 15), np.uint8))
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return None
+    x, y, bw, bh = cv2.boundingRect(max(contours, key=cv2.contourArea))
+    h, w = gray.shape
+    if bw * bh < 0.2 * w * h or bw * bh > 0.95 * w * h:
+        return None
+    return (x, y, x + bw, y + bh)
+
+
+def _otsu(gray: np.ndarray) -> int:
+    hist = np.bincount(gray.reshape(-1), minlength=256).astype(np.float64)
+    total = hist.sum()
+    levels = np.arange(256, dtype=np.float64)
+    weight_bg = np.cumsum(hist)
+    weight_fg = total - weight_bg
+    sum_bg = np.cumsum(hist * levels)
+    mean_bg = np.divide(sum_bg, weight_bg, out=np.zeros(256), where=weight_bg > 0)
+    mean_fg = np.divide(
+        sum_bg[-1] - sum_bg, weight_fg, out=np.zeros(256), where=weight_fg > 0
+    )
+    between = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+    return int(np.argmax(between)) + 1
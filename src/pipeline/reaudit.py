@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from ..models.columns import FLAG_NAMES, InvoiceColumns, flags_from_arrays
+from ..models.types import RiskResult, ValidationFlags
+from ..risk.engine import RiskEngine
+from ..utils.policy import Policy, PolicyRegistry, parse_policy
+from ..utils.vendors import VendorDB
+from .compliance import ComplianceEngine
+from .extractor import to_invoice
+from .validator import LogicalValidator
+
+REPORT_SUFFIXES = {".json", ".jsonl"}
+
+
+def iter_reports(path: str) -> Iterator[dict]:
+    """Yield previously written reports from a --json_out file, a JSONL file or a directory of them.
+
+    Both shapes are accepted: AuditReport JSON (`invoice`) and bulk records
+    (`extracted_json`). Failed bulk records are skipped. Reports written
+    without an `image_path` keep none; see ReAuditor.
+    """
+    p = Path(path)
+    if p.is_dir():
+        files = sorted(f for f in p.rglob("*") if f.suffix.lower() in REPORT_SUFFIXES)
+    else:
+        files = [p]
+    for file in files:
+        with file.open("r", encoding="utf-8") as f:
+            if file.suffix.lower() == ".json":
+                data = json.load(f)
+                rows = data if isinstance(data, list) else [data]
+                for row in rows:
+                    yield from _usable(row)
+                continue
+            for line in f:
+                if line.strip():
+                    yield from _usable(json.loads(line))
+
+
+def _usable(row: Any) -> Iterator[dict]:
+    if isinstance(row, dict) and isinstance(row.get("invoice", row.get("extracted_json")), dict):
+        yield row
+
+
+@dataclass
+class ReAuditSummary:
+    processed: int = 0
+    changed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def invoices_per_sec(self) -> float:
+        return self.processed / self.seconds if self.seconds > 0 else 0.0
+
+
+class ReAuditor:
+    """Re-runs the rule stages over stored extractions.
+
+    OCR and Qwen-VL outputs are taken from earlier reports, so only
+    validation, rule-based risk and compliance run, columnar and in chunks.
+    The stored VLM opinion is carried over as-is; it is not re-derived from
+    the new flags. Reports without an `image_path` (--json_out files written
+    before it was recorded) have no submission identity, so they skip the
+    seen-index duplicate check rather than being tracked under a made-up one.
+    """
+
+    def __init__(
+        self,
+        validator: Optional[LogicalValidator] = None,
+        risk_engine: Optional[RiskEngine] = None,
+        compliance: Optional[ComplianceEngine] = None,
+        vendor_db: Optional[VendorDB] = None,
+        policy_text: Optional[str] = None,
+        policy_registry: Optional[PolicyRegistry] = None,
+        chunk_size: int = 10_000,
+    ) -> None:
+        self.validator = validator or LogicalValidator()
+        self.risk_engine = risk_engine or RiskEngine()
+        self.compliance = compliance or ComplianceEngine(
+            fuzzy_vendor_threshold=self.validator.fuzzy_vendor_threshold,
+            date_formats=self.validator.date_formats,
+        )
+        self.vendor_db = vendor_db
+        self.policy = parse_policy(policy_text or "")
+        self.policy_registry = policy_registry
+        self.chunk_size = max(1, chunk_size)
+
+    def run(self, rows: Iterable[dict], out_path: str, diff: bool = False) -> ReAuditSummary:
+        summary = ReAuditSummary()
+        start = time.perf_counter()
+        Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+        with Path(out_path).open("w", encoding="utf-8") as f:
+            for chunk in _chunks(rows, self.chunk_size):
+                for record in self.reaudit(chunk, diff=diff):
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    summary.processed += 1
+                    if record.get("diff"):
+                        summary.changed += 1
+        summary.seconds = time.perf_counter() - start
+        return summary
+
+    def reaudit(self, rows: List[dict], diff: bool = False) -> List[dict]:
+        invoices = [to_invoice(row.get("invoice") or row["extracted_json"]) for row in rows]
+        policies = [self._resolve_policy(inv.vendor_name, inv.invoice_date) for inv in invoices]
+        arrays = self.validator.validate_batch(
+            InvoiceColumns.from_invoices(invoices),
+            vendor_db=self.vendor_db,
+            sources=[row.get("image_path") or None for row in rows],
+            policies=policies,
+        )
+        all_flags = flags_from_arrays(arrays)
+        risks = self.risk_engine.score_batch(arrays)
+        records = []
+        for row, invoice, policy, flags, risk in zip(rows, invoices, policies, all_flags, risks):
+            record = {
+                "image_path": row.get("image_path"),
+                "extracted_json": asdict(invoice),
+                "flags": asdict(flags),
+                "risk": asdict(risk),
+                "vlm_risk": row.get("vlm_risk"),
+                "compliance": self.compliance.evaluate(
+                    invoice, policy=policy, vendor_db=self.vendor_db, flags=flags
+                ),
+                "raw_text": row.get("raw_text", ""),
+                "vlm_skip_reason": row.get("vlm_skip_reason"),
+            }
+            if diff:
+                record["diff"] = diff_audit(row, flags, risk)
+            records.append(record)
+        return records
+
+    def _resolve_policy(self, vendor_name: str, invoice_date: str) -> Optional[Policy]:
+        if self.policy_registry is not None:
+            policy = self.policy_registry.resolve(
+                vendor_name, invoice_date, date_formats=self.validator.date_formats
+            )
+            if policy is not None:
+                return policy
+        return self.policy
+
+
+def diff_audit(old: dict, flags: ValidationFlags, risk: RiskResult) -> Dict[str, Any]:
+    """Changes between a stored report and its re-audit; empty when nothing moved."""
+    old_flags = old.get("flags") or {}
+    new_flags = asdict(flags)
+    changes: Dict[str, Any] = {}
+    added = [n for n in FLAG_NAMES if new_flags.get(n) and not old_flags.get(n)]
+    removed = [n for n in FLAG_NAMES if old_flags.get(n) and not new_flags.get(n)]
+    if added:
+        changes["flags_added"] = added
+    if removed:
+        changes["flags_removed"] = removed
+    old_risk = old.get("risk") or {}
+    if old_risk.get("risk_score") != risk.risk_score:
+        changes["risk_score"] = [old_risk.get("risk_score"), risk.risk_score]
+    if old_risk.get("risk_level") != risk.risk_level:
+        changes["risk_level"] = [old_risk.get("risk_level"), risk.risk_level]
+    return changes
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    chunk: List[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import functools
+import json
+import re
+import time
+from typing import Any, Callable, List, Mapping, Optional, Sequence, Union
+
+from ..utils.images import ImageInput
+from ..utils.profiling import profiled
+from .extractor import EXTRACTION_PROMPT
+
+_RAISED_FLAG_RE = re.compile(r"'\w+': True")
+
+
+class ReplayQwenVL:
+    """Deterministic stand-in for QwenVL that replays ground truth.
+
+    Extraction prompts get the known invoice JSON for the image path; risk
+    prompts get a score derived from the number of raised flags. `latency`
+    seconds per sequence emulate model cost. Takes the QwenVL constructor
+    keywords, so `replay_model_factory(...)` can be passed as an Auditor's
+    `model_factory`.
+    """
+
+    def __init__(
+        self,
+        answers: Mapping[str, dict],
+        model_name: str = "replay",
+        max_new_tokens: int = 512,
+        max_batch_size: int = 4,
+        latency: float = 0.0,
+        **_ignored: Any,
+    ) -> None:
+        self.answers = answers
+        self.model_name = model_name
+        self.max_new_tokens = max_new_tokens
+        self.max_batch_size = max_batch_size
+        self.latency = latency
+        self.stats = {
+            "calls": 0,
+            "sequences": 0,
+            "generated_tokens": 0,
+            "tokens_saved": 0,
+            "images_encoded": 0,
+            "images_reused": 0,
+            "vision_seconds": 0.0,
+            "seconds": 0.0,
+        }
+
+    def close(self) -> None:
+        pass
+
+    def generate(self, prompt: str, image: ImageInput) -> str:
+        return self.generate_batch([prompt], [image])[0]
+
+    def generate_batch(
+        self,
+        prompts: List[str],
+        image_paths: List[ImageInput],
+        images: Optional[List[ImageInput]] = None,
+        grammar: Any = None,
+    ) -> List[str]:
+        if len(prompts) != len(image_paths):
+            raise ValueError("prompts and image_paths must have the same length.")
+        start = time.perf_counter()
+        outputs = [self._respond(p, src) for p, src in zip(prompts, image_paths)]
+        if self.latency:
+            time.sleep(self.latency * len(prompts))
+        self.stats["calls"] += 1
+        self.stats["sequences"] += len(prompts)
+        self.stats["generated_tokens"] += sum(len(o) // 4 for o in outputs)
+        self.stats["seconds"] += time.perf_counter() - start
+        return outputs
+
+    def _respond(self, prompt: str, source: ImageInput) -> str:
+        if prompt == EXTRACTION_PROMPT:
+            key = source if isinstance(source, str) else ""
+            return json.dumps(self.answers.get(key, {}))
+        raised = len(_RAISED_FLAG_RE.findall(prompt))
+        score = min(100, 25 * raised)
+        level = "high" if score >= 60 else "medium" if score >= 30 else "low"
+        return json.dumps(
+            {
+                "risk_score": score,
+                "risk_level": level,
+                "justification": f"{raised} validation issue(s) replayed",
+                "confidence": "high",
+            }
+        )
+
+
+def replay_model_factory(
+    answers: Mapping[str, dict], latency: float = 0.0
+) -> Callable[..., ReplayQwenVL]:
+    return functools.partial(ReplayQwenVL, answers, latency=latency)
+
+
+class ReplayOcrEngine:
+    """OcrEngine stand-in that returns known text for each source path."""
+
+    def __init__(self, texts: Mapping[str, str], latency: float = 0.0) -> None:
+        self.texts = texts
+        self.latency = latency
+        self.enabled = True
+        self.lang = "en"
+        self.workers = 0
+
+    def extract_text(self, image: ImageInput, source: Optional[str] = None) -> str:
+        return self.extract_text_batch([image], [source])[0]  # type: ignore[return-value]
+
+    @profiled("ocr")
+    def extract_text_batch(
+        self,
+        images: Sequence[ImageInput],
+        sources: Optional[Sequence[Optional[str]]] = None,
+        return_exceptions: bool = False,
+    ) -> List[Union[str, Exception]]:
+        sources = list(sources) if sources is not None else [None] * len(images)
+        if self.latency:
+            time.sleep(self.latency * len(images))
+        return [
+            self.texts.get(src or (img if isinstance(img, str) else ""), "")
+            for img, src in zip(images, sources)
+        ]
+
+    def close(self) -> None:
+        pass
@@ -17,8 +17,20 @@ def render_report(report: AuditReport) -> str:
     if report.vlm_risk is not None:
         lines.append(f"VLM Risk: {report.vlm_risk.risk_score} ({report.vlm_risk.risk_level})")
         lines.append(f"VLM Justification: {report.vlm_risk.justification}")
+    elif report.vlm_skip_reason:
+        lines.append(f"VLM Risk: skipped ({report.vlm_skip_reason})")
     if report.compliance is not None:
         lines.append("Compliance:")
         for k, v in report.compliance.items():
             lines.append(f"- {k}: {v}")
+    if report.stage_timings:
+        timings = report.stage_timings
+        lines.append(
+            f"Stages ({timings['wall_seconds']:.3f}s, critical path: "
+            f"{' -> '.join(timings['critical_path'])}):"
+        )
+        for name, span in timings["stages"].items():
+            lines.append(
+                f"- {name}: {span['seconds']:.3f}s ({span['start']:.3f}-{span['end']:.3f})"
+            )
     return "\n".join(lines)
@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.profiling import get_profiler
+from ..utils.vendors import VendorDB
+
+if TYPE_CHECKING:
+    from ..main import Auditor
+
+MAX_BODY_BYTES = 1 << 20
+LATENCY_WINDOW = 2048
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Request:
+    image_path: str
+    deadline: float
+    future: "asyncio.Future[Any]"
+    received: float = field(default_factory=time.monotonic)
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+class AuditService:
+    """Resident HTTP front end for a warm Auditor.
+
+    Requests are queued and coalesced into micro-batches: a batch closes when
+    it reaches the model batch size or when `batch_window_ms` has passed since
+    its first request, whichever comes first. Batches run one at a time on a
+    dedicated model thread; requests arriving meanwhile form the next batch.
+    A full queue rejects new work with 503 and a request still waiting at its
+    deadline is answered with 504 and never reaches the model.
+
+    Endpoints: POST /audit {"image_path", "deadline_ms"?}, GET /health,
+    GET /metrics (JSON, or Prometheus text with ?format=prometheus).
+    """
+
+    def __init__(
+        self,
+        auditor: "Auditor",
+        vendor_db: Optional[VendorDB] = None,
+        policy_text: Optional[str] = None,
+        batch_window_ms: float = 10.0,
+        max_queue: int = 64,
+        deadline_ms: float = 30000.0,
+        max_batch_size: Optional[int] = None,
+    ) -> None:
+        self.auditor = auditor
+        self.vendor_db = vendor_db
+        self.policy_text = policy_text
+        self.batch_window = max(0.0, batch_window_ms) / 1000.0
+        self.max_queue = max(1, max_queue)
+        self.deadline = max(1.0, deadline_ms) / 1000.0
+        self.max_batch_size = max(
+            1, max_batch_size or auditor.extractor.model.max_batch_size
+        )
+        self.counters: Counter = Counter()
+        self.batch_sizes: Counter = Counter()
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.model_seconds = 0.0
+        self.started = time.monotonic()
+        self._queue: Optional["asyncio.Queue[_Request]"] = None
+        self._model_thread = ThreadPoolExecutor(1, thread_name_prefix="audit-model")
+
+    def run(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        try:
+            asyncio.run(self.serve(host, port))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._model_thread.shutdown(wait=True)
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        batcher = asyncio.create_task(self._batch_loop())
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        print(f"Serving on http://{host}:{port} (batch <= {self.max_batch_size}, "
+              f"window {self.batch_window * 1000:.0f}ms, queue {self.max_queue})")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "uptime_s": round(time.monotonic() - self.started, 1),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+        }
+
+    def metrics(self) -> dict:
+        batches = sum(self.batch_sizes.values())
+        batched = sum(size * n for size, n in self.batch_sizes.items())
+        latencies = np.asarray(self.latencies, dtype=np.float64)
+        if latencies.size:
+            p50, p99 = np.percentile(latencies, [50, 99])
+        else:
+            p50 = p99 = 0.0
+        return {
+            **self.health(),
+            "requests": dict(self.counters),
+            "batches": batches,
+            "mean_batch_size": round(batched / batches, 2) if batches else 0.0,
+            "batch_sizes": {str(k): v for k, v in sorted(self.batch_sizes.items())},
+            "latency_ms": {
+                "p50": round(float(p50) * 1000, 1),
+                "p99": round(float(p99) * 1000, 1),
+                "window": int(latencies.size),
+            },
+            "model_seconds": round(self.model_seconds, 3),
+            "generation": self.auditor.generation_stats(),
+        }
+
+    def prometheus(self) -> str:
+        metrics = self.metrics()
+        gauges = {
+            "service_queue_depth": metrics["queue_depth"],
+            "service_mean_batch_size": metrics["mean_batch_size"],
+            "service_latency_p50_seconds": metrics["latency_ms"]["p50"] / 1000,
+            "service_latency_p99_seconds": metrics["latency_ms"]["p99"] / 1000,
+        }
+        counters = {
+            "service_batches": metrics["batches"],
+            "service_model_seconds": metrics["model_seconds"],
+        }
+        for outcome, n in metrics["requests"].items():
+            counters[f"service_requests_{outcome}"] = n
+        return get_profiler().to_prometheus(extra=gauges, counters=counters)
+
+    async def submit(self, image_path: str, deadline_s: Optional[float] = None) -> dict:
+        """Queue one audit and wait for its report, honoring the deadline."""
+        loop = asyncio.get_running_loop()
+        timeout = deadline_s if deadline_s is not None else self.deadline
+        request = _Request(
+            image_path=image_path,
+            deadline=time.monotonic() + timeout,
+            future=loop.create_future(),
+        )
+        try:
+            self._queue.put_nowait(request)
+        except asyncio.QueueFull:
+            self.counters["rejected"] += 1
+            raise HttpError(HTTPStatus.SERVICE_UNAVAILABLE, "queue full, retry later")
+        self.counters["accepted"] += 1
+        try:
+            report = await asyncio.wait_for(asyncio.shield(request.future), timeout)
+        except asyncio.TimeoutError:
+            # The batcher skips a cancelled request, or discards its result if already running.
+            request.future.cancel()
+            self.counters["expired"] += 1
+            raise HttpError(HTTPStatus.GATEWAY_TIMEOUT, "deadline exceeded")
+        self.latencies.append(time.monotonic() - request.received)
+        return report
+
+    async def _batch_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            batch = [first]
+            close_at = first.received + self.batch_window
+            while len(batch) < self.max_batch_size:
+                remaining = close_at - time.monotonic()
+                if remaining <= 0:
+                    # Window over: take whatever is already waiting, but do not wait for more.
+                    try:
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    except asyncio.QueueEmpty:
+                        break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            now = time.monotonic()
+            live = [r for r in batch if not r.future.done() and r.deadline > now]
+            if not live:
+                continue
+            self.batch_sizes[len(live)] += 1
+            start = time.monotonic()
+            results = await loop.run_in_executor(
+                self._model_thread, self._run_batch, [r.image_path for r in live]
+            )
+            self.model_seconds += time.monotonic() - start
+            for request, result in zip(live, results):
+                if request.future.done():
+                    continue
+                if isinstance(result, Exception):
+                    self.counters["failed"] += 1
+                    request.future.set_exception(result)
+                else:
+                    self.counters["completed"] += 1
+                    request.future.set_result(result)
+
+    def _run_batch(self, image_paths: List[str]) -> List[Any]:
+        try:
+            reports: List[Any] = self.auditor.run_batch(
+                image_paths,
+                vendor_db=self.vendor_db,
+                policy_text=self.policy_text,
+                return_exceptions=True,
+            )
+        except Exception:
+            logger.exception("audit batch of %d failed; retrying one by one", len(image_paths))
+            reports = [None] * len(image_paths)
+        # Retry alone only the documents that did not finish in the batch.
+        results: List[Any] = []
+        for path, report in zip(image_paths, reports):
+            if isinstance(report, Exception):
+                logger.warning("audit of %s failed in batch (%r); retrying alone", path, report)
+            if report is None or isinstance(report, Exception):
+                try:
+                    report = self.auditor.run(
+                        path, vendor_db=self.vendor_db, policy_text=self.policy_text
+                    )
+                except Exception as exc:
+                    logger.exception("audit of %s failed", path)
+                    results.append(exc)
+                    continue
+            results.append(asdict(report))
+        return results
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader)
+                except HttpError as exc:
+                    await _write_response(writer, exc.status, {"error": str(exc)}, close=True)
+                    break
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, payload, extra = await self._dispatch(method, path, body)
+                close = headers.get("connection", "").lower() == "close"
+                await _write_response(writer, status, payload, close=close, headers=extra)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(
+        self, method: str, path: str, body: bytes
+    ) -> Tuple[HTTPStatus, Any, Dict[str, str]]:
+        path, _, query = path.partition("?")
+        try:
+            if path == "/health" and method == "GET":
+                return HTTPStatus.OK, self.health(), {}
+            if path == "/metrics" and method == "GET":
+                if "format=prometheus" in query.split("&"):
+                    return HTTPStatus.OK, self.prometheus(), {}
+                return HTTPStatus.OK, self.metrics(), {}
+            if path == "/audit" and method == "POST":
+                image_path, deadline_s = _parse_audit_body(body)
+                return HTTPStatus.OK, await self.submit(image_path, deadline_s), {}
+            if path in ("/health", "/metrics", "/audit"):
+                raise HttpError(HTTPStatus.METHOD_NOT_ALLOWED, f"{method} not allowed")
+            raise HttpError(HTTPStatus.NOT_FOUND, f"no route for {path}")
+        except HttpError as exc:
+            extra = {"Retry-After": "1"} if exc.status == HTTPStatus.SERVICE_UNAVAILABLE else {}
+            return exc.status, {"error": str(exc)}, extra
+        except Exception as exc:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(exc)}, {}
+
+
+def _parse_audit_body(body: bytes) -> Tuple[str, Optional[float]]:
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError as exc:
+        raise HttpError(HTTPStatus.BAD_REQUEST, f"invalid JSON: {exc}")
+    if not isinstance(payload, dict) or not isinstance(payload.get("image_path"), str):
+        raise HttpError(HTTPStatus.BAD_REQUEST, "body must be a JSON object with image_path")
+    deadline_ms = payload.get("deadline_ms")
+    if deadline_ms is None:
+        return payload["image_path"], None
+    if not isinstance(deadline_ms, (int, float)) or deadline_ms <= 0:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "deadline_ms must be a positive number")
+    return payload["image_path"], deadline_ms / 1000.0
+
+
+async def _read_request(
+    reader: asyncio.StreamReader,
+) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "malformed request line")
+    method, path, _ = parts
+    headers: Dict[str, str] = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HttpError(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method.upper(), path, headers, body
+
+
+async def _write_response(
+    writer: asyncio.StreamWriter,
+    status: HTTPStatus,
+    payload: Any,
+    close: bool = False,
+    headers: Optional[Dict[str, str]] = None,
+) -> None:
+    if isinstance(payload, str):
+        body = payload.encode("utf-8")
+        content_type = "text/plain; version=0.0.4"
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        content_type = "application/json"
+    lines = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'close' if close else 'keep-alive'}",
+    ]
+    lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
@@ -2,24 +2,41 @@ from __future__ import annotations
 
 import re
 from datetime import date
-from typing import Optional
+from typing import Dict, Optional, Sequence, Tuple
 
+import numpy as np
+
+from ..models.columns import FLAG_NAMES, InvoiceColumns
 from ..models.types import Invoice, ValidationFlags
-from ..utils.dates import parse_date
+from ..utils.dates import VendorDateFormats, parse_date, parse_date_hinted
 from ..utils.math import compute_subtotal, nearly_equal
 from ..utils.policy import Policy
+from ..utils.profiling import profiled
+from ..utils.seen import SeenInvoiceIndex
 from ..utils.vendors import VendorDB
 
 
 class LogicalValidator:
-    def __init__(self, high_unit_price_threshold: float = 10000.0):
+    def __init__(
+        self,
+        high_unit_price_threshold: float = 10000.0,
+        fuzzy_vendor_threshold: Optional[float] = None,
+        seen_index: Optional[SeenInvoiceIndex] = None,
+        date_formats: Optional[VendorDateFormats] = None,
+    ):
         self.high_unit_price_threshold = high_unit_price_threshold
+        self.fuzzy_vendor_threshold = fuzzy_vendor_threshold
+        self.seen_index = seen_index
+        # Read-only here: vendor day/month orders learned ahead of time.
+        self.date_formats = date_formats
 
+    @profiled("validate")
     def validate(
         self,
         invoice: Invoice,
         vendor_db: Optional[VendorDB] = None,
         policy: Optional[Policy] = None,
+        source: str = "",
     ) -> ValidationFlags:
         flags = ValidationFlags()
         subtotal_calc = compute_subtotal(invoice.line_items)
@@ -31,15 +48,15 @@ class LogicalValidator:
         if any(item.unit_price > self.high_unit_price_threshold for item in invoice.line_items):
             flags.high_unit_price = True
 
-        inv_date = parse_date(invoice.invoice_date)
+        inv_date = parse_date(
+            invoice.invoice_date, vendor=invoice.vendor_name, formats=self.date_formats
+        )
         if inv_date and inv_date > date.today():
             flags.invoice_date_future = True
 
         if policy is not None:
-            if policy.start_date and policy.end_date and inv_date:
-                start = parse_date(policy.start_date)
-                end = parse_date(policy.end_date)
-                if start and end and not (start <= inv_date <= end):
+            if policy.start and policy.end and inv_date:
+                if not (policy.start <= inv_date <= policy.end):
                     flags.date_outside_contract = True
 
             if policy.allowed_tax_rate is not None and invoice.subtotal > 0:
@@ -48,7 +65,7 @@ class LogicalValidator:
                     flags.tax_rate_unusual = True
 
         if vendor_db is not None:
-            vendor = vendor_db.find_vendor(invoice.vendor_name)
+            vendor = vendor_db.lookup(invoice.vendor_name, self.fuzzy_vendor_threshold)
             if vendor is None:
                 flags.vendor_not_found = True
             if vendor is not None and vendor.gst_number:
@@ -57,8 +74,147 @@ class LogicalValidator:
             if vendor_db.has_invoice_number(invoice.invoice_number):
                 flags.duplicate_invoice = True
 
+        if self.seen_index is not None:
+            if self.seen_index.check_and_add(
+                invoice.vendor_name, invoice.invoice_number, invoice.total, source=source
+            ):
+                flags.duplicate_invoice = True
+
         return flags
 
+    @profiled("validate_batch")
+    def validate_batch(
+        self,
+        columns: InvoiceColumns,
+        vendor_db: Optional[VendorDB] = None,
+        policy: Optional[Policy] = None,
+        sources: Optional[Sequence[Optional[str]]] = None,
+        policies: Optional[Sequence[Optional[Policy]]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """Flag many invoices at once; `policies` (one per row) overrides `policy`.
+
+        Rows whose source is None are not checked against the seen index; an
+        empty source (or no `sources`) counts as a new anonymous submission.
+        """
+        n = len(columns)
+        out = {name: np.zeros(n, dtype=bool) for name in FLAG_NAMES}
+        if n == 0:
+            return out
+
+        owner = columns.item_owner
+        subtotal_calc = np.bincount(
+            owner, weights=columns.item_qty * columns.item_unit_price, minlength=n
+        )
+        out["subtotal_mismatch"] = ~(np.abs(subtotal_calc - columns.subtotal) <= 0.01)
+        out["total_mismatch"] = ~(np.abs(columns.subtotal + columns.tax - columns.total) <= 0.01)
+        pricey = columns.item_unit_price > self.high_unit_price_threshold
+        out["high_unit_price"] = np.bincount(owner, weights=pricey, minlength=n) > 0
+
+        inv_dates = _parse_dates(columns.invoice_date, columns.vendor_name, self.date_formats)
+        has_date = ~np.isnat(inv_dates)
+        out["invoice_date_future"] = has_date & (inv_dates > np.datetime64(date.today(), "D"))
+
+        if policies is not None:
+            lo, hi, allowed = _policy_columns(policies)
+            bounded = ~np.isnat(lo) & ~np.isnat(hi)
+            out["date_outside_contract"] = (
+                has_date & bounded & ~((lo <= inv_dates) & (inv_dates <= hi))
+            )
+            positive = (columns.subtotal > 0) & ~np.isnan(allowed)
+            rate = np.zeros(n, dtype=np.float64)
+            np.divide(columns.tax, columns.subtotal, out=rate, where=positive)
+            rate *= 100.0
+            out["tax_rate_unusual"] = positive & (np.abs(rate - allowed) > 1.0)
+        elif policy is not None:
+            if policy.start and policy.end:
+                lo = np.datetime64(policy.start, "D")
+                hi = np.datetime64(policy.end, "D")
+                out["date_outside_contract"] = has_date & ~((lo <= inv_dates) & (inv_dates <= hi))
+
+            if policy.allowed_tax_rate is not None:
+                positive = columns.subtotal > 0
+                rate = np.zeros(n, dtype=np.float64)
+                np.divide(columns.tax, columns.subtotal, out=rate, where=positive)
+                rate *= 100.0
+                out["tax_rate_unusual"] = positive & (
+                    np.abs(rate - policy.allowed_tax_rate) > 1.0
+                )
+
+        if vendor_db is not None:
+            names, name_idx = np.unique(columns.vendor_name.astype(str), return_inverse=True)
+            not_found = np.zeros(len(names), dtype=bool)
+            gst_invalid = np.zeros(len(names), dtype=bool)
+            for i, name in enumerate(names.tolist()):
+                vendor = vendor_db.lookup(name, self.fuzzy_vendor_threshold)
+                if vendor is None:
+                    not_found[i] = True
+                elif vendor.gst_number and not _valid_gst(str(vendor.gst_number)):
+                    gst_invalid[i] = True
+            out["vendor_not_found"] = not_found[name_idx]
+            out["gst_invalid"] = gst_invalid[name_idx]
+
+            numbers, number_idx = np.unique(columns.invoice_number.astype(str), return_inverse=True)
+            known = np.array([vendor_db.has_invoice_number(x) for x in numbers.tolist()], dtype=bool)
+            out["duplicate_invoice"] = known[number_idx]
+
+        if self.seen_index is not None:
+            # Order matters for first-seen semantics, so this stays a row loop.
+            for i in range(n):
+                if sources is not None and sources[i] is None:
+                    continue
+                if self.seen_index.check_and_add(
+                    str(columns.vendor_name[i]),
+                    str(columns.invoice_number[i]),
+                    float(columns.total[i]),
+                    source=sources[i] if sources is not None else "",
+                ):
+                    out["duplicate_invoice"][i] = True
+
+        return out
+
+
+def _policy_columns(
+    policies: Sequence[Optional[Policy]],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Contract window bounds (NaT when open) and allowed tax rate (NaN when unset) per row.
+    n = len(policies)
+    lo = np.full(n, np.datetime64("NaT"), dtype="datetime64[D]")
+    hi = np.full(n, np.datetime64("NaT"), dtype="datetime64[D]")
+    allowed = np.full(n, np.nan, dtype=np.float64)
+    for i, policy in enumerate(policies):
+        if policy is None:
+            continue
+        if policy.start and policy.end:
+            lo[i] = policy.start
+            hi[i] = policy.end
+        if policy.allowed_tax_rate is not None:
+            allowed[i] = policy.allowed_tax_rate
+    return lo, hi, allowed
+
+
+def _parse_dates(
+    values: np.ndarray, vendors: np.ndarray, formats: Optional[VendorDateFormats]
+) -> np.ndarray:
+    # Vendor matters only through its learned day/month order, so parse once
+    # per unique (order, value) pair. The order is packed into a one-char prefix.
+    if formats is None:
+        hints = [None] * len(vendors)
+    else:
+        hints = [formats.hint(v) for v in vendors.tolist()]
+    prefixes = np.array([_ORDER_PREFIX[h] for h in hints], dtype=str)
+    keys = np.char.add(prefixes, values.astype(str))
+    unique, inverse = np.unique(keys, return_inverse=True)
+    parsed = [parse_date_hinted(key[1:], _PREFIX_ORDER[key[0]]) for key in unique.tolist()]
+    days = np.array(
+        [np.datetime64(d, "D") if d is not None else np.datetime64("NaT", "D") for d in parsed],
+        dtype="datetime64[D]",
+    )
+    return days[inverse.reshape(-1)]
+
+
+_ORDER_PREFIX = {None: "-", "dmy": "d", "mdy": "m"}
+_PREFIX_ORDER = {v: k for k, v in _ORDER_PREFIX.items()}
+
 
 GST_RE = re.compile(r"^[A-Z0-9]{6,15}$", re.IGNORECASE)
 
@@ -1,30 +1,81 @@
 from __future__ import annotations
 
-from typing import Any
+from typing import Any, Callable, List, Optional
 
 from ..models.qwen_vl import QwenVL
 from ..models.types import RiskResult
+from ..utils.cache import ResultCache, cached_generate
 from ..utils.parse import extract_json_block
+from ..utils.profiling import profiled
 
 
 class VlmRiskAnalyzer:
-    def __init__(self, model_name: str) -> None:
-        self.model = QwenVL(model_name=model_name, max_new_tokens=256)
-
-    def analyze(self, image_path: str, extracted_json: dict, flags: dict) -> RiskResult:
-        prompt = (
-            "Analyze this invoice for fraud risk. "
-            "Return JSON with keys: risk_score (0-100), risk_level, "
-            "justification, confidence. "
-            f"Validation issues found: {flags}. "
-            f"Extracted JSON: {extracted_json}. "
-            "Return only JSON."
+    def __init__(
+        self,
+        model_name: str,
+        device: Optional[str] = None,
+        dtype: Optional[str] = None,
+        max_batch_size: int = 4,
+        cache: Optional[ResultCache] = None,
+        reuse_vision: bool = True,
+        model_factory: Optional[Callable[..., QwenVL]] = None,
+    ) -> None:
+        self.cache = cache
+        self.model = (model_factory or QwenVL)(
+            model_name=model_name,
+            device=device,
+            dtype=dtype,
+            max_new_tokens=256,
+            max_batch_size=max_batch_size,
+            reuse_vision=reuse_vision,
         )
-        output = self.model.generate(prompt=prompt, image_path=image_path)
-        data = extract_json_block(output)
-        return RiskResult(
-            risk_score=int(data.get("risk_score", 0)),
-            risk_level=str(data.get("risk_level", "")),
-            justification=str(data.get("justification", "")),
-            confidence=str(data.get("confidence", "")),
+
+    def analyze(
+        self, image_path: str, extracted_json: dict, flags: dict, image: Any = None
+    ) -> RiskResult:
+        return self.analyze_batch(
+            [image_path], [extracted_json], [flags], images=[image] if image is not None else None
+        )[0]
+
+    @profiled("vlm")
+    def analyze_batch(
+        self,
+        image_paths: List[str],
+        extracted_jsons: List[dict],
+        flags: List[dict],
+        images: Optional[List[Any]] = None,
+    ) -> List[RiskResult]:
+        prompts = [_risk_prompt(e, f) for e, f in zip(extracted_jsons, flags)]
+        outputs = cached_generate(
+            self.cache,
+            "risk",
+            self.model.model_name,
+            prompts,
+            image_paths,
+            lambda idx: self.model.generate_batch(
+                [prompts[i] for i in idx],
+                [image_paths[i] for i in idx],
+                images=[images[i] for i in idx] if images is not None else None,
+            ),
         )
+        return [_to_risk(extract_json_block(output)) for output in outputs]
+
+
+def _risk_prompt(extracted_json: dict, flags: dict) -> str:
+    return (
+        "Analyze this invoice for fraud risk. "
+        "Return JSON with keys: risk_score (0-100), risk_level, "
+        "justification, confidence. "
+        f"Validation issues found: {flags}. "
+        f"Extracted JSON: {extracted_json}. "
+        "Return only JSON."
+    )
+
+
+def _to_risk(data: dict[str, Any]) -> RiskResult:
+    return RiskResult(
+        risk_score=int(data.get("risk_score", 0)),
+        risk_level=str(data.get("risk_level", "")),
+        justification=str(data.get("justification", "")),
+        confidence=str(data.get("confidence", "")),
+    )
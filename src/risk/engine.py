@@ -1,42 +1,113 @@
 from __future__ import annotations
 
+import json
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..models.columns import FLAG_NAMES, flags_to_matrix
 from ..models.types import RiskResult, ValidationFlags
+from ..utils.profiling import profiled
+
+DEFAULT_WEIGHTS: Dict[str, int] = {
+    "subtotal_mismatch": 25,
+    "total_mismatch": 25,
+    "high_unit_price": 20,
+    "gst_invalid": 10,
+    "gst_mismatch": 10,
+    "duplicate_invoice": 10,
+    "date_outside_contract": 10,
+    "vendor_not_found": 15,
+    "invoice_date_future": 15,
+    "tax_rate_unusual": 10,
+}
+
+DEFAULT_LEVELS: Dict[str, int] = {"high": 70, "medium": 40}
+
+JUSTIFICATION = "Rule-based risk scoring from validation flags."
 
 
 class RiskEngine:
+    def __init__(
+        self,
+        weights: Optional[Mapping[str, int]] = None,
+        levels: Optional[Mapping[str, int]] = None,
+    ) -> None:
+        weights = dict(weights or {})
+        unknown = set(weights) - set(FLAG_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown risk flags in weight table: {sorted(unknown)}")
+        # A table only overrides the flags it names; set a weight to 0 to turn a flag off.
+        weights = {**DEFAULT_WEIGHTS, **weights}
+        self.weights = {name: int(weights.get(name, 0)) for name in FLAG_NAMES}
+        self.levels = {**DEFAULT_LEVELS, **(levels or {})}
+        self._weight_vector = np.array([self.weights[n] for n in FLAG_NAMES], dtype=np.int64)
+        self._bits = np.left_shift(np.uint32(1), np.arange(len(FLAG_NAMES), dtype=np.uint32))
+
+    @classmethod
+    def from_file(cls, path: str) -> "RiskEngine":
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        return cls(weights=data.get("weights"), levels=data.get("levels"))
+
+    @profiled("risk")
     def score(self, flags: ValidationFlags) -> RiskResult:
         score = 0
-        if flags.subtotal_mismatch:
-            score += 25
-        if flags.total_mismatch:
-            score += 25
-        if flags.high_unit_price:
-            score += 20
-        if flags.gst_invalid:
-            score += 10
-        if flags.gst_mismatch:
-            score += 10
-        if flags.duplicate_invoice:
-            score += 10
-        if flags.date_outside_contract:
-            score += 10
-        if flags.vendor_not_found:
-            score += 15
-        if flags.invoice_date_future:
-            score += 15
-        if flags.tax_rate_unusual:
-            score += 10
-
-        if score >= 70:
-            level = "high"
-        elif score >= 40:
-            level = "medium"
-        else:
-            level = "low"
+        for name, weight in self.weights.items():
+            if getattr(flags, name):
+                score += weight
 
         return RiskResult(
             risk_score=score,
-            risk_level=level,
-            justification="Rule-based risk scoring from validation flags.",
+            risk_level=self._level(score),
+            justification=JUSTIFICATION,
             confidence="medium",
         )
+
+    def score_arrays(
+        self, matrix: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Score an (n, len(FLAG_NAMES)) boolean flag matrix.
+
+        Returns risk scores, risk levels and a uint32 bitmask of triggered flags
+        (bit i is FLAG_NAMES[i]) for every row.
+        """
+        matrix = np.asarray(matrix, dtype=bool)
+        scores = matrix.astype(np.int64) @ self._weight_vector
+        levels = np.where(
+            scores >= self.levels["high"],
+            "high",
+            np.where(scores >= self.levels["medium"], "medium", "low"),
+        ).astype(object)
+        codes = (matrix * self._bits).sum(axis=1, dtype=np.uint32)
+        return scores, levels, codes
+
+    @profiled("risk_batch")
+    def score_batch(
+        self, flags: Union[Sequence[ValidationFlags], Dict[str, np.ndarray]]
+    ) -> List[RiskResult]:
+        if isinstance(flags, dict):
+            matrix = np.column_stack([np.asarray(flags[name], dtype=bool) for name in FLAG_NAMES])
+        else:
+            matrix = flags_to_matrix(flags)
+        scores, levels, _ = self.score_arrays(matrix)
+        return [
+            RiskResult(
+                risk_score=score,
+                risk_level=level,
+                justification=JUSTIFICATION,
+                confidence="medium",
+            )
+            for score, level in zip(scores.tolist(), levels.tolist())
+        ]
+
+    def _level(self, score: int) -> str:
+        if score >= self.levels["high"]:
+            return "high"
+        if score >= self.levels["medium"]:
+            return "medium"
+        return "low"
+
+
+def decode_codes(code: int) -> List[str]:
+    return [name for i, name in enumerate(FLAG_NAMES) if code & (1 << i)]
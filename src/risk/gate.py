@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Iterable, List, Optional, Sequence
+
+from ..models.columns import FLAG_NAMES
+from ..models.types import RiskResult, ValidationFlags
+
+SKIP_BELOW_BAND = "rule_score_below_band"
+SKIP_ABOVE_BAND = "rule_score_above_band"
+SKIP_BUDGET = "budget_exhausted"
+SKIP_NO_TRIGGER = "no_trigger_flag"
+# Not a gate decision: set when the VLM was asked and raised.
+VLM_FAILED = "vlm_failed"
+
+
+class VlmGate:
+    """Decides which invoices get the second (VLM) risk opinion.
+
+    An invoice is a candidate when its rule score lies in the uncertain band
+    [min_score, max_score] or any of `trigger_flags` is set; with no band
+    (both bounds None) only the trigger flags count. With a budget, at most
+    that fraction of invoices seen so far, rounded up, is sent to the VLM, so
+    the first triggered invoice of a run is never starved by rounding. The
+    allowance carries over between batches, and within a batch the trigger
+    hits and the scores nearest the middle of the band go first.
+    """
+
+    def __init__(
+        self,
+        min_score: Optional[int] = 1,
+        max_score: Optional[int] = 99,
+        trigger_flags: Iterable[str] = (),
+        budget: Optional[float] = None,
+    ) -> None:
+        if (min_score is None) != (max_score is None):
+            raise ValueError("min_score and max_score must both be set or both be None")
+        if min_score is not None and max_score is not None and min_score > max_score:
+            raise ValueError("min_score must not exceed max_score")
+        trigger_flags = tuple(trigger_flags)
+        unknown = set(trigger_flags) - set(FLAG_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown trigger flags: {sorted(unknown)}")
+        if budget is not None and not 0.0 <= budget <= 1.0:
+            raise ValueError("budget must be a fraction between 0 and 1")
+        self.min_score = min_score
+        self.max_score = max_score
+        self.trigger_flags = trigger_flags
+        self.budget = budget
+        self._lock = threading.Lock()
+        self.seen = 0
+        self.used = 0
+
+    def decide(
+        self, risks: Sequence[RiskResult], flags: Sequence[ValidationFlags]
+    ) -> List[Optional[str]]:
+        """Return a skip reason per invoice, or None where the VLM should run."""
+        reasons: List[Optional[str]] = []
+        priority = []
+        banded = self.min_score is not None and self.max_score is not None
+        mid = (self.min_score + self.max_score) / 2.0 if banded else 0.0
+        for i, (risk, flag) in enumerate(zip(risks, flags)):
+            triggered = any(getattr(flag, name) for name in self.trigger_flags)
+            score = risk.risk_score
+            if triggered or (banded and self.min_score <= score <= self.max_score):
+                reasons.append(None)
+                priority.append((not triggered, abs(score - mid), i))
+            elif not banded:
+                reasons.append(SKIP_NO_TRIGGER)
+            else:
+                reasons.append(SKIP_BELOW_BAND if score < self.min_score else SKIP_ABOVE_BAND)
+
+        with self._lock:
+            self.seen += len(reasons)
+            allowed = len(priority)
+            if self.budget is not None:
+                allowed = min(allowed, max(0, math.ceil(self.budget * self.seen) - self.used))
+            self.used += allowed
+        for _, _, i in sorted(priority)[allowed:]:
+            reasons[i] = SKIP_BUDGET
+        return reasons
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "invoices": self.seen,
+                "vlm_calls": self.used,
+                "call_rate": self.used / self.seen if self.seen else 0.0,
+            }
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from .images import ImageInput, pixels_digest
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    stage TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+)
+"""
+
+
+class ResultCache:
+    def __init__(
+        self,
+        path: str,
+        max_bytes: Optional[int] = None,
+        max_age_seconds: Optional[float] = None,
+        bypass: bool = False,
+        evict_every: int = 256,
+    ) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        # Bypass skips lookups but still stores fresh results.
+        self.bypass = bypass
+        self.evict_every = max(1, evict_every)
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def key(self, image_path: ImageInput, stage: str, prompt: str, model_name: str) -> str:
+        h = hashlib.sha256()
+        for part in (image_digest(image_path), stage, model_name, prompt):
+            h.update(part.encode("utf-8"))
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if self.bypass:
+            with self._lock:
+                self.misses += 1
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and self.max_age_seconds is not None:
+                if now - row[1] > self.max_age_seconds:
+                    row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return row[0]
+
+    def put(self, key: str, stage: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (key, stage, value, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, stage, value, len(value.encode("utf-8")), now, now),
+            )
+            self._conn.commit()
+            self._puts += 1
+            if self._puts % self.evict_every == 0:
+                self._evict_locked()
+
+    def evict(self) -> int:
+        with self._lock:
+            return self._evict_locked()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _evict_locked(self) -> int:
+        removed = 0
+        if self.max_age_seconds is not None:
+            cur = self._conn.execute(
+                "DELETE FROM results WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+            )
+            removed += cur.rowcount
+        if self.max_bytes is not None:
+            (size,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+            if size > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT key, size FROM results ORDER BY accessed_at ASC"
+                ).fetchall()
+                doomed = []
+                for key, entry_size in rows:
+                    if size <= self.max_bytes:
+                        break
+                    doomed.append((key,))
+                    size -= entry_size
+                self._conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+                removed += len(doomed)
+        self._conn.commit()
+        return removed
+
+
+def image_digest(image_path: ImageInput) -> str:
+    # In-memory images are keyed by their pixels; files by content, memoised on mtime/size.
+    if not isinstance(image_path, (str, os.PathLike)):
+        return pixels_digest(image_path)
+    st = os.stat(image_path)
+    return _file_digest(os.path.abspath(image_path), st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=4096)
+def _file_digest(path: str, mtime_ns: int, size: int) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cached_generate(
+    cache: Optional[ResultCache],
+    stage: str,
+    model_name: str,
+    prompts: Sequence[str],
+    image_paths: Sequence[ImageInput],
+    generate: Callable[[List[int]], List[str]],
+) -> List[str]:
+    """Return one output per prompt, calling ``generate`` only for cache misses.
+
+    ``generate`` receives the indices that missed and must return their outputs
+    in the same order.
+    """
+    if cache is None:
+        return generate(list(range(len(prompts))))
+    keys = [cache.key(p, stage, prompt, model_name) for prompt, p in zip(prompts, image_paths)]
+    outputs: Dict[int, str] = {}
+    missing: List[int] = []
+    for i, key in enumerate(keys):
+        value = cache.get(key)
+        if value is None:
+            missing.append(i)
+        else:
+            outputs[i] = value
+    if missing:
+        for i, value in zip(missing, generate(missing)):
+            cache.put(keys[i], stage, value)
+            outputs[i] = value
+    return [outputs[i] for i in range(len(prompts))]
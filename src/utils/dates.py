@@ -1,15 +1,164 @@
 from __future__ import annotations
 
+import json
+import re
+import threading
 from datetime import date
-from typing import Optional
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
 
 from dateutil import parser
 
+_TIME = r"(?:[T ]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?"
+ISO_RE = re.compile(rf"^(\d{{4}})([-/.])(\d{{1,2}})\2(\d{{1,2}}){_TIME}$")
+NUMERIC_RE = re.compile(rf"^(\d{{1,2}})([-/.])(\d{{1,2}})\2(\d{{4}}){_TIME}$")
+DAY_MONTH_RE = re.compile(r"^(\d{1,2})(?:st|nd|rd|th)?[\s\-]+([A-Za-z]{3,9})\.?,?[\s\-]+(\d{4})$")
+MONTH_DAY_RE = re.compile(r"^([A-Za-z]{3,9})\.?[\s\-]+(\d{1,2})(?:st|nd|rd|th)?,?[\s\-]+(\d{4})$")
 
-def parse_date(value: str) -> Optional[date]:
+_MONTHS = {
+    name: i
+    for i, names in enumerate(
+        [
+            ("jan", "january"),
+            ("feb", "february"),
+            ("mar", "march"),
+            ("apr", "april"),
+            ("may",),
+            ("jun", "june"),
+            ("jul", "july"),
+            ("aug", "august"),
+            ("sep", "sept", "september"),
+            ("oct", "october"),
+            ("nov", "november"),
+            ("dec", "december"),
+        ],
+        start=1,
+    )
+    for name in names
+}
+
+
+class VendorDateFormats:
+    # Learns whether a vendor writes numeric dates day-first from its
+    # unambiguous dates (e.g. 25/03/2024) and applies that to ambiguous ones.
+    # Build or load a table once up front and pass it to the validator; the
+    # pipeline never feeds it, so flags do not depend on processing order.
+    def __init__(self) -> None:
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def observe(self, vendor: str, value: str) -> None:
+        m = NUMERIC_RE.match(str(value or "").strip())
+        if not m or not vendor:
+            return
+        a, b = int(m.group(1)), int(m.group(3))
+        if a > 12 and b <= 12:
+            order = "dmy"
+        elif b > 12 and a <= 12:
+            order = "mdy"
+        else:
+            return
+        key = vendor.strip().lower()
+        with self._lock:
+            counts = self._counts.setdefault(key, {"dmy": 0, "mdy": 0})
+            counts[order] += 1
+
+    def hint(self, vendor: Optional[str]) -> Optional[str]:
+        if not vendor:
+            return None
+        counts = self._counts.get(vendor.strip().lower())
+        if not counts or counts["dmy"] == counts["mdy"]:
+            return None
+        return "dmy" if counts["dmy"] > counts["mdy"] else "mdy"
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+    @classmethod
+    def learn(cls, pairs: Iterable[Tuple[str, str]]) -> "VendorDateFormats":
+        """Build a table from (vendor, date string) pairs."""
+        formats = cls()
+        for vendor, value in pairs:
+            formats.observe(vendor, value)
+        return formats
+
+    def save(self, path: str) -> None:
+        with self._lock:
+            data = {vendor: dict(counts) for vendor, counts in sorted(self._counts.items())}
+        Path(path).write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: str) -> "VendorDateFormats":
+        formats = cls()
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        for vendor, counts in data.items():
+            formats._counts[vendor.strip().lower()] = {
+                "dmy": int(counts.get("dmy", 0)),
+                "mdy": int(counts.get("mdy", 0)),
+            }
+        return formats
+
+
+def parse_date(
+    value: str, vendor: Optional[str] = None, formats: Optional[VendorDateFormats] = None
+) -> Optional[date]:
+    return parse_date_hinted(value, formats.hint(vendor) if formats is not None else None)
+
+
+def parse_date_hinted(value: str, order: Optional[str] = None) -> Optional[date]:
     if not value:
         return None
+    return _parse_cached(str(value), order)
+
+
+@lru_cache(maxsize=65536)
+def _parse_cached(value: str, order: Optional[str]) -> Optional[date]:
+    fast = _fast_parse(value.strip(), order)
+    if fast is not None:
+        return fast
     try:
-        return parser.parse(value, fuzzy=True).date()
+        return parser.parse(value, fuzzy=True, dayfirst=order == "dmy").date()
     except Exception:
         return None
+
+
+def _fast_parse(text: str, order: Optional[str]) -> Optional[date]:
+    m = ISO_RE.match(text)
+    if m:
+        return _safe_date(int(m.group(1)), int(m.group(3)), int(m.group(4)))
+
+    m = NUMERIC_RE.match(text)
+    if m:
+        a, b, year = int(m.group(1)), int(m.group(3)), int(m.group(4))
+        # dateutil's default reading is month-first; a vendor hint can flip it.
+        first, second = ((b, a), (a, b)) if order == "dmy" else ((a, b), (b, a))
+        return _safe_date(year, *first) or _safe_date(year, *second)
+
+    m = DAY_MONTH_RE.match(text)
+    if m:
+        month = _MONTHS.get(m.group(2).lower())
+        return _safe_date(int(m.group(3)), month, int(m.group(1))) if month else None
+
+    m = MONTH_DAY_RE.match(text)
+    if m:
+        month = _MONTHS.get(m.group(1).lower())
+        return _safe_date(int(m.group(3)), month, int(m.group(2))) if month else None
+
+    return None
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def cache_info() -> Tuple[int, int]:
+    info = _parse_cached.cache_info()
+    return info.hits, info.misses
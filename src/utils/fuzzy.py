@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import math
+import re
+from array import array
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+# Common legal-form spellings collapse to one token so "Acme Corp." == "ACME Corporation".
+_SUFFIXES = {
+    "corporation": "corp",
+    "incorporated": "inc",
+    "limited": "ltd",
+    "company": "co",
+    "private": "pvt",
+}
+
+
+def normalize_name(name: str) -> str:
+    text = _PUNCT_RE.sub(" ", str(name).lower())
+    tokens = [_SUFFIXES.get(tok, tok) for tok in _SPACE_RE.split(text) if tok]
+    return " ".join(tokens)
+
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """Character-trigram inverted index with prefix-filter candidate pruning.
+
+    Postings are stored CSR-style in NumPy arrays so a million names fit in a
+    few hundred MB. Similarity is Jaccard over trigram sets.
+    """
+
+    def __init__(self, names: Sequence[str]) -> None:
+        self.names = [normalize_name(n) for n in names]
+        gram_ids: Dict[str, int] = {}
+        gram_col = array("I")
+        name_col = array("I")
+        sizes = array("I")
+        for vid, name in enumerate(self.names):
+            grams = trigrams(name)
+            sizes.append(len(grams))
+            for g in grams:
+                gid = gram_ids.get(g)
+                if gid is None:
+                    gid = gram_ids[g] = len(gram_ids)
+                gram_col.append(gid)
+                name_col.append(vid)
+
+        grams_arr = np.frombuffer(gram_col, dtype=np.uint32) if gram_col else np.zeros(0, np.uint32)
+        names_arr = np.frombuffer(name_col, dtype=np.uint32) if name_col else np.zeros(0, np.uint32)
+        order = np.argsort(grams_arr, kind="stable")
+        self._postings = names_arr[order]
+        counts = np.bincount(grams_arr, minlength=len(gram_ids)) if len(gram_ids) else np.zeros(0)
+        self._offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._gram_ids = gram_ids
+        self._sizes = np.frombuffer(sizes, dtype=np.uint32) if sizes else np.zeros(0, np.uint32)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, query: str, threshold: float = 0.5) -> Optional[Tuple[int, float]]:
+        normalized = normalize_name(query)
+        grams = trigrams(normalized)
+        if not grams or not self.names:
+            return None
+        threshold = min(max(threshold, 1e-6), 1.0)
+
+        # Rarest trigrams first; unknown trigrams have an empty posting list.
+        ranked: List[Tuple[int, int]] = []
+        for g in grams:
+            gid = self._gram_ids.get(g)
+            if gid is None:
+                ranked.append((0, -1))
+            else:
+                ranked.append((int(self._offsets[gid + 1] - self._offsets[gid]), gid))
+        ranked.sort()
+
+        # A name with Jaccard >= t shares at least ceil(t*|q|) trigrams with the
+        # query, so it must contain one of the |q| - ceil(t*|q|) + 1 rarest ones.
+        n = len(grams)
+        prefix = n - math.ceil(threshold * n) + 1
+        slices = [
+            self._postings[self._offsets[gid] : self._offsets[gid + 1]]
+            for _, gid in ranked[:prefix]
+            if gid >= 0
+        ]
+        if not slices:
+            return None
+        candidates, overlap = np.unique(np.concatenate(slices), return_counts=True)
+        overlap = overlap.astype(np.int64)
+
+        # J(q, b) >= t  <=>  overlap >= t * (|q| + |b|) / (1 + t)
+        sizes = self._sizes[candidates].astype(np.int64)
+        needed = np.ceil(threshold * (n + sizes) / (1.0 + threshold) - 1e-9)
+
+        # Walk the remaining (more common) trigrams, dropping candidates that can
+        # no longer reach the required overlap before each binary-search pass.
+        for k in range(prefix, n):
+            alive = overlap + (n - k) >= needed
+            if not alive.all():
+                candidates, overlap, sizes, needed = (
+                    candidates[alive],
+                    overlap[alive],
+                    sizes[alive],
+                    needed[alive],
+                )
+            if candidates.size == 0:
+                return None
+            gid = ranked[k][1]
+            if gid < 0:
+                continue
+            posting = self._postings[self._offsets[gid] : self._offsets[gid + 1]]
+            pos = np.searchsorted(posting, candidates)
+            pos[pos == posting.size] = 0
+            overlap += posting[pos] == candidates
+
+        scores = overlap / (n + sizes - overlap)
+        best = int(np.argmax(scores))
+        if scores[best] < threshold:
+            return None
+        return int(candidates[best]), float(scores[best])
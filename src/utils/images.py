@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import hashlib
+import os
+from typing import Union
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Anything the OCR and VLM stages accept as a document image: a path, an
+# RGB uint8 array, or a PIL image.
+ImageInput = Union[str, "os.PathLike[str]", np.ndarray, Image.Image]
+
+
+def load_image(path: Union[str, "os.PathLike[str]"]) -> np.ndarray:
+    """Decode an image once into a read-only RGB uint8 array shared by all stages."""
+    with Image.open(path) as image:
+        pixels = np.asarray(ImageOps.exif_transpose(image).convert("RGB"))
+    pixels.setflags(write=False)
+    return pixels
+
+
+def to_pil(image: ImageInput) -> Union[str, Image.Image]:
+    # Paths pass through so downstream loaders can read them lazily.
+    if isinstance(image, np.ndarray):
+        return Image.fromarray(image)
+    if isinstance(image, Image.Image):
+        return image
+    return os.fspath(image)
+
+
+def to_bgr(image: ImageInput) -> Union[str, np.ndarray]:
+    # PaddleOCR takes a path or an OpenCV-style BGR array.
+    if isinstance(image, Image.Image):
+        image = np.asarray(image.convert("RGB"))
+    if isinstance(image, np.ndarray):
+        if image.ndim == 2:
+            image = np.repeat(image[:, :, None], 3, axis=2)
+        return np.ascontiguousarray(image[:, :, ::-1])
+    return os.fspath(image)
+
+
+def pixels_digest(image: Union[np.ndarray, Image.Image]) -> str:
+    if isinstance(image, Image.Image):
+        header, data = f"{image.mode}:{image.size}", image.tobytes()
+    else:
+        array = np.ascontiguousarray(image)
+        header, data = f"{array.dtype}:{array.shape}", array.data
+    h = hashlib.sha256(header.encode("utf-8"))
+    h.update(data)
+    return h.hexdigest()
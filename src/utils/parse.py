@@ -5,32 +5,56 @@ import json
 from typing import Any, Optional
 
 
+class BalancedObjectTracker:
+    # Incremental form of the brace/string state machine: feed text as it is
+    # produced and it reports when the first top-level {...} has closed.
+    def __init__(self) -> None:
+        self.pos = 0
+        self.start: Optional[int] = None
+        self.end: Optional[int] = None
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+
+    @property
+    def closed(self) -> bool:
+        return self.end is not None
+
+    def feed(self, text: str) -> bool:
+        for ch in text:
+            if self.end is not None:
+                break
+            i = self.pos
+            self.pos += 1
+            if self.start is None:
+                if ch == "{":
+                    self.start = i
+                    self.depth = 1
+                continue
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                continue
+            if ch == '"':
+                self.in_string = True
+            elif ch == "{":
+                self.depth += 1
+            elif ch == "}":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.end = i + 1
+        return self.end is not None
+
+
 def _first_balanced_object(text: str) -> Optional[str]:
-    start = text.find("{")
-    if start == -1:
+    tracker = BalancedObjectTracker()
+    if not tracker.feed(text):
         return None
-    depth = 0
-    in_string = False
-    escape = False
-    for i in range(start, len(text)):
-        ch = text[i]
-        if in_string:
-            if escape:
-                escape = False
-            elif ch == "\\":
-                escape = True
-            elif ch == '"':
-                in_string = False
-            continue
-        if ch == '"':
-            in_string = True
-        elif ch == "{":
-            depth += 1
-        elif ch == "}":
-            depth -= 1
-            if depth == 0:
-                return text[start : i + 1]
-    return None
+    return text[tracker.start : tracker.end]
 
 
 def extract_json_block(text: str) -> dict[str, Any]:
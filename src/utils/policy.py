@@ -1,27 +1,44 @@
 from __future__ import annotations
 
+import csv
 import re
-from dataclasses import dataclass
-from typing import Optional
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 
-from .dates import parse_date
+from .dates import VendorDateFormats, parse_date
+from .fuzzy import normalize_name
 
 
-@dataclass
+@dataclass(frozen=True)
 class Policy:
+    # Frozen: parse_policy caches instances and hands the same one to every caller.
     start_date: Optional[str] = None
     end_date: Optional[str] = None
     allowed_tax_rate: Optional[float] = None
+    vendor_name: Optional[str] = None
+    contract_id: Optional[str] = None
+    # Parsed once here so validators compare dates without re-parsing strings.
+    start: Optional[date] = field(default=None, init=False, compare=False, repr=False)
+    end: Optional[date] = field(default=None, init=False, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "start", parse_date(self.start_date) if self.start_date else None)
+        object.__setattr__(self, "end", parse_date(self.end_date) if self.end_date else None)
 
 
 DATE_RANGE_RE = re.compile(
-    r"(?:effective|start|from)\s*[:\-]?\s*(?P<start>[^\\n]+?)\\s*(?:to|through|-)\s*(?P<end>[^\\n]+)",
+    r"(?:effective|start|from)\s*[:\-]?\s*(?P<start>[^\n]+?)\s+(?:to|through|-)\s+(?P<end>[^\n]+)",
     re.IGNORECASE,
 )
 
-TAX_RE = re.compile(r"(?:tax|gst|vat)\\s*rate\\s*[:\\-]?\\s*(?P<rate>\\d+(?:\\.\\d+)?)\\s*%", re.IGNORECASE)
+TAX_RE = re.compile(r"(?:tax|gst|vat)\s*rate\s*[:\-]?\s*(?P<rate>\d+(?:\.\d+)?)\s*%", re.IGNORECASE)
 
 
+@lru_cache(maxsize=1024)
 def parse_policy(text: str) -> Policy:
     if not text:
         return Policy()
@@ -45,3 +62,101 @@ def parse_policy(text: str) -> Policy:
             allowed_tax_rate = None
 
     return Policy(start_date=start_date, end_date=end_date, allowed_tax_rate=allowed_tax_rate)
+
+
+class _VendorContracts:
+    # Contracts sorted by start date, plus a running max of end dates so a
+    # lookup can stop walking back as soon as no earlier contract can cover it.
+    # `add` only appends; the sorted index is built once, on the first lookup
+    # after a change, so loading k contracts costs one O(k log k) sort.
+    def __init__(self) -> None:
+        self.policies: List[Policy] = []
+        self._index: Optional[Tuple[List[Policy], List[date], List[date]]] = None
+
+    def add(self, policy: Policy) -> None:
+        self.policies.append(policy)
+        self._index = None
+
+    def _build(self) -> Tuple[List[Policy], List[date], List[date]]:
+        ordered = sorted(self.policies, key=lambda p: (p.start or date.min, p.end or date.max))
+        starts = [p.start or date.min for p in ordered]
+        max_end = []
+        running = date.min
+        for p in ordered:
+            running = max(running, p.end or date.max)
+            max_end.append(running)
+        # Published as one tuple, so concurrent readers never see a half-built index.
+        self._index = (ordered, starts, max_end)
+        return self._index
+
+    def resolve(self, when: Optional[date]) -> Optional[Policy]:
+        if not self.policies:
+            return None
+        policies, starts, max_end = self._index or self._build()
+        if when is None:
+            return policies[-1]
+        i = bisect_right(starts, when) - 1
+        j = i
+        while j >= 0 and max_end[j] >= when:
+            if (policies[j].end or date.max) >= when:
+                return policies[j]
+            j -= 1
+        # No contract covers the date: hand back the nearest one so the
+        # validator reports date_outside_contract against it.
+        return policies[max(i, 0)]
+
+
+class PolicyRegistry:
+    def __init__(self) -> None:
+        self._by_vendor: Dict[str, _VendorContracts] = {}
+        self.default: Optional[Policy] = None
+
+    def __len__(self) -> int:
+        return sum(len(c.policies) for c in self._by_vendor.values())
+
+    def add(
+        self, text: str, vendor_name: Optional[str] = None, contract_id: Optional[str] = None
+    ) -> Policy:
+        parsed = parse_policy(text)
+        policy = Policy(
+            start_date=parsed.start_date,
+            end_date=parsed.end_date,
+            allowed_tax_rate=parsed.allowed_tax_rate,
+            vendor_name=vendor_name,
+            contract_id=contract_id,
+        )
+        if vendor_name:
+            key = normalize_name(vendor_name)
+            self._by_vendor.setdefault(key, _VendorContracts()).add(policy)
+        else:
+            self.default = policy
+        return policy
+
+    def resolve(
+        self,
+        vendor_name: str,
+        invoice_date: str,
+        date_formats: Optional[VendorDateFormats] = None,
+    ) -> Optional[Policy]:
+        contracts = self._by_vendor.get(normalize_name(vendor_name))
+        if contracts is None:
+            return self.default
+        return contracts.resolve(parse_date(invoice_date, vendor=vendor_name, formats=date_formats))
+
+    @classmethod
+    def from_csv(cls, path: str) -> "PolicyRegistry":
+        # Columns: vendor_name, contract_id (optional) and either contract_text
+        # or contract_path (relative to the CSV). Blank vendor_name = default.
+        registry = cls()
+        base = Path(path).parent
+        with Path(path).open("r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                text = row.get("contract_text") or ""
+                if not text and row.get("contract_path"):
+                    text = (base / row["contract_path"]).read_text(encoding="utf-8")
+                registry.add(
+                    text,
+                    vendor_name=(row.get("vendor_name") or "").strip() or None,
+                    contract_id=row.get("contract_id") or None,
+                )
+        return registry
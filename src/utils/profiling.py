@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import functools
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, Callable, ContextManager, Dict, Iterator, List, Mapping, Optional, TypeVar
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+_NULL = nullcontext()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class Profiler:
+    """Process-wide stage timers and counters for the audit pipeline.
+
+    Disabled by default: `stage()` then hands back a shared no-op context and
+    `count()` returns at once, so instrumented code pays one attribute check.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        # name -> [calls, total seconds, max seconds]
+        self._stages: Dict[str, List[float]] = {}
+        self._counters: Dict[str, float] = {}
+
+    def stage(self, name: str) -> ContextManager[None]:
+        if not self.enabled:
+            return _NULL
+        return self._timed(name)
+
+    def count(self, name: str, value: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {name: list(v) for name, v in self._stages.items()}
+            counters = dict(self._counters)
+        derived = {}
+        generate = stages.get("qwen.generate")
+        if generate and generate[1] > 0 and counters.get("qwen.generated_tokens"):
+            derived["qwen.generated_tokens_per_sec"] = round(
+                counters["qwen.generated_tokens"] / generate[1], 2
+            )
+        return {
+            "stages": {
+                name: {
+                    "calls": int(calls),
+                    "seconds": round(total, 6),
+                    "mean_ms": round(total / calls * 1000, 3) if calls else 0.0,
+                    "max_ms": round(peak * 1000, 3),
+                }
+                for name, (calls, total, peak) in sorted(stages.items())
+            },
+            "counters": counters,
+            "derived": derived,
+            "peak_memory_bytes": peak_memory(),
+        }
+
+    def to_prometheus(
+        self,
+        prefix: str = "invoice_audit",
+        extra: Optional[Mapping[str, float]] = None,
+        counters: Optional[Mapping[str, float]] = None,
+    ) -> str:
+        """Render the snapshot in Prometheus text format.
+
+        `extra` values are exported as gauges; `counters` (monotonic totals)
+        as counters, with a `_total` suffix.
+        """
+        snap = self.snapshot()
+        lines: List[str] = []
+
+        def family(name: str, kind: str, samples: Mapping[str, float], label: str = "") -> None:
+            if not samples:
+                return
+            metric = f"{prefix}_{name}"
+            lines.append(f"# TYPE {metric} {kind}")
+            for key, value in samples.items():
+                labels = f'{{{label}="{key}"}}' if label else ""
+                lines.append(f"{metric}{labels} {value}")
+
+        stages = snap["stages"]
+        family("stage_calls_total", "counter", {k: v["calls"] for k, v in stages.items()}, "stage")
+        family(
+            "stage_seconds_total", "counter", {k: v["seconds"] for k, v in stages.items()}, "stage"
+        )
+        family(
+            "stage_max_seconds", "gauge", {k: v["max_ms"] / 1000 for k, v in stages.items()}, "stage"
+        )
+        for name, value in snap["counters"].items():
+            family(f"{_metric_name(name)}_total", "counter", {"": value})
+        for name, value in snap["derived"].items():
+            family(_metric_name(name), "gauge", {"": value})
+        for name, value in snap["peak_memory_bytes"].items():
+            family(f"peak_{_metric_name(name)}_bytes", "gauge", {"": value})
+        for name, value in (extra or {}).items():
+            family(_metric_name(name), "gauge", {"": value})
+        for name, value in (counters or {}).items():
+            family(f"{_metric_name(name)}_total", "counter", {"": value})
+        return "\n".join(lines) + "\n"
+
+    @contextmanager
+    def _timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                entry = self._stages.setdefault(name, [0, 0.0, 0.0])
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = max(entry[2], elapsed)
+
+
+def peak_memory() -> Dict[str, int]:
+    peaks: Dict[str, int] = {}
+    if resource is not None:
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS.
+        peaks["rss"] = int(rss if sys.platform == "darwin" else rss * 1024)
+    # Only consult torch when the model stack already imported it.
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        peaks["cuda"] = int(torch.cuda.max_memory_allocated())
+    return peaks
+
+
+def render_profile(snapshot: dict) -> str:
+    lines = ["Profile:"]
+    for name, stage in snapshot["stages"].items():
+        lines.append(
+            f"- {name}: {stage['seconds']:.3f}s over {stage['calls']} call(s) "
+            f"(mean {stage['mean_ms']:.1f}ms, max {stage['max_ms']:.1f}ms)"
+        )
+    for name, value in {**snapshot["counters"], **snapshot["derived"]}.items():
+        lines.append(f"- {name}: {value:g}")
+    for name, value in snapshot["peak_memory_bytes"].items():
+        lines.append(f"- peak {name}: {value / (1 << 20):.1f} MiB")
+    return "\n".join(lines)
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+_PROFILER = Profiler()
+
+
+def get_profiler() -> Profiler:
+    return _PROFILER
+
+
+def profiled(name: str) -> Callable[[F], F]:
+    """Time every call of the decorated function as stage `name`."""
+
+    def decorate(fn: F) -> F:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _PROFILER.enabled:
+                return fn(*args, **kwargs)
+            with _PROFILER.stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .fuzzy import normalize_name
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    key TEXT NOT NULL,
+    source TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (key, source)
+)
+"""
+
+_INVOICE_NO_RE = re.compile(r"[^A-Z0-9]")
+
+
+def invoice_key(vendor_name: str, invoice_number: str, total: float) -> Optional[str]:
+    number = _INVOICE_NO_RE.sub("", str(invoice_number).upper())
+    if not number:
+        return None
+    return f"{normalize_name(vendor_name)}|{number}|{float(total):.2f}"
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class SeenInvoiceIndex:
+    """Persistent record of audited invoices, shared across runs and processes.
+
+    A Bloom filter answers most "never seen" lookups from memory; SQLite is
+    the source of truth and serializes concurrent writers on the same host.
+    """
+
+    def __init__(self, path: str, capacity: int = 1_000_000, error_rate: float = 0.001) -> None:
+        self.path = path
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, timeout=30.0, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(_SCHEMA)
+        (rows,) = self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()
+        self._bloom = BloomFilter(max(capacity, rows * 2), error_rate)
+        self._synced_rowid = 0
+        self._sync()
+
+    def check_and_add(
+        self, vendor_name: str, invoice_number: str, total: float, source: str = ""
+    ) -> bool:
+        """Record the invoice and return True if another source submitted it first.
+
+        Re-checking a source that is already recorded (a re-run or re-audit)
+        only compares it against sources recorded before it, so the original
+        submission of a duplicated invoice is never flagged. An empty source
+        is a new, anonymous submission every time: it is compared against any
+        earlier row and recorded under a source of its own.
+        """
+        key = invoice_key(vendor_name, invoice_number, total)
+        if key is None:
+            return False
+        if not source:
+            source = f"anonymous:{uuid.uuid4().hex}"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Pick up rows written by other processes since our last look.
+                self._sync()
+                duplicate = False
+                if key in self._bloom:
+                    duplicate = (
+                        self._conn.execute(
+                            "SELECT 1 FROM seen WHERE key = ? AND source != ? AND rowid < "
+                            "COALESCE((SELECT rowid FROM seen WHERE key = ? AND source = ?), "
+                            "9223372036854775807) LIMIT 1",
+                            (key, source, key, source),
+                        ).fetchone()
+                        is not None
+                    )
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO seen (key, source, first_seen) VALUES (?, ?, ?)",
+                    (key, source, time.time()),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            if cur.rowcount:
+                self._add_to_bloom(key)
+                self._synced_rowid = max(self._synced_rowid, cur.lastrowid or 0)
+            return duplicate
+
+    def __len__(self) -> int:
+        with self._lock:
+            (rows,) = self._conn.execute("SELECT COUNT(*) FROM seen").fetchone()
+        return rows
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _sync(self) -> None:
+        rows = self._conn.execute(
+            "SELECT rowid, key FROM seen WHERE rowid > ? ORDER BY rowid", (self._synced_rowid,)
+        ).fetchall()
+        for rowid, key in rows:
+            self._add_to_bloom(key)
+            self._synced_rowid = rowid
+
+    def _add_to_bloom(self, key: str) -> None:
+        if self._bloom.count >= self._bloom.capacity:
+            # Grow by rebuilding from the store so the false-positive rate holds.
+            bloom = BloomFilter(self._bloom.capacity * 2, self.error_rate)
+            for (existing,) in self._conn.execute("SELECT key FROM seen"):
+                bloom.add(existing)
+            self._bloom = bloom
+        self._bloom.add(key)
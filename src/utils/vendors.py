@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import threading
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
 import pandas as pd
 
+from .fuzzy import TrigramIndex
+
 
 @dataclass
 class VendorRecord:
@@ -12,24 +15,78 @@ class VendorRecord:
     gst_number: Optional[str] = None
 
 
+@dataclass
+class VendorMatch:
+    record: VendorRecord
+    score: float
+
+
 class VendorDB:
     def __init__(self, csv_path: str) -> None:
         self.csv_path = csv_path
         self.df = pd.read_csv(csv_path)
+        self._build_indexes()
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, csv_path: str = "") -> "VendorDB":
+        db = cls.__new__(cls)
+        db.csv_path = csv_path
+        db.df = df
+        db._build_indexes()
+        return db
+
+    def _build_indexes(self) -> None:
+        # First row wins for duplicate names, matching the old boolean-mask lookup.
+        self._vendors: Dict[str, Tuple[str, Any]] = {}
+        if "vendor_name" in self.df.columns:
+            names = self.df["vendor_name"]
+            if "gst_number" in self.df.columns:
+                gsts: Iterable[Any] = self.df["gst_number"]
+            else:
+                gsts = [None] * len(names)
+            for name, gst in zip(names, gsts):
+                if isinstance(name, str):
+                    self._vendors.setdefault(name.lower(), (name, gst))
+
+        self._invoice_numbers: Set[str] = set()
+        if "invoice_number" in self.df.columns:
+            self._invoice_numbers = set(self.df["invoice_number"].astype(str).str.strip())
+
+        self._fuzzy_index: Optional[TrigramIndex] = None
+        self._fuzzy_entries: List[Tuple[str, Any]] = []
+        self._fuzzy_lock = threading.Lock()
+
+    def build_fuzzy_index(self) -> TrigramIndex:
+        with self._fuzzy_lock:
+            if self._fuzzy_index is None:
+                self._fuzzy_entries = list(self._vendors.values())
+                self._fuzzy_index = TrigramIndex([name for name, _ in self._fuzzy_entries])
+            return self._fuzzy_index
 
     def find_vendor(self, name: str) -> Optional[VendorRecord]:
-        if "vendor_name" not in self.df.columns:
+        hit = self._vendors.get(str(name).strip().lower())
+        if hit is None:
             return None
-        matches = self.df[self.df["vendor_name"].str.lower() == str(name).strip().lower()]
-        if matches.empty:
+        return VendorRecord(vendor_name=hit[0], gst_number=hit[1])
+
+    def find_vendor_fuzzy(self, name: str, threshold: float = 0.8) -> Optional[VendorMatch]:
+        exact = self.find_vendor(name)
+        if exact is not None:
+            return VendorMatch(record=exact, score=1.0)
+        hit = self.build_fuzzy_index().search(str(name), threshold)
+        if hit is None:
             return None
-        row = matches.iloc[0]
-        gst = row.get("gst_number") if "gst_number" in self.df.columns else None
-        return VendorRecord(vendor_name=row["vendor_name"], gst_number=gst)
+        vendor_name, gst = self._fuzzy_entries[hit[0]]
+        return VendorMatch(record=VendorRecord(vendor_name=vendor_name, gst_number=gst), score=hit[1])
+
+    def lookup(self, name: str, fuzzy_threshold: Optional[float] = None) -> Optional[VendorRecord]:
+        if fuzzy_threshold is None:
+            return self.find_vendor(name)
+        match = self.find_vendor_fuzzy(name, fuzzy_threshold)
+        return match.record if match is not None else None
+
+    def find_vendors(self, names: Iterable[str]) -> List[Optional[VendorRecord]]:
+        return [self.find_vendor(name) for name in names]
 
     def has_invoice_number(self, invoice_number: str) -> bool:
-        if "invoice_number" not in self.df.columns:
-            return False
-        return bool(
-            (self.df["invoice_number"].astype(str).str.strip() == str(invoice_number).strip()).any()
-        )
+        return str(invoice_number).strip() in self._invoice_numbers
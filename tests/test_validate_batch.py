@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import random
+from datetime import date, timedelta
+from typing import List, Optional
+
+import pandas as pd
+import pytest
+
+from src.models.columns import InvoiceColumns, flags_from_arrays
+from src.models.types import Invoice, LineItem, ValidationFlags
+from src.pipeline.validator import LogicalValidator
+from src.utils.dates import VendorDateFormats
+from src.utils.policy import Policy
+from src.utils.seen import SeenInvoiceIndex
+from src.utils.vendors import VendorDB
+
+VENDORS = [f"Vendor {i} Ltd" for i in range(40)]
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m/%d/%Y", "%b %d, %Y", "%d.%m.%Y"]
+
+
+@pytest.fixture(scope="module")
+def vendor_db() -> VendorDB:
+    return VendorDB.from_frame(
+        pd.DataFrame(
+            {
+                "vendor_name": VENDORS,
+                "gst_number": [f"GST{i:06d}" if i % 7 else "bad" for i in range(len(VENDORS))],
+                "invoice_number": [f"INV-{i * 3:05d}" for i in range(len(VENDORS))],
+            }
+        )
+    )
+
+
+def make_invoices(n: int, seed: int) -> List[Invoice]:
+    rng = random.Random(seed)
+    invoices = []
+    for i in range(n):
+        items = [
+            LineItem(
+                name=f"item {j}",
+                qty=float(rng.randint(1, 20)),
+                unit_price=round(rng.uniform(0.5, 15000.0 if rng.random() < 0.05 else 500.0), 2),
+            )
+            for j in range(rng.randint(0, 6))
+        ]
+        subtotal = sum(item.qty * item.unit_price for item in items)
+        if rng.random() < 0.1:
+            subtotal += rng.choice([0.005, 0.02, 5.0])
+        tax = round(subtotal * rng.choice([0.1, 0.1, 0.18, 0.05]), 2)
+        total = subtotal + tax + (rng.choice([0.0, 0.01, 10.0]) if rng.random() < 0.1 else 0.0)
+        day = date(2019, 1, 1) + timedelta(days=rng.randint(0, 365 * 9))
+        vendor = rng.choice(VENDORS)
+        if rng.random() < 0.1:
+            vendor = vendor.replace("Ltd", "Ltd.").replace("Vendor", "Vendr")
+        elif rng.random() < 0.05:
+            vendor = f"Unknown {i}"
+        invoices.append(
+            Invoice(
+                invoice_number=f"INV-{rng.randint(0, 150):05d}",
+                vendor_name=vendor,
+                invoice_date="" if rng.random() < 0.03 else day.strftime(rng.choice(DATE_FORMATS)),
+                line_items=items,
+                subtotal=subtotal,
+                tax=tax,
+                total=total,
+            )
+        )
+    return invoices
+
+
+def make_policies(n: int, seed: int) -> List[Optional[Policy]]:
+    rng = random.Random(seed)
+    choices = [
+        None,
+        Policy(start_date="2020-01-01", end_date="2024-12-31", allowed_tax_rate=10.0),
+        Policy(start_date="2021-03-01", end_date="2021-03-31"),
+        Policy(allowed_tax_rate=18.0),
+        Policy(start_date="2022-06-15", end_date="2026-01-01", allowed_tax_rate=5.0),
+    ]
+    return [rng.choice(choices) for _ in range(n)]
+
+
+def scalar_flags(
+    validator: LogicalValidator,
+    invoices: List[Invoice],
+    vendor_db: Optional[VendorDB],
+    policies: List[Optional[Policy]],
+    sources: List[str],
+) -> List[ValidationFlags]:
+    return [
+        validator.validate(inv, vendor_db=vendor_db, policy=policy, source=source)
+        for inv, policy, source in zip(invoices, policies, sources)
+    ]
+
+
+@pytest.mark.parametrize("fuzzy", [None, 0.6])
+def test_single_policy_parity(vendor_db: VendorDB, fuzzy: Optional[float]) -> None:
+    invoices = make_invoices(400, seed=1)
+    policy = Policy(start_date="2020-01-01", end_date="2026-12-31", allowed_tax_rate=10.0)
+    validator = LogicalValidator(fuzzy_vendor_threshold=fuzzy)
+    expected = scalar_flags(validator, invoices, vendor_db, [policy] * len(invoices), [""] * 400)
+    arrays = validator.validate_batch(
+        InvoiceColumns.from_invoices(invoices), vendor_db=vendor_db, policy=policy
+    )
+    assert flags_from_arrays(arrays) == expected
+
+
+def test_per_row_policies_parity(vendor_db: VendorDB) -> None:
+    invoices = make_invoices(400, seed=2)
+    policies = make_policies(len(invoices), seed=2)
+    validator = LogicalValidator()
+    expected = scalar_flags(validator, invoices, vendor_db, policies, [""] * len(invoices))
+    arrays = validator.validate_batch(
+        InvoiceColumns.from_invoices(invoices), vendor_db=vendor_db, policies=policies
+    )
+    assert flags_from_arrays(arrays) == expected
+    assert any(f.date_outside_contract for f in expected)
+    assert any(f.tax_rate_unusual for f in expected)
+
+
+def test_seen_index_parity(tmp_path) -> None:
+    invoices = make_invoices(200, seed=3)
+    # Resubmissions: the same invoice from another image, and the same image again.
+    invoices += invoices[:20]
+    sources = [f"img_{i}.png" for i in range(200)] + [
+        f"img_{i}.png" if i % 2 else f"copy_{i}.png" for i in range(20)
+    ]
+    policies = make_policies(len(invoices), seed=3)
+    scalar = LogicalValidator(seen_index=SeenInvoiceIndex(str(tmp_path / "scalar.sqlite")))
+    batch = LogicalValidator(seen_index=SeenInvoiceIndex(str(tmp_path / "batch.sqlite")))
+    expected = scalar_flags(scalar, invoices, None, policies, sources)
+    arrays = batch.validate_batch(
+        InvoiceColumns.from_invoices(invoices), sources=sources, policies=policies
+    )
+    assert flags_from_arrays(arrays) == expected
+    assert sum(f.duplicate_invoice for f in expected[200:]) >= 10
+
+
+def test_anonymous_submissions_are_distinct(tmp_path) -> None:
+    invoices = make_invoices(50, seed=4)
+    invoices += invoices[:10]
+    scalar = LogicalValidator(seen_index=SeenInvoiceIndex(str(tmp_path / "scalar.sqlite")))
+    batch = LogicalValidator(seen_index=SeenInvoiceIndex(str(tmp_path / "batch.sqlite")))
+    expected = scalar_flags(scalar, invoices, None, [None] * len(invoices), [""] * len(invoices))
+    arrays = batch.validate_batch(InvoiceColumns.from_invoices(invoices))
+    assert flags_from_arrays(arrays) == expected
+    # Copies submitted without a source are still caught within the batch.
+    assert all(f.duplicate_invoice for f in expected[50:])
+
+
+def test_ambiguous_vendor_dates_parity(vendor_db: VendorDB) -> None:
+    formats = VendorDateFormats.learn(
+        [(VENDORS[0], "25/01/2024"), (VENDORS[0], "26/02/2024"), (VENDORS[1], "01/25/2024")]
+    )
+    policy = Policy(start_date="2024-03-01", end_date="2024-03-31")
+    dates = ["03/04/2024", "04/03/2024", "2024-03-04", "Mar 4, 2024", "13/03/2024", ""]
+    invoices = [
+        Invoice(
+            invoice_number=f"X-{i}",
+            vendor_name=vendor,
+            invoice_date=value,
+            line_items=[],
+            subtotal=0.0,
+            tax=0.0,
+            total=0.0,
+        )
+        for i, (vendor, value) in enumerate(
+            (vendor, value) for vendor in VENDORS[:3] for value in dates
+        )
+    ]
+    validator = LogicalValidator(date_formats=formats)
+    expected = scalar_flags(
+        validator, invoices, vendor_db, [policy] * len(invoices), [""] * len(invoices)
+    )
+    arrays = validator.validate_batch(
+        InvoiceColumns.from_invoices(invoices), vendor_db=vendor_db, policy=policy
+    )
+    assert flags_from_arrays(arrays) == expected
+    # The same string lands inside or outside the window depending on the vendor's order.
+    assert expected[0].date_outside_contract and not expected[6].date_outside_contract
+
+
+def test_empty_batch() -> None:
+    arrays = LogicalValidator().validate_batch(InvoiceColumns.from_invoices([]))
+    assert flags_from_arrays(arrays) == []